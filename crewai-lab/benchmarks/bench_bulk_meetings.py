@@ -0,0 +1,89 @@
+"""Creating many meetings: one insert per event vs. batched bulk inserts vs. RRULE series.
+
+Schedules a stand-up for --teams teams against the in-memory Calendar
+stand-in, which waits --latency seconds per HTTP round trip (a batch pays
+it once):
+
+    one by one       MeetingSchedulerTool once per team: one events().insert round trip each
+    bulk             schedule_meetings: every team's insert in batches of 50
+    one by one x N   a tool call per occurrence, for --occurrences weekly occurrences per team
+    bulk series      schedule_meetings with an RRULE: one insert per team covers every occurrence
+
+Reports meetings (occurrences) created, insert requests, HTTP round trips,
+Google quota units and wall time. Every batched item still costs a quota
+unit, so under the executor's per-user pacing (--user-qpm, off by default)
+bulk inserts wait like single ones; a series does not. The LLM round trip
+each one-by-one tool call would also cost in the crew is not included.
+
+    PYTHONPATH=src python benchmarks/bench_bulk_meetings.py
+    PYTHONPATH=src python benchmarks/bench_bulk_meetings.py --teams 200 --latency 0.1
+"""
+import argparse
+import time
+from datetime import datetime, timedelta
+
+from calendar_assistant_flow.tools.calendar_client import calendar_clients
+from calendar_assistant_flow.tools.custom_tool import MeetingSchedulerTool, schedule_meetings
+from calendar_assistant_flow.tools.fake_calendar import InMemoryCalendarService
+from calendar_assistant_flow.tools.google_api import google_api, metered
+
+MONDAY = datetime(2026, 1, 5, 9, 30)
+
+
+def _meetings(teams: int):
+    return [{"summary": f"Team {n} stand-up", "start": (MONDAY + timedelta(minutes=15 * (n % 16))).isoformat(),
+             "end": (MONDAY + timedelta(minutes=15 * (n % 16) + 15)).isoformat(),
+             "attendees": [f"lead{n}@example.com"]} for n in range(teams)]
+
+
+def one_by_one(meetings, occurrences: int = 1) -> int:
+    tool = MeetingSchedulerTool()
+    for week in range(occurrences):
+        for m in meetings:
+            shift = timedelta(weeks=week)
+            tool._run(summary=m["summary"], location="", description="", attendees=m["attendees"],
+                      start=(datetime.fromisoformat(m["start"]) + shift).isoformat(),
+                      end=(datetime.fromisoformat(m["end"]) + shift).isoformat())
+    return len(meetings) * occurrences
+
+
+def bulk(meetings, occurrences: int = 1) -> int:
+    rule = f"RRULE:FREQ=WEEKLY;COUNT={occurrences}" if occurrences > 1 else None
+    result = schedule_meetings(meetings, rule)
+    assert result.failed == 0, result
+    return result.created * occurrences
+
+
+def run(args):
+    meetings = _meetings(args.teams)
+    google_api.configure(user_qpm=args.user_qpm)
+    scenarios = [
+        ("one by one", lambda: one_by_one(meetings)),
+        ("bulk", lambda: bulk(meetings)),
+        (f"one by one x{args.occurrences}", lambda: one_by_one(meetings, args.occurrences)),
+        ("bulk series", lambda: bulk(meetings, args.occurrences)),
+    ]
+    print(f"{args.teams} teams, {args.latency * 1000:g}ms per round trip, {args.occurrences} weekly occurrences, "
+          f"user qpm {args.user_qpm:g}\n")
+    print(f"{'mode':<18} {'meetings':>9} {'inserts':>8} {'trips':>6} {'quota':>6} {'wall ms':>9}")
+    for name, fn in scenarios:
+        service = InMemoryCalendarService(latency=args.latency)
+        calendar_clients.override(service)
+        try:
+            t0 = time.perf_counter()
+            with metered() as quota:
+                created = fn()
+            wall = (time.perf_counter() - t0) * 1000
+        finally:
+            calendar_clients.override(None)
+        print(f"{name:<18} {created:>9} {service.calls['calendar.events.insert']:>8} {service.round_trips:>6} "
+              f"{quota.units:>6} {wall:>9.1f}")
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--teams", type=int, default=60)
+    ap.add_argument("--occurrences", type=int, default=10, help="weekly occurrences in the series modes")
+    ap.add_argument("--latency", type=float, default=0.02, help="seconds per HTTP round trip")
+    ap.add_argument("--user-qpm", type=float, default=0, help="executor's per-user requests per minute (0 = no limit)")
+    run(ap.parse_args())
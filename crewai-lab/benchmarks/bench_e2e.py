@@ -0,0 +1,201 @@
+"""End-to-end latency of CalendarAssistantFlow against local stand-ins.
+
+Runs the meeting, availability and event paths, plus compound questions that
+need two of them, through the real flow (router, date engine, crews, tools)
+with Ollama replaced by fake_ollama.FakeOllama and Google Calendar by the
+seeded InMemoryCalendarService. No network, no OAuth.
+
+    PYTHONPATH=src python benchmarks/bench_e2e.py
+    PYTHONPATH=src python benchmarks/bench_e2e.py --requests 50 --events 20000 --token-latency 0.01
+    PYTHONPATH=src python benchmarks/bench_e2e.py --llm-router --json baseline.json
+    STRUCTURED_OUTPUT=0 PYTHONPATH=src python benchmarks/bench_e2e.py --llm-router --sloppy-json-rate 0.3
+    PYTHONPATH=src python benchmarks/bench_e2e.py --stream
+
+Reports, per path: p50/p95/p99 latency, LLM calls, Calendar API round trips
+and Google quota units per request, then the structured-output parse outcomes
+(direct / converted by a re-prompt / repaired locally / failed). With --stream
+each question goes through stream_question and the first event and first LLM
+token are timed as well. Last comes the prompt size per task, how much of
+it the fake had to evaluate (it caches prompt prefixes like Ollama) and the
+task's token budget. Since the stand-ins have fixed costs, changes
+in these numbers come from the code under test. The LLM memo and flow
+checkpoints live in memory for the run, so every run starts cold.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+from fake_ollama import FakeOllama, calendar_script
+
+QUESTIONS = {
+    "meeting_scheduler_assistant": [
+        "Schedule a meeting with joe@gmail.com tomorrow at 10am for the daily standup",
+        "Book a 30 minute sync with ana@example.com and li@example.com on Friday",
+        "Set up a meeting with sam@corp.com next Tuesday afternoon about the roadmap",
+    ],
+    "availability_checker_assistant": [
+        "Am I free tomorrow afternoon?",
+        "When am I available between Nov 17 and Nov 21?",
+        "Do I have any free time this week?",
+        "Am I free sometime around the end of the quarter?",  # date engine falls back to the LLM
+    ],
+    "event_checker_assistant": [
+        "What events do I have today?",
+        "Show me my meetings next Monday",
+        "What's on my calendar from 2pm to 4pm tomorrow?",
+        "What's on my calendar the week after my vacation?",  # date engine falls back to the LLM
+    ],
+    # Compound questions: both branches run in parallel on one shared date range
+    "event_checker_assistant+availability_checker_assistant": [
+        "What meetings do I have tomorrow, and when am I free tomorrow?",
+        "Show my agenda for next Monday and am I free next Monday afternoon?",
+    ],
+}
+
+
+def _pct(values, q):
+    values = sorted(values)
+    return values[min(int(q * len(values)), len(values) - 1)] if values else float("nan")
+
+
+def _streamed(events):
+    """(final result, ms to the first event, ms to the first LLM token or None) of one streamed run."""
+    first = token = None
+    for event in events:
+        first = event["t_ms"] if first is None else first
+        if event["type"] == "token" and token is None:
+            token = event["t_ms"]
+        if event["type"] == "error":
+            raise RuntimeError(event["error"])
+    return event, first, token
+
+
+def run(args):
+    # Configure the stand-ins before the flow modules read their settings at import
+    ollama = FakeOllama(calendar_script(), token_latency=args.token_latency,
+                        first_token_latency=args.first_token_latency,
+                        prompt_token_latency=args.prompt_token_latency,
+                        sloppy_json_rate=args.sloppy_json_rate).start()
+    os.environ["OLLAMA_BASE_URL"] = ollama.url
+    os.environ.setdefault("CREWAI_TRACING_ENABLED", "false")
+    os.environ.setdefault("OTEL_SDK_DISABLED", "true")
+    # Process-local memo and checkpoints: a second run must not start with the first one's answers
+    os.environ["LLM_MEMO_PATH"] = ":memory:"
+    os.environ["FLOW_CHECKPOINT_PATH"] = ":memory:"
+    if args.llm_router:
+        os.environ["ROUTER_CONFIDENCE_THRESHOLD"] = "2"  # above any score: always ask the Manager LLM
+
+    from calendar_assistant_flow.main import run_question, warmup
+    from calendar_assistant_flow.prompts import prompt_stats
+    from calendar_assistant_flow.stream import stream_question
+    from calendar_assistant_flow.structured import STRUCTURED_OUTPUT, structured_stats
+    from calendar_assistant_flow.tools.calendar_client import calendar_clients
+    from calendar_assistant_flow.tools.fake_calendar import InMemoryCalendarService
+    from calendar_assistant_flow.tools.google_api import google_api
+
+    # No real quota behind the stand-in; pacing would only add sleeps to the numbers
+    google_api.configure(user_qpm=0, project_qpm=0)
+    calendar = InMemoryCalendarService()
+    today = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+    calendar.seed(args.events, start=today - timedelta(days=args.days // 2), days=args.days)
+    calendar_clients.override(calendar)
+    warmup()
+
+    results = {}
+    # Flow and tool logging is noisy; keep it out of the report
+    real_stdout, sink = sys.stdout, open(os.devnull, "w")
+    try:
+        for path, questions in QUESTIONS.items():
+            latencies, llm_calls, round_trips, quota, errors = [], [], [], [], 0
+            first_event, first_token = [], []
+            for i in range(args.requests):
+                question = questions[i % len(questions)]
+                calls0, trips0 = ollama.calls, calendar.round_trips
+                t0 = time.perf_counter()
+                sys.stdout = sink
+                try:
+                    if args.stream:
+                        out, first, token = _streamed(stream_question(question))
+                        first_event.append(first)
+                        if token is not None:
+                            first_token.append(token)
+                    else:
+                        out = run_question(question)
+                    errors += sorted(out["chosen_assistant"]) != sorted(path.split("+"))
+                    quota.append(out["google_quota"])
+                except Exception:
+                    errors += 1
+                finally:
+                    sys.stdout = real_stdout
+                latencies.append((time.perf_counter() - t0) * 1000)
+                llm_calls.append(ollama.calls - calls0)
+                round_trips.append(calendar.round_trips - trips0)
+            results[path] = {
+                "requests": args.requests,
+                "errors": errors,
+                "p50_ms": round(_pct(latencies, 0.50), 1),
+                "p95_ms": round(_pct(latencies, 0.95), 1),
+                "p99_ms": round(_pct(latencies, 0.99), 1),
+                "llm_calls_per_request": round(sum(llm_calls) / len(llm_calls), 2),
+                "api_round_trips_per_request": round(sum(round_trips) / len(round_trips), 2),
+                "google_quota_per_request": round(sum(quota) / len(quota), 2) if quota else None,
+            }
+            if args.stream:
+                results[path]["first_event_p50_ms"] = round(_pct(first_event, 0.50), 1)
+                results[path]["first_token_p50_ms"] = round(_pct(first_token, 0.50), 1) if first_token else None
+    finally:
+        sys.stdout = real_stdout
+        calendar_clients.override(None)
+        ollama.stop()
+
+    print(f"{'path':<56} {'p50':>8} {'p95':>8} {'p99':>8} {'llm/req':>8} {'api/req':>8} {'quota':>6} {'err':>4}")
+    for path, r in results.items():
+        print(f"{path:<56} {r['p50_ms']:>8.1f} {r['p95_ms']:>8.1f} {r['p99_ms']:>8.1f} "
+              f"{r['llm_calls_per_request']:>8.2f} {r['api_round_trips_per_request']:>8.2f} "
+              f"{r['google_quota_per_request'] or 0:>6.2f} {r['errors']:>4}")
+    if args.stream:
+        print(f"\n{'path':<56} {'first event p50':>16} {'first token p50':>16} {'total p50':>10}")
+        for path, r in results.items():
+            token = r["first_token_p50_ms"]
+            print(f"{path:<56} {r['first_event_p50_ms']:>16.1f} {'-' if token is None else f'{token:.1f}':>16} "
+                  f"{r['p50_ms']:>10.1f}")
+    structured = structured_stats.snapshot()
+    print(f"\nstructured output {'on' if STRUCTURED_OUTPUT else 'off'}; "
+          f"{ollama.constrained_calls}/{ollama.calls} LLM calls schema-constrained")
+    print(f"{'schema':<20} {'total':>6} {'direct':>7} {'convert':>8} {'repair':>7} {'failed':>7} {'retry%':>7}")
+    for schema, s in structured.items():
+        print(f"{schema:<20} {s['total']:>6} {s.get('direct', 0):>7} {s.get('converted', 0):>8} "
+              f"{s.get('repaired', 0):>7} {s.get('failed', 0):>7} {100 * s['retry_rate']:>7.1f}")
+    prompts = prompt_stats.snapshot()
+    print(f"\nprompt tokens: {ollama.prompt_tokens} sent, {ollama.prompt_tokens_evaluated} evaluated "
+          f"({100 * (1 - ollama.prompt_tokens_evaluated / max(ollama.prompt_tokens, 1)):.1f}% from cache)")
+    print(f"{'task':<28} {'calls':>6} {'avg':>6} {'max':>6} {'eval avg':>9} {'budget':>7} {'over':>5}")
+    for task, p in prompts.items():
+        print(f"{task:<28} {p['calls']:>6} {p['avg_prompt_tokens']:>6} {p['max_prompt_tokens']:>6} "
+              f"{p['avg_evaluated_tokens'] if p['avg_evaluated_tokens'] is not None else '-':>9} "
+              f"{p['budget'] or '-':>7} {p['over_budget']:>5}")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"settings": vars(args), "results": results, "structured_output": structured,
+                       "prompts": prompts}, f, indent=2)
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--requests", type=int, default=20, help="requests per path")
+    ap.add_argument("--events", type=int, default=5_000, help="events seeded into the fake calendar")
+    ap.add_argument("--days", type=int, default=365, help="days the seeded events are spread over")
+    ap.add_argument("--token-latency", type=float, default=0.002, help="seconds per generated token")
+    ap.add_argument("--first-token-latency", type=float, default=0.05, help="fixed seconds before the first token")
+    ap.add_argument("--prompt-token-latency", type=float, default=0.0005,
+                    help="seconds per prompt token evaluated (cached prefixes are free)")
+    ap.add_argument("--llm-router", action="store_true", help="route every question through the Manager LLM")
+    ap.add_argument("--sloppy-json-rate", type=float, default=0.0,
+                    help="share of unconstrained JSON answers the fake LLM garbles")
+    ap.add_argument("--stream", action="store_true",
+                    help="run questions through stream_question and time the first event and token")
+    ap.add_argument("--json", help="also write the results to this file")
+    run(ap.parse_args())
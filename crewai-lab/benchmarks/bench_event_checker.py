@@ -0,0 +1,50 @@
+"""EventCheckerTool: full listing vs. server-side windowed listing.
+
+Runs the tool against the in-memory Calendar stand-in for growing calendar
+sizes and reports pages fetched, response bytes and wall time for a one-day
+query. The executor's per-minute quota pacing is switched off, so the times
+are the listing's own. Both modes must find the same events; a run where they don't fails.
+
+    PYTHONPATH=src python benchmarks/bench_event_checker.py
+"""
+import argparse
+import time
+from datetime import datetime, timezone
+
+from calendar_assistant_flow.tools.calendar_client import calendar_clients
+from calendar_assistant_flow.tools.custom_tool import EventCheckerTool
+from calendar_assistant_flow.tools.fake_calendar import InMemoryCalendarService
+from calendar_assistant_flow.tools.google_api import google_api
+
+
+def run(sizes, days):
+    query_day = "June 15, 2025, 12:00AM"
+    print(f"{'events':>8} {'mode':>9} {'pages':>6} {'bytes':>12} {'ms':>9} {'hits':>5}")
+    for n in sizes:
+        service = InMemoryCalendarService()
+        service.seed(n, start=datetime(2024, 1, 1, tzinfo=timezone.utc), days=days)
+        calendar_clients.override(service)
+        hits = {}
+        try:
+            for mode, windowed in (("full", False), ("windowed", True)):
+                tool = EventCheckerTool(server_window=windowed)
+                service.reset_counters()
+                t0 = time.perf_counter()
+                out = tool._run(start=query_day, end=query_day)
+                ms = (time.perf_counter() - t0) * 1000
+                hits[mode] = len(out)
+                print(f"{n:>8} {mode:>9} {service.round_trips:>6} {service.bytes_returned:>12,} {ms:>9.1f} {len(out):>5}")
+        finally:
+            calendar_clients.override(None)
+        if len(set(hits.values())) > 1:
+            raise SystemExit(f"{n} events: modes disagree on the events found: {hits}")
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--sizes", type=int, nargs="+", default=[500, 2_000, 10_000, 50_000])
+    ap.add_argument("--days", type=int, default=3 * 365, help="days the seeded events are spread over")
+    args = ap.parse_args()
+    # Offline: no Google quota to respect, and pacing would dominate the full-listing times
+    google_api.configure(user_qpm=0, project_qpm=0)
+    run(args.sizes, args.days)
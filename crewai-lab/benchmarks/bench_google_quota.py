@@ -0,0 +1,109 @@
+"""Calendar tools under a rate-limited quota: bare calls vs. the quota-aware executor.
+
+Threads hammer the availability and event-listing tools against the
+in-memory Calendar stand-in, which rejects requests beyond --qps in any one
+second with 403 rateLimitExceeded. Each executor policy is run in turn:
+
+    bare           no pacing, no retries (every rejection fails the tool call)
+    retry          jittered exponential backoff on rate limits
+    bucket+retry   token buckets paced just under the quota, plus backoff
+
+Reports tool calls that succeeded/failed, requests the fake rejected, retries,
+identical reads collapsed, quota units spent and HTTP round trips (a
+multi-window availability check goes out as one batch), with p50/p95 latency.
+
+    PYTHONPATH=src python benchmarks/bench_google_quota.py
+    PYTHONPATH=src python benchmarks/bench_google_quota.py --threads 32 --calls 10 --qps 20
+"""
+import argparse
+import contextvars
+import os
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+# Every call should reach the executor, not the query cache
+os.environ["QUERY_CACHE_TTL_SECONDS"] = "0"
+
+from calendar_assistant_flow.tools.calendar_client import calendar_clients
+from calendar_assistant_flow.tools.custom_tool import EventCheckerTool, TimeAvailabilityTool
+from calendar_assistant_flow.tools.fake_calendar import InMemoryCalendarService
+from calendar_assistant_flow.tools.google_api import google_api, metered
+
+POLICIES = {
+    "bare": dict(user_qpm=0, project_qpm=0, max_retries=0),
+    "retry": dict(user_qpm=0, project_qpm=0, max_retries=8),
+    "bucket+retry": None,  # filled in from --qps
+}
+
+
+def _pct(values, q):
+    values = sorted(values)
+    return values[min(int(q * len(values)), len(values) - 1)] if values else float("nan")
+
+
+def _worker(n: int, calls: int, range_days: int, latencies: list, failures: list, lock: threading.Lock):
+    base = datetime(2025, 1, 1)
+    for i in range(calls):
+        t0 = time.perf_counter()
+        try:
+            if i % 2:
+                # Same day from every thread: concurrent identical reads collapse
+                EventCheckerTool(server_window=True)._run(start="June 15, 2025, 12:00AM", end="June 15, 2025, 12:00AM")
+            else:
+                # A distinct multi-window range per call, sent as one batch of freebusy queries
+                st = base + timedelta(days=n * calls + i)
+                TimeAvailabilityTool()._run(start=st.strftime("%B %d, %Y, %I:%M%p"),
+                                            end=(st + timedelta(days=range_days)).strftime("%B %d, %Y, %I:%M%p"))
+            ok = True
+        except Exception:
+            ok = False
+        with lock:
+            latencies.append((time.perf_counter() - t0) * 1000)
+            failures.append(not ok)
+
+
+def run(args):
+    # A bucket's burst equals one second of its rate, so half the quota keeps any one-second window under it
+    POLICIES["bucket+retry"] = dict(user_qpm=args.qps * 30, project_qpm=args.qps * 30, max_retries=8)
+    print(f"{args.threads} threads x {args.calls} tool calls, fake quota {args.qps:g} requests/s\n")
+    print(f"{'policy':<14} {'ok':>5} {'failed':>7} {'rejected':>9} {'retries':>8} {'collapsed':>10} "
+          f"{'quota':>6} {'trips':>6} {'p50 ms':>9} {'p95 ms':>9} {'wall s':>7}")
+    for name, policy in POLICIES.items():
+        service = InMemoryCalendarService(qps_limit=args.qps)
+        service.seed(args.events, start=datetime(2025, 1, 1, tzinfo=timezone.utc), days=365)
+        calendar_clients.override(service)
+        google_api.configure(backoff_base=args.backoff_base, **policy)
+        google_api.reset_stats()
+        # Start each run with a full second of quota
+        time.sleep(1.0)
+        latencies, failures, lock = [], [], threading.Lock()
+        t0 = time.perf_counter()
+        try:
+            with metered() as quota:
+                # Copy the context so the meter sees every thread's calls
+                threads = [threading.Thread(target=contextvars.copy_context().run,
+                                            args=(_worker, n, args.calls, args.range_days, latencies, failures, lock))
+                           for n in range(args.threads)]
+                for t in threads:
+                    t.start()
+                for t in threads:
+                    t.join()
+        finally:
+            calendar_clients.override(None)
+        wall = time.perf_counter() - t0
+        stats = google_api.stats()
+        print(f"{name:<14} {failures.count(False):>5} {failures.count(True):>7} {service.rejected:>9} "
+              f"{stats.get('retries', 0):>8} {stats.get('collapsed', 0):>10} {quota.units:>6} {service.round_trips:>6} "
+              f"{_pct(latencies, 0.50):>9.1f} {_pct(latencies, 0.95):>9.1f} {wall:>7.2f}")
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--threads", type=int, default=16)
+    ap.add_argument("--calls", type=int, default=6, help="tool calls per thread")
+    ap.add_argument("--qps", type=float, default=25, help="requests per second the fake accepts")
+    ap.add_argument("--events", type=int, default=2_000, help="events seeded into the fake calendar")
+    ap.add_argument("--range-days", type=int, default=150, help="availability range (60-day windows per query)")
+    ap.add_argument("--backoff-base", type=float, default=0.2, help="seconds; first retry waits up to this")
+    run(ap.parse_args())
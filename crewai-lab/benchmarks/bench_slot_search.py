@@ -0,0 +1,143 @@
+"""Slot search scaling over people x days: occupancy bitmaps vs. a per-day interval scan.
+
+Each person gets --meetings random meetings per working day. For every
+(people, days) pair the benchmark times:
+
+    scan          reference: merge everyone's busy intervals, then walk each day's gaps
+                  in Python and take the first top-k slots (the free_slots_by_day approach)
+    find_slots    slot_search.find_slots with required attendees only (its interval scan)
+    bitmap        the bitmap engine on the same search, the path find_slots takes when
+                  optional attendees need ranking (forced here with one empty optional calendar)
+    series scan   for every start time, bisect the merged intervals on every weekday
+    series        slot_search.find_recurring_slots: the same time on every weekday, on bitmaps
+
+and checks that they all agree. The gap walk stops as soon as it has k
+slots, which is why find_slots uses it for plain searches; ranking by
+optional attendees or scoring a recurring series has to look at every day
+anyway, and that is where the bitmap can win.
+
+    PYTHONPATH=src python benchmarks/bench_slot_search.py
+    PYTHONPATH=src python benchmarks/bench_slot_search.py --people 2 10 50 --days 5 30 365
+"""
+import argparse
+import random
+import time as clock
+from bisect import bisect_right
+from datetime import date, datetime, time, timedelta
+from zoneinfo import ZoneInfo
+
+from calendar_assistant_flow.tools.intervals import merge_intervals
+from calendar_assistant_flow.tools.slot_search import find_recurring_slots, find_slots
+
+TZ = ZoneInfo("Europe/Berlin")
+DAY0 = date(2025, 6, 2)  # a Monday
+
+
+def make_calendars(people: int, days: int, meetings: int, seed: int):
+    rng = random.Random(seed)
+    calendars = []
+    for _ in range(people):
+        busy = []
+        for d in range(days):
+            day = DAY0 + timedelta(days=d)
+            if day.weekday() >= 5:
+                continue
+            for _ in range(meetings):
+                start = datetime.combine(day, time(rng.randint(8, 17), rng.choice([0, 15, 30, 45])), TZ)
+                busy.append((start, start + timedelta(minutes=rng.choice([15, 30, 45, 60]))))
+        calendars.append(busy)
+    return calendars
+
+
+def scan(calendars, days: int, duration: int, top_k: int, step: int = 15):
+    """First top_k non-overlapping slots by walking each day's gaps between merged busy intervals."""
+    busy = merge_intervals(b for cal in calendars for b in cal)
+    ends = [b[1] for b in busy]
+    need = timedelta(minutes=duration)
+    slots = []
+    for d in range(days):
+        day = DAY0 + timedelta(days=d)
+        if day.weekday() >= 5:
+            continue
+        cursor, day_end = datetime.combine(day, time(9), TZ), datetime.combine(day, time(17), TZ)
+        i = bisect_right(ends, cursor)
+        while cursor + need <= day_end:
+            # Skip to the end of any busy period overlapping [cursor, cursor + duration)
+            while i < len(busy) and busy[i][1] <= cursor:
+                i += 1
+            if i < len(busy) and busy[i][0] < cursor + need:
+                cursor = busy[i][1]
+                # Back onto the step grid
+                offset = (cursor.hour * 60 + cursor.minute) % step
+                if offset or cursor.second:
+                    cursor = cursor.replace(second=0, microsecond=0) + timedelta(minutes=step - offset)
+                continue
+            slots.append(cursor)
+            if len(slots) == top_k:
+                return slots
+            cursor += need
+    return slots
+
+
+def scan_recurring(calendars, days: int, duration: int, step: int = 15):
+    """(start time, weekdays free) of the best series: most days free, then earliest."""
+    busy = merge_intervals(b for cal in calendars for b in cal)
+    ends = [b[1] for b in busy]
+    weekdays = [DAY0 + timedelta(days=d) for d in range(days) if (DAY0 + timedelta(days=d)).weekday() < 5]
+    best = None
+    for minute in range(9 * 60, 17 * 60 - duration + 1, step):
+        at = time(minute // 60, minute % 60)
+        free = 0
+        for day in weekdays:
+            start = datetime.combine(day, at, TZ)
+            i = bisect_right(ends, start)
+            free += i == len(busy) or busy[i][0] >= start + timedelta(minutes=duration)
+        if free and (best is None or free > best[1]):
+            best = (at, free)
+    return best
+
+
+def _timed(fn, repeat: int):
+    best, out = float("inf"), None
+    for _ in range(repeat):
+        t0 = clock.perf_counter()
+        out = fn()
+        best = min(best, clock.perf_counter() - t0)
+    return best * 1000, out
+
+
+def run(args):
+    print(f"duration {args.duration}min, top {args.top_k}, {args.meetings} meetings/person/weekday, best of {args.repeat}\n")
+    print(f"{'people':>6} {'days':>5} {'intervals':>10} {'scan ms':>9} {'find_slots':>11} {'bitmap ms':>10} {'series scan':>12} "
+          f"{'series ms':>10} {'first slot':>12} {'series':>12} {'agree':>6}")
+    for people in args.people:
+        for days in args.days:
+            calendars = make_calendars(people, days, args.meetings, args.seed)
+            scan_ms, scanned = _timed(lambda: scan(calendars, days, args.duration, args.top_k), args.repeat)
+            find_ms, slots = _timed(lambda: find_slots(calendars, DAY0, days, TZ, args.duration,
+                                                       top_k=args.top_k), args.repeat)
+            # An (empty) optional calendar sends find_slots down the bitmap path; same ranking otherwise
+            bitmap_ms, ranked = _timed(lambda: find_slots(calendars, DAY0, days, TZ, args.duration, optional=[[]],
+                                                          top_k=args.top_k), args.repeat)
+            series_scan_ms, best_series = _timed(lambda: scan_recurring(calendars, days, args.duration), args.repeat)
+            series_ms, series = _timed(lambda: find_recurring_slots(calendars, DAY0, days, TZ, args.duration,
+                                                                    top_k=args.top_k), args.repeat)
+            # Both sides use the same 15-minute grid and tie-breaks, so they must agree
+            agree = [s.start for s in slots] == scanned == [s.start for s in ranked] and (
+                (series[0].start, series[0].days_free) == best_series if series else best_series is None)
+            first = slots[0].start.strftime("%m-%d %H:%M") if slots else "-"
+            best = f"{series[0].start:%H:%M} {series[0].days_free}/{series[0].days}" if series else "-"
+            print(f"{people:>6} {days:>5} {sum(map(len, calendars)):>10} {scan_ms:>9.2f} {find_ms:>11.2f} {bitmap_ms:>10.2f} "
+                  f"{series_scan_ms:>12.2f} {series_ms:>10.2f} {first:>12} {best:>12} {str(agree):>6}")
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--people", type=int, nargs="+", default=[2, 6, 20, 50])
+    ap.add_argument("--days", type=int, nargs="+", default=[7, 28, 90, 365])
+    ap.add_argument("--meetings", type=int, default=2, help="meetings per person per weekday")
+    ap.add_argument("--duration", type=int, default=30, help="meeting length in minutes")
+    ap.add_argument("--top-k", type=int, default=5)
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--seed", type=int, default=7)
+    run(ap.parse_args())
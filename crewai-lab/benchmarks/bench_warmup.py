@@ -0,0 +1,88 @@
+"""Cold vs. warm LLM latency per model tier, with and without warm-up/keep-alive.
+
+For each tier's model: unload it and time one short call (cold: includes the
+model load), then the same call again (warm). Then unload everything, time
+warm_up() and a first call per model after it. Finally, after a warm_up() and
+one call per model (which resets each expiry to the server default), let the
+models sit idle longer than that default and time a call, without and with
+the KeepAlive refresher running.
+
+    PYTHONPATH=src python benchmarks/bench_warmup.py                    # fake Ollama, 3s model load
+    PYTHONPATH=src python benchmarks/bench_warmup.py --load-latency 8 --idle 4
+    PYTHONPATH=src python benchmarks/bench_warmup.py --ollama http://localhost:11434 --idle 330
+
+Against a real server, --idle must exceed its keep-alive (5m by default).
+"""
+import argparse
+import os
+import time
+
+from fake_ollama import FakeOllama
+
+
+def _timed_call(llm) -> float:
+    t0 = time.perf_counter()
+    llm.call("Reply with the single word OK.")
+    return round((time.perf_counter() - t0) * 1000, 1)
+
+
+def run(args):
+    fake = None
+    if args.ollama:
+        os.environ["OLLAMA_BASE_URL"] = args.ollama
+    else:
+        # Default keep-alive shorter than --idle, so idling unloads the models like a real server would
+        fake = FakeOllama([], token_latency=args.token_latency, load_latency=args.load_latency,
+                          default_keep_alive=args.idle / 2).start()
+        os.environ["OLLAMA_BASE_URL"] = fake.url
+    os.environ.setdefault("CREWAI_TRACING_ENABLED", "false")
+    os.environ.setdefault("OTEL_SDK_DISABLED", "true")
+
+    from calendar_assistant_flow.llm import ollama_llm
+    from calendar_assistant_flow.ollama import MODEL_TIERS, KeepAlive, unload_model, warm_up
+
+    llms = {tier: ollama_llm(model, temperature=0.0) for tier, model in MODEL_TIERS.items()}
+    rows = []
+    try:
+        for tier, llm in llms.items():
+            unload_model(MODEL_TIERS[tier])
+            rows.append((tier, "cold (first call after unload)", _timed_call(llm)))
+            rows.append((tier, "warm (second call)", _timed_call(llm)))
+
+        for model in MODEL_TIERS.values():
+            unload_model(model)
+        for model, ms in warm_up(MODEL_TIERS.values()).items():
+            tier = next(t for t, m in MODEL_TIERS.items() if m == model)
+            rows.append((tier, "warm_up() load", ms))
+        for tier, llm in llms.items():
+            rows.append((tier, "first call after warm_up()", _timed_call(llm)))
+
+        for label, refresher in (("no keep-alive", None), ("keep-alive on", KeepAlive(interval=args.idle / 4))):
+            warm_up(MODEL_TIERS.values())
+            if refresher is not None:
+                refresher.start(MODEL_TIERS.values())
+            try:
+                for llm in llms.values():
+                    _timed_call(llm)
+                time.sleep(args.idle)
+                for tier, llm in llms.items():
+                    rows.append((tier, f"after {args.idle:g}s idle, {label}", _timed_call(llm)))
+            finally:
+                if refresher is not None:
+                    refresher.stop()
+    finally:
+        if fake is not None:
+            fake.stop()
+
+    print(f"{'tier':<6} {'model':<16} {'measurement':<36} {'ms':>9}")
+    for tier, what, ms in rows:
+        print(f"{tier:<6} {MODEL_TIERS[tier]:<16} {what:<36} {ms:>9.1f}")
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--ollama", help="real Ollama base URL (default: local fake)")
+    ap.add_argument("--load-latency", type=float, default=3.0, help="fake: seconds to load a model")
+    ap.add_argument("--token-latency", type=float, default=0.01, help="fake: seconds per generated token")
+    ap.add_argument("--idle", type=float, default=2.0, help="seconds to sit idle before the idle measurements")
+    run(ap.parse_args())
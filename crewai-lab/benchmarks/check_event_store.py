@@ -0,0 +1,104 @@
+"""EventStore sync paths against the in-memory Calendar stand-in.
+
+Mirrors a seeded calendar into an EventStore and checks, after each step,
+that the mirror holds exactly the calendar's events:
+
+    full             first sync pages through the whole calendar
+    delta            inserts, a patch and a delete come back through the syncToken; the delete as "cancelled"
+    410 -> full      an expired sync token (410 Gone) starts a full resync
+    failed resync    a page failing halfway through a full resync leaves the previous events and token
+    recovered        the next sync after the failure completes it
+
+Exits with status 1 if any step does not hold.
+
+    PYTHONPATH=src python benchmarks/check_event_store.py
+    PYTHONPATH=src python benchmarks/check_event_store.py --events 20000
+"""
+import argparse
+import sys
+from datetime import datetime, timedelta, timezone
+
+from googleapiclient.errors import HttpError
+
+from calendar_assistant_flow.tools.calendar_client import calendar_clients
+from calendar_assistant_flow.tools.event_store import SYNC_PAGE_SIZE, EventStore
+from calendar_assistant_flow.tools.fake_calendar import InMemoryCalendarService, _http_error
+from calendar_assistant_flow.tools.google_api import google_api
+
+
+def _mirrored(store: EventStore) -> dict:
+    rows = store._db.execute("SELECT id, summary FROM events WHERE calendar_id = 'primary'").fetchall()
+    return dict(rows)
+
+
+def _expected(service: InMemoryCalendarService) -> dict:
+    return {ev["id"]: ev.get("summary") for ev in service.calendars["primary"]}
+
+
+def run(n_events: int) -> bool:
+    service = InMemoryCalendarService()
+    start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    service.seed(n_events, start=start, days=365)
+    store = EventStore(":memory:", sync_interval=0)
+    results = []
+
+    def check(step: str, mode: str, expected_mode: str, extra: bool = True) -> None:
+        ok = mode == expected_mode and _mirrored(store) == _expected(service) and extra
+        results.append(ok)
+        print(f"{step:<15} {mode:>8} {store.count():>8} {store.stats['pages']:>6} {'ok' if ok else 'FAILED':>7}")
+
+    print(f"{'step':<15} {'mode':>8} {'events':>8} {'pages':>6} {'result':>7}")
+    calendar_clients.override(service)
+    try:
+        check("full", store.sync(service), "full")
+
+        events = service.events()
+        when = start + timedelta(days=30, hours=9)
+        for i in range(3):
+            events.insert(body={"summary": f"Added {i}", "start": {"dateTime": (when + timedelta(hours=i)).isoformat()},
+                                "end": {"dateTime": (when + timedelta(hours=i, minutes=30)).isoformat()}}).execute()
+        events.patch(eventId="evt000001", body={"summary": "Renamed"}).execute()
+        events.delete(eventId="evt000002").execute()
+        pages = store.stats["pages"]
+        mode = store.sync(service)
+        check("delta", mode, "delta", store.stats["pages"] == pages + 1 and "evt000002" not in _mirrored(store))
+
+        service.expire_sync_tokens()
+        check("410 -> full", store.sync(service), "full")
+
+        # Expire the token again and fail the second page of the resync that follows
+        events.delete(eventId="evt000003").execute()
+        service.expire_sync_tokens()
+        before, token = _mirrored(store), store._sync_token("primary")
+        list_page = service._list
+
+        def failing_list(calendar_id, params):
+            if params.get("pageToken") and not params.get("syncToken"):
+                raise _http_error(503, "backendError")
+            return list_page(calendar_id, params)
+
+        service._list = failing_list
+        try:
+            store.sync(service)
+            mode = "no error"
+        except HttpError:
+            mode = "error"
+        service._list = list_page
+        ok = mode == "error" and _mirrored(store) == before and store._sync_token("primary") == token
+        results.append(ok)
+        print(f"{'failed resync':<15} {mode:>8} {store.count():>8} {store.stats['pages']:>6} {'ok' if ok else 'FAILED':>7}")
+
+        check("recovered", store.sync(service), "full", "evt000003" not in _mirrored(store))
+    finally:
+        calendar_clients.override(None)
+    return all(results)
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--events", type=int, default=2 * SYNC_PAGE_SIZE + 500,
+                    help="seeded events (more than one page, so a resync can fail halfway)")
+    args = ap.parse_args()
+    # Fail on the first error (no retries) and don't pace the offline calls
+    google_api.configure(user_qpm=0, project_qpm=0, max_retries=0)
+    sys.exit(0 if run(args.events) else 1)
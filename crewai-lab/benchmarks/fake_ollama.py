@@ -0,0 +1,332 @@
+"""Stand-in for the Ollama HTTP API with scripted answers and simulated token latency.
+
+Serves /api/tags, /api/show, /api/chat and /api/generate (streaming and
+non-streaming). Each request is answered by the first rule in the script
+whose pattern matches the prompt; the answer is "generated" at
+``token_latency`` seconds per token (words approximate tokens), after a
+``first_token_latency`` delay plus ``prompt_token_latency`` seconds per
+prompt token evaluated (four characters approximate a token).
+
+Prompt evaluation is cached like llama.cpp does it: each model keeps the
+prompts of its last ``cache_slots`` requests, and a new prompt only
+evaluates what follows the longest prefix it shares with one of them. The
+count is reported as ``prompt_eval_count``.
+
+Models are "loaded" on demand like Ollama does: a request for a model that is
+not resident first waits ``load_latency`` seconds. A request's top-level
+``keep_alive`` (Ollama duration or seconds; 0 unloads, negative pins) sets
+how long the model stays resident, ``default_keep_alive`` when absent. A
+/api/generate request without a prompt only loads or unloads, and /api/ps
+lists resident models.
+
+``sloppy_json_rate`` imitates a small model ignoring "JSON only": that share
+of JSON answers comes back wrapped in prose and a code fence, as a Python
+dict literal or with a trailing comma, unless the request sets ``format``
+(structured output), which the fake honours like Ollama does by returning
+the bare JSON.
+
+    server = FakeOllama(script=calendar_script(), token_latency=0.002)
+    server.start()            # OLLAMA_BASE_URL=server.url
+    ...
+    server.calls, server.tokens_out, server.loads, server.prompt_tokens, server.prompt_tokens_evaluated
+    server.stop()
+"""
+import ast
+import json
+import os
+import random
+import re
+import threading
+import time
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, List, Optional, Tuple
+
+# (pattern, reply): reply builds the answer from the full prompt
+Rule = Tuple["re.Pattern[str]", Callable[[str], str]]
+
+
+def _duration(value) -> Optional[float]:
+    """Seconds in an Ollama keep_alive ("30m", "1h", "10s", 300, -1), None if unset."""
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    m = re.fullmatch(r"(-?[\d.]+)(ms|s|m|h)?", str(value).strip())
+    if not m:
+        return None
+    return float(m[1]) * {"ms": 0.001, "s": 1, "m": 60, "h": 3600, None: 1}[m[2]]
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: "_Server"
+
+    def _send_json(self, payload: dict) -> None:
+        body = json.dumps(payload).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        fake = self.server.fake
+        if self.path == "/api/tags":
+            self._send_json({"models": [{"name": m, "model": m} for m in fake.models]})
+        elif self.path == "/api/ps":
+            self._send_json({"models": [{"name": m, "model": m, "expires_at": expires}
+                                        for m, expires in fake.resident().items()]})
+        else:
+            self.send_error(404)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        req = json.loads(self.rfile.read(length) or b"{}")
+        if self.path == "/api/show":
+            self._send_json({"template": "", "details": {"family": "llama"}, "model_info": {}})
+            return
+        if self.path not in ("/api/chat", "/api/generate"):
+            self.send_error(404)
+            return
+
+        fake = self.server.fake
+        chat = self.path == "/api/chat"
+        if not chat and "prompt" not in req:
+            unload = _duration(req.get("keep_alive")) == 0
+            if unload:
+                fake.unload(req.get("model"))
+            else:
+                fake.ensure_loaded(req.get("model"), req.get("keep_alive"))
+            self._send_json({"model": req.get("model"), "response": "", "done": True,
+                             "done_reason": "unload" if unload else "load"})
+            return
+        fake.ensure_loaded(req.get("model"), req.get("keep_alive"))
+        prompt = (
+            "\n".join(str(m.get("content", "")) for m in req.get("messages", []))
+            if chat else req.get("prompt", "")
+        )
+        answer = fake.answer(prompt, constrained=bool(req.get("format")))
+        tokens = re.findall(r"\S+\s*", answer) or [answer]
+        prompt_tokens = fake.evaluate(req.get("model"), prompt)
+
+        def chunk(text: str, done: bool) -> dict:
+            base = {"model": req.get("model"), "created_at": datetime.utcnow().isoformat() + "Z", "done": done}
+            if chat:
+                base["message"] = {"role": "assistant", "content": text}
+            else:
+                base["response"] = text
+            if done:
+                base.update(done_reason="stop", prompt_eval_count=prompt_tokens, eval_count=len(tokens))
+            return base
+
+        time.sleep(fake.first_token_latency + fake.prompt_token_latency * prompt_tokens)
+        if req.get("stream", True):
+            self.send_response(200)
+            self.send_header("Content-Type", "application/x-ndjson")
+            self.end_headers()
+            for tok in tokens:
+                time.sleep(fake.token_latency)
+                self.wfile.write((json.dumps(chunk(tok, False)) + "\n").encode())
+                self.wfile.flush()
+            self.wfile.write((json.dumps(chunk("", True)) + "\n").encode())
+        else:
+            time.sleep(fake.token_latency * len(tokens))
+            self._send_json(chunk(answer, True))
+        fake._record(len(tokens))
+
+    def log_message(self, fmt, *args):
+        pass
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    fake: "FakeOllama"
+
+
+class FakeOllama:
+    def __init__(self, script: List[Rule], models=("llama3.1:8b", "llama3.2:3b"), token_latency: float = 0.0,
+                 first_token_latency: float = 0.0, prompt_token_latency: float = 0.0, cache_slots: int = 1,
+                 sloppy_json_rate: float = 0.0,
+                 load_latency: float = 0.0, default_keep_alive: float = 300.0,
+                 host: str = "127.0.0.1", port: int = 0, seed: int = 0):
+        self.script = script
+        self.sloppy_json_rate = sloppy_json_rate
+        self._random = random.Random(seed)
+        self.models = list(models)
+        self.token_latency = token_latency
+        self.first_token_latency = first_token_latency
+        self.prompt_token_latency = prompt_token_latency
+        self.cache_slots = cache_slots
+        self._cached: dict = {}  # model -> prompts held by its slots, most recent last
+        self.load_latency = load_latency
+        self.default_keep_alive = default_keep_alive
+        self._lock = threading.Lock()
+        self._expires: dict = {}  # resident model -> monotonic unload time
+        self.loads = 0
+        self.calls = 0
+        self.constrained_calls = 0
+        self.tokens_out = 0
+        self.prompt_tokens = 0
+        self.prompt_tokens_evaluated = 0
+        self._httpd = _Server((host, port), _Handler)
+        self._httpd.fake = self
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def resident(self) -> dict:
+        now = time.monotonic()
+        with self._lock:
+            return {m: (datetime.utcnow() + timedelta(seconds=min(t - now, 10 ** 9))).isoformat() + "Z"
+                    for m, t in self._expires.items() if t > now}
+
+    def ensure_loaded(self, model: str, keep_alive=None) -> None:
+        """Pay ``load_latency`` if ``model`` is not resident, then reset its expiry."""
+        with self._lock:
+            cold = self._expires.get(model, 0) <= time.monotonic()
+            if cold:
+                self.loads += 1
+        if cold:
+            time.sleep(self.load_latency)
+        ttl = _duration(keep_alive)
+        ttl = self.default_keep_alive if ttl is None else float("inf") if ttl < 0 else ttl
+        with self._lock:
+            self._expires[model] = time.monotonic() + ttl
+
+    def unload(self, model: str) -> None:
+        with self._lock:
+            self._expires.pop(model, None)
+
+    def evaluate(self, model: str, prompt: str) -> int:
+        """Prompt tokens ``model`` has to evaluate: those after the longest prefix a cached slot shares."""
+        with self._lock:
+            slots = self._cached.setdefault(model, [])
+            best = max(slots, key=lambda cached: len(os.path.commonprefix([cached, prompt])), default="")
+            evaluated = (len(prompt) - len(os.path.commonprefix([best, prompt]))) // 4
+            # The slot that matched best is reused for this prompt; otherwise the oldest one
+            if best in slots:
+                slots.remove(best)
+            elif len(slots) >= self.cache_slots:
+                slots.pop(0)
+            slots.append(prompt)
+            self.prompt_tokens += len(prompt) // 4
+            self.prompt_tokens_evaluated += evaluated
+        return evaluated
+
+    def answer(self, prompt: str, constrained: bool = False) -> str:
+        for pattern, reply in self.script:
+            if pattern.search(prompt):
+                answer = reply(prompt)
+                break
+        else:
+            return "Final Answer: I don't know."
+        with self._lock:
+            self.constrained_calls += constrained
+            sloppy = self._random.random() < self.sloppy_json_rate
+        if sloppy and not constrained and answer.startswith("{"):
+            return self._random.choice([
+                f"Sure! Here is the JSON you asked for:\n```json\n{answer}\n```\nLet me know if you need anything else.",
+                repr(json.loads(answer)),
+                answer[:-1] + ",}",
+            ])
+        return answer
+
+    def _record(self, tokens: int) -> None:
+        with self._lock:
+            self.calls += 1
+            self.tokens_out += tokens
+
+    def start(self) -> "FakeOllama":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+
+# ----------------- Script for the calendar assistant -----------------
+_EMAIL = re.compile(r"[\w.+-]+@[\w-]+\.[\w.]+")
+_QUESTION = re.compile(r"^Question: (.*)$", re.M)
+_DATES = re.compile(r'"start":\s*"([^"]+)",\s*"end":\s*"([^"]+)"')
+_OBSERVATION = re.compile(r"Observation:\s*(.*)", re.S)
+
+
+def _question(prompt: str) -> str:
+    m = _QUESTION.search(prompt)
+    return m[1] if m else prompt
+
+
+def _route_clause(clause: str) -> str:
+    if any(w in clause for w in ("schedule", "book", "set up", "meeting with")):
+        return "meeting_scheduler_assistant"
+    if any(w in clause for w in ("free", "available", "availability")):
+        return "availability_checker_assistant"
+    return "event_checker_assistant"
+
+
+def _route(prompt: str) -> str:
+    clauses = re.split(r"(?:,| and| then)+\s+(?=(?:when|am i|do i|show|what|book|schedule|set up)\b)",
+                       _question(prompt).lower())
+    agents = list(dict.fromkeys(_route_clause(c) for c in clauses))
+    return json.dumps({"agent": agents[0], "agents": agents, "reason": "scripted"})
+
+
+def _craft(prompt: str) -> str:
+    start = (datetime.now() + timedelta(days=1)).replace(hour=10, minute=0, second=0, microsecond=0)
+    return json.dumps({
+        "summary": "Sync", "location": "", "description": "",
+        "start": start.isoformat(timespec="seconds"),
+        "end": (start + timedelta(minutes=30)).isoformat(timespec="seconds"),
+        "attendees": sorted(set(_EMAIL.findall(_question(prompt)))),
+    })
+
+
+def _interpret(prompt: str) -> str:
+    day = datetime.now().strftime("%B %d, %Y")
+    return json.dumps({"original_query": _question(prompt), "start": f"{day}, 12:00AM",
+                       "end": f"{day}, 11:59PM", "timezone": "UTC"})
+
+
+def _tool_step(tool: str) -> Callable[[str], str]:
+    def reply(prompt: str) -> str:
+        # Only look past the task: the system prompt has a sample "Observation:" line
+        obs = _OBSERVATION.search(prompt[prompt.rfind("Current Task:"):])
+        if obs:
+            return f"Thought: I now know the final answer\nFinal Answer: {obs[1].strip()}"
+        m = _DATES.findall(prompt)
+        start, end = m[-1] if m else (datetime.now().strftime("%B %d, %Y, 12:00AM"),) * 2
+        return (f"Thought: I should use the {tool} tool\nAction: {tool}\n"
+                f"Action Input: {json.dumps({'start': start, 'end': end})}")
+    return reply
+
+
+def _convert(prompt: str) -> str:
+    """crewai's converter re-prompt: hand back the JSON the previous answer meant."""
+    m = re.search(r"\{.*\}", prompt.split("format exactly:", 1)[-1].split("\n}\n", 1)[-1], re.S)
+    text = m[0] if m else "{}"
+    for attempt in (text, re.sub(r",\s*([}\]])", r"\1", text)):
+        try:
+            return json.dumps(json.loads(attempt))
+        except ValueError:
+            try:
+                return json.dumps(ast.literal_eval(attempt))
+            except (ValueError, SyntaxError):
+                continue
+    return text
+
+
+def calendar_script() -> List[Rule]:
+    """Rules that walk every CalendarAssistantFlow path to a final answer."""
+    return [
+        (re.compile(r"Please convert the following text into valid JSON"), _convert),
+        (re.compile(r"Decide which assistants should handle"), _route),
+        (re.compile(r"Extract the meeting the question below asks for"), _craft),
+        (re.compile(r"Interpret the dates and times in the question"), _interpret),
+        (re.compile(r"Find the user's free time"), _tool_step("check availability")),
+        (re.compile(r"List the user's events"), _tool_step("event checker")),
+    ]
@@ -0,0 +1,107 @@
+"""Accuracy and latency of the fast-path router against the Manager LLM router.
+
+    PYTHONPATH=src python benchmarks/router_eval.py            # fast path only
+    PYTHONPATH=src python benchmarks/router_eval.py --llm      # also run ManagerServiceCrew (needs Ollama)
+
+Two labelled sets are scored separately:
+
+    router_eval.jsonl           questions the fast-path rules were written against
+    router_eval_heldout.jsonl   questions never used to tune the rules; leave them out of any tuning
+
+so a rule that only fits its tuning questions shows up as a gap between the
+two. Reports, for the fast path: coverage (share of questions at or above the
+confidence threshold), accuracy on the covered share, and per-question
+latency. With --llm it also reports LLM-only accuracy/latency, how often the
+fast path and the LLM router agree, and the hybrid (fast path + LLM
+fallback) numbers.
+"""
+import argparse
+import json
+import statistics
+import time
+from pathlib import Path
+
+from calendar_assistant_flow.fast_router import ROUTER_CONFIDENCE_THRESHOLD, fast_router
+
+EVAL_SETS = {
+    "tuning": Path(__file__).with_name("router_eval.jsonl"),
+    "held-out": Path(__file__).with_name("router_eval_heldout.jsonl"),
+}
+
+
+def _llm_route(question: str) -> str:
+    from calendar_assistant_flow.crews.Manager_crew.manager_crew import ManagerServiceCrew
+
+    out = ManagerServiceCrew().crew().kickoff(inputs={"question": question})
+    data = json.loads(out.raw)
+    return data.get("agents") or [data["agent"]]
+
+
+def _expected(row) -> set:
+    return set(row.get("agents") or [row["agent"]])
+
+
+def _pct(values, q):
+    values = sorted(values)
+    return values[min(int(q * len(values)), len(values) - 1)]
+
+
+def evaluate(name: str, rows: list, threshold: float, with_llm: bool) -> None:
+    fast, fast_us = [], []
+    for row in rows:
+        t0 = time.perf_counter()
+        decision = fast_router.classify(row["question"])
+        fast_us.append((time.perf_counter() - t0) * 1e6)
+        fast.append(decision)
+
+    covered = [(r, d) for r, d in zip(rows, fast) if d.confidence >= threshold]
+    correct = sum(set(d.agents) == _expected(r) for r, d in covered)
+    print(f"{name} set: {len(rows)} questions, threshold={threshold}")
+    print(f"fast path  coverage={len(covered) / len(rows):.0%}  "
+          f"accuracy(covered)={correct / max(len(covered), 1):.1%}  "
+          f"accuracy(all, forced)={sum(set(d.agents) == _expected(r) for r, d in zip(rows, fast)) / len(rows):.1%}")
+    print(f"fast path  latency p50={statistics.median(fast_us):.1f}us p99={_pct(fast_us, 0.99):.1f}us")
+
+    for r, d in zip(rows, fast):
+        if d.confidence >= threshold and set(d.agents) != _expected(r):
+            print(f"  MISROUTED ({d.confidence:.2f}) {r['question']!r} -> {d.agents}, expected {sorted(_expected(r))}")
+
+    if not with_llm:
+        return
+
+    llm, llm_ms = [], []
+    for row in rows:
+        t0 = time.perf_counter()
+        try:
+            llm.append(_llm_route(row["question"]))
+        except Exception as e:
+            llm.append([f"error: {e}"])
+        llm_ms.append((time.perf_counter() - t0) * 1000)
+
+    llm_acc = sum(set(a) == _expected(r) for a, r in zip(llm, rows)) / len(rows)
+    agree = [set(d.agents) == set(a) for d, a in zip(fast, llm)]
+    agree_covered = [ok for ok, d in zip(agree, fast) if d.confidence >= threshold]
+    hybrid = [d.agents if d.confidence >= threshold else a for d, a in zip(fast, llm)]
+    hybrid_ms = [f / 1000 if d.confidence >= threshold else m for d, f, m in zip(fast, fast_us, llm_ms)]
+    print(f"llm        accuracy={llm_acc:.1%}  latency p50={statistics.median(llm_ms):.0f}ms p99={_pct(llm_ms, 0.99):.0f}ms")
+    print(f"agreement  fast path vs llm: covered={sum(agree_covered) / max(len(agree_covered), 1):.1%}  "
+          f"all, forced={sum(agree) / len(agree):.1%}")
+    print(f"hybrid     accuracy={sum(set(a) == _expected(r) for a, r in zip(hybrid, rows)) / len(rows):.1%}  "
+          f"latency mean={statistics.mean(hybrid_ms):.0f}ms (vs {statistics.mean(llm_ms):.0f}ms llm-only)")
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--llm", action="store_true", help="also evaluate the Manager LLM router")
+    ap.add_argument("--threshold", type=float, default=ROUTER_CONFIDENCE_THRESHOLD)
+    args = ap.parse_args()
+
+    for i, (name, path) in enumerate(EVAL_SETS.items()):
+        rows = [json.loads(line) for line in path.read_text().splitlines() if line.strip()]
+        if i:
+            print()
+        evaluate(name, rows, args.threshold, args.llm)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+# batch.py
+"""Run many questions through CalendarAssistantFlow with bounded concurrency.
+
+    batch questions.jsonl --output answers.jsonl --concurrency 8 --max-llm 2 --max-google 10 --retries 2
+
+Each input line is {"id": ..., "question": "...", "user": "..."} (id
+defaults to the line number, user to GOOGLE_DEFAULT_USER). Results are
+appended to the output file as they finish, so a long run can be followed
+with tail -f and a crash keeps what was done. --max-llm and --max-google cap
+in-flight Ollama and Calendar API calls across all flows, independently of
+how many flows run at once; the per-minute Calendar quota itself is paced
+by the Google API executor (GOOGLE_USER_QPM, GOOGLE_PROJECT_QPM). A question
+that fails is retried up to --retries times under the same flow id, so each
+retry resumes from the failed run's checkpoints (see checkpoint.py). Users
+must have authorized calendar access beforehand (``authorize <user>``); a
+batch never opens a consent page, and a question for an unauthorized user
+fails at once with UserNotAuthorized instead of being retried. Results are
+the only thing written to stdout: progress output from the flow, crews and
+warm-up goes to stderr, so ``batch questions.jsonl > answers.jsonl`` is
+valid JSONL.
+"""
+import argparse
+import contextlib
+import json
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from uuid import uuid4
+
+from calendar_assistant_flow import limits
+from calendar_assistant_flow.main import run_question, warmup
+from calendar_assistant_flow.tools.credentials import UserNotAuthorized, credential_store
+from calendar_assistant_flow.tools.google_api import google_api
+
+
+def load_questions(path: str) -> list:
+    questions = []
+    with open(path, encoding="utf-8") as f:
+        for n, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            row = json.loads(line)
+            questions.append({"id": row.get("id", n), "question": row["question"], "user": row.get("user")})
+    return questions
+
+
+def _run_one(item: dict, retries: int = 0) -> dict:
+    t0 = time.perf_counter()
+    flow_id = str(uuid4())
+    for attempt in range(retries + 1):
+        try:
+            result = run_question(item["question"], user=item.get("user"), flow_id=flow_id)
+            # Time across every attempt, not just the one that succeeded
+            return {"id": item["id"], "question": item["question"], "attempts": attempt + 1, **result,
+                    "latency_ms": round((time.perf_counter() - t0) * 1000, 1)}
+        except UserNotAuthorized as e:
+            # Retrying cannot help until the user runs the consent flow
+            error = e
+            break
+        except Exception as e:
+            error = e
+    return {
+        "id": item["id"],
+        "question": item["question"],
+        "attempts": attempt + 1,
+        "flow_id": flow_id,
+        "error": str(error),
+        "latency_ms": round((time.perf_counter() - t0) * 1000, 1),
+    }
+
+
+def run_batch(questions: list, concurrency: int, out, retries: int = 0) -> dict:
+    """Run ``questions`` on ``concurrency`` threads, writing each result to ``out``."""
+    write_lock = threading.Lock()
+    latencies, errors = [], 0
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="batch") as pool:
+        futures = [pool.submit(_run_one, q, retries) for q in questions]
+        for fut in as_completed(futures):
+            result = fut.result()
+            latencies.append(result["latency_ms"])
+            errors += "error" in result
+            with write_lock:
+                out.write(json.dumps(result, default=str) + "\n")
+                out.flush()
+    wall = time.perf_counter() - t0
+
+    latencies.sort()
+    pct = lambda q: round(latencies[min(int(q * len(latencies)), len(latencies) - 1)], 1) if latencies else None
+    return {
+        "questions": len(questions),
+        "errors": errors,
+        "wall_s": round(wall, 2),
+        "throughput_qps": round(len(questions) / wall, 3) if wall else None,
+        "latency_ms": {"p50": pct(0.50), "p95": pct(0.95), "p99": pct(0.99)},
+        "peak_in_flight": {"ollama": limits.llm_limiter.peak, "google": limits.google_limiter.peak},
+        "google_api": {k: v for k, v in google_api.stats().items() if not isinstance(v, dict)},
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Answer a JSONL file of questions")
+    ap.add_argument("input", help='JSONL with one {"id": ..., "question": "..."} per line')
+    ap.add_argument("--output", default="-", help="JSONL results file (default: stdout)")
+    ap.add_argument("--concurrency", type=int, default=4, help="flows running at once")
+    ap.add_argument("--max-llm", type=int, default=None, help="in-flight Ollama calls (default: unlimited)")
+    ap.add_argument("--max-google", type=int, default=None, help="in-flight Calendar API calls (default: unlimited)")
+    ap.add_argument("--retries", type=int, default=0, help="retries per failed question, resuming its checkpoints")
+    args = ap.parse_args()
+
+    credential_store.interactive = False
+    limits.configure(max_llm=args.max_llm, max_google=args.max_google)
+    questions = load_questions(args.input)
+
+    out = sys.stdout if args.output == "-" else open(args.output, "a", encoding="utf-8")
+    try:
+        # Everything print()ed along the way is progress, not results
+        with contextlib.redirect_stdout(sys.stderr):
+            warmup(instances=args.concurrency)
+            summary = run_batch(questions, args.concurrency, out, retries=args.retries)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    print(json.dumps(summary, indent=2), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
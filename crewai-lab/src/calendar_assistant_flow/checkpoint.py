@@ -0,0 +1,143 @@
+# checkpoint.py
+"""Checkpoints of a flow's completed steps, so a retry resumes where it failed.
+
+CalendarAssistantFlow stores each step's result in SQLite as soon as the
+step succeeds, keyed on (user, flow id, step):
+
+    route              chosen assistants and the date the question was asked
+    dates              the interpreted date range
+    crafted            the meeting the crafter produced
+    branch:<name>      an assistant's final output
+
+A kickoff with the id of an earlier run (``run_question(..., flow_id=...)``,
+"flow_id" on /ask) loads them and skips those steps. When scheduling fails
+on a Google error, for example, the retry neither re-routes nor re-crafts
+the meeting. A branch that already created its event is not run again.
+Checkpoints written for a different question under the same id are
+discarded. The user is the one whose calendar the run works on
+(calendar_client.as_user): a flow id only resumes its own user's steps,
+never another user's.
+
+    FLOW_CHECKPOINTS=0                    off (no reads, no writes)
+    FLOW_CHECKPOINT_PATH=                 file location (":memory:" for process-local); default
+                                          $XDG_CACHE_HOME/calendar_assistant/flow_checkpoints.sqlite
+                                          (~/.cache/...), next to the LLM memo
+    FLOW_CHECKPOINT_TTL_SECONDS=3600      older checkpoints are ignored, then deleted
+"""
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional
+
+from calendar_assistant_flow.memo import CACHE_DIR
+
+FLOW_CHECKPOINTS_ENABLED = os.getenv("FLOW_CHECKPOINTS", "1") == "1"
+FLOW_CHECKPOINT_PATH = os.getenv("FLOW_CHECKPOINT_PATH") or os.path.join(CACHE_DIR, "flow_checkpoints.sqlite")
+FLOW_CHECKPOINT_TTL_SECONDS = float(os.getenv("FLOW_CHECKPOINT_TTL_SECONDS", "3600"))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS checkpoint (
+    user       TEXT NOT NULL,
+    flow_id    TEXT NOT NULL,
+    step       TEXT NOT NULL,
+    question   TEXT NOT NULL,
+    value      TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    PRIMARY KEY (user, flow_id, step)
+);
+CREATE INDEX IF NOT EXISTS idx_checkpoint_created ON checkpoint (created_at);
+"""
+
+
+class FlowCheckpoints:
+    """Thread-safe SQLite store of completed flow steps, expiring after ``ttl`` seconds."""
+
+    def __init__(self, path: str = FLOW_CHECKPOINT_PATH, ttl: float = FLOW_CHECKPOINT_TTL_SECONDS,
+                 enabled: bool = FLOW_CHECKPOINTS_ENABLED):
+        self.path = path
+        self.ttl = ttl
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        self._last_purge = 0.0
+        self._stats = {"saves": 0, "resumes": 0, "steps_restored": 0, "expired": 0}
+
+    def _conn(self) -> sqlite3.Connection:
+        # Opened on first use so importing the module never touches the disk
+        if self._db is None:
+            directory = os.path.dirname(self.path) if self.path != ":memory:" else ""
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._db = sqlite3.connect(self.path, check_same_thread=False)
+            columns = {row[1] for row in self._db.execute("PRAGMA table_info(checkpoint)")}
+            if columns and "user" not in columns:
+                # Written before checkpoints were per user; they are short-lived, start afresh
+                self._db.execute("DROP TABLE checkpoint")
+            self._db.executescript(_SCHEMA)
+        return self._db
+
+    def load(self, user: str, flow_id: str, question: str) -> Dict[str, str]:
+        """Unexpired steps ``user`` saved for ``flow_id``; none if they were saved for another question."""
+        if not self.enabled:
+            return {}
+        with self._lock:
+            db = self._conn()
+            rows = db.execute("SELECT step, question, value FROM checkpoint "
+                              "WHERE user = ? AND flow_id = ? AND created_at >= ?",
+                              (user, flow_id, time.time() - self.ttl)).fetchall()
+            if any(q != question for _, q, _ in rows):
+                db.execute("DELETE FROM checkpoint WHERE user = ? AND flow_id = ?", (user, flow_id))
+                db.commit()
+                return {}
+            if rows:
+                self._stats["resumes"] += 1
+                self._stats["steps_restored"] += len(rows)
+        return {step: value for step, _, value in rows}
+
+    def save(self, user: str, flow_id: str, question: str, step: str, value: str) -> None:
+        if not self.enabled:
+            return
+        now = time.time()
+        with self._lock:
+            db = self._conn()
+            db.execute(
+                "INSERT OR REPLACE INTO checkpoint (user, flow_id, step, question, value, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (user, flow_id, step, question, value, now),
+            )
+            self._stats["saves"] += 1
+            # Expired rows are already invisible to load(); delete them at most once a minute
+            if now - self._last_purge >= 60:
+                self._last_purge = now
+                self._stats["expired"] += db.execute("DELETE FROM checkpoint WHERE created_at < ?",
+                                                     (now - self.ttl,)).rowcount
+            db.commit()
+
+    def discard(self, user: str, flow_id: str, step: str) -> None:
+        """Forget one saved step, so a resumed run computes it again."""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._conn().execute("DELETE FROM checkpoint WHERE user = ? AND flow_id = ? AND step = ?",
+                                 (user, flow_id, step))
+            self._conn().commit()
+
+    def clear(self, flow_id: Optional[str] = None) -> None:
+        """Forget ``flow_id``'s checkpoints, or every flow's."""
+        with self._lock:
+            if flow_id is None:
+                self._conn().execute("DELETE FROM checkpoint")
+            else:
+                self._conn().execute("DELETE FROM checkpoint WHERE flow_id = ?", (flow_id,))
+            self._conn().commit()
+
+    def stats(self) -> dict:
+        with self._lock:
+            out = dict(self._stats, enabled=self.enabled, ttl_s=self.ttl)
+            if self.enabled and self._db is not None:
+                out["flows"] = self._db.execute("SELECT COUNT(DISTINCT flow_id) FROM checkpoint").fetchone()[0]
+        return out
+
+
+checkpoints = FlowCheckpoints()
@@ -1,13 +1,14 @@
 from pathlib import Path
-from typing import List, Optional
 import os
 
-from dotenv import load_dotenv
-from pydantic import BaseModel, Field
-
-from crewai import Agent, Task, LLM
+from crewai import Agent, Task
 from crewai.project import CrewBase, agent, task
 
+from calendar_assistant_flow.llm import ollama_llm
+from calendar_assistant_flow.ollama import agent_models
+from calendar_assistant_flow.prompts import CREW_VERBOSE, i18n, prompt_stats, task_budgets
+from calendar_assistant_flow.structured import format_params, output_model
+
 # Paths
 ASSISTANT_DIR = Path(__file__).resolve().parent
 ASSISTANT_CONFIG = ASSISTANT_DIR / "config"
@@ -16,45 +17,17 @@ ASSISTANT_CONFIG = ASSISTANT_DIR / "config"
 for k in ["OPENAI_API_KEY", "OPENROUTER_API_KEY", "OPENROUTER_API_BASE"]:
     os.environ.pop(k, None)
 
-load_dotenv()
-
-# LLM config
-OLLAMA_BASE_URL = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434").rstrip("/")
-LLM_MODEL = os.getenv("LLM_MODEL", "llama3.1:8b")
+# LLM config (models per tier: see ollama.py)
 LLM_TEMPERATURE = float(os.getenv("LLM_TEMPERATURE", "0.2"))
 
 # Tools
 from calendar_assistant_flow.tools.custom_tool import (
     MeetingSchedulerTool,
     TimeAvailabilityTool,
+    SlotSearchTool,
     EventCheckerTool,
 )
-
-
-class MeetingResult(BaseModel):
-    status: str
-    id: str
-    summary: str
-    start: str
-    end: str
-    htmlLink: Optional[str] = None
-
-
-# ---------- Inline output models (match tasks.yaml exactly) ----------
-class MeetingCrafter(BaseModel):
-    summary: str = Field(..., description="Meeting title")
-    location: str = Field(default="", description="Meeting location")
-    description: str = Field(default="", description="Meeting description")
-    start: str = Field(..., description="Start time in YYYY-MM-DDTHH:MM:SS")
-    end: str = Field(..., description="End time in YYYY-MM-DDTHH:MM:SS")
-    attendees: List[str] = Field(default_factory=list, description="Attendee emails")
-
-
-class DateInterpreter(BaseModel):
-    original_query: str
-    start: str
-    end: str
-    timezone: str
+from calendar_assistant_flow.models import DateInterpreter, MeetingCrafter, MeetingResult
 
 
 @CrewBase
@@ -65,23 +38,23 @@ class CalendarAssistant:
     agents_config = str(ASSISTANT_CONFIG / "agents.yaml")
     tasks_config = str(ASSISTANT_CONFIG / "tasks.yaml")
 
-    # General-purpose Ollama LLM
-    llm = LLM(
-        provider="ollama",
-        model=f"ollama/{LLM_MODEL}",
-        base_url=OLLAMA_BASE_URL,
-        api_key="ollama",
+    # Ollama model per agent, from its model_tier in agents.yaml
+    models = agent_models(ASSISTANT_CONFIG / "agents.yaml")
+    prompt_stats.budgets.update(task_budgets(ASSISTANT_CONFIG / "tasks.yaml"))
+
+    # General-purpose Ollama LLMs for the tool-using agents, one per model
+    llms = {model: ollama_llm(model, temperature=LLM_TEMPERATURE) for model in set(models.values())}
+
+    # Tool-less JSON agents: generation constrained to the task's schema (STRUCTURED_OUTPUT)
+    crafter_llm = ollama_llm(
+        models["meeting_scheduler_assistant"],
         temperature=LLM_TEMPERATURE,
+        **format_params(MeetingCrafter),
     )
-
-    # LLM with tool-calls explicitly disabled to avoid LiteLLM Ollama tool templating bugs
-    llm_no_tools = LLM(
-        provider="ollama",
-        model=f"ollama/{LLM_MODEL}",
-        base_url=OLLAMA_BASE_URL,
-        api_key="ollama",
+    dates_llm = ollama_llm(
+        models["date_interpreter_assistant"],
         temperature=0.0,
-        tool_choice="none",
+        **format_params(DateInterpreter),
     )
 
     # ----------------- Agents -----------------
@@ -90,55 +63,52 @@ class CalendarAssistant:
         # JSON crafting only (no tools)
         return Agent(
             config=self.agents_config["meeting_scheduler_assistant"],
-            verbose=True,
-            llm=self.llm,
+            verbose=CREW_VERBOSE,
+            llm=self.crafter_llm,
             tools=[],
             max_iter=1,
             allow_delegation=False,
         )
 
-    # @agent
-    # def meeting_creator_agent(self) -> Agent:
-    #     return Agent(
-    #         config=self.agents_config["meeting_creator_agent"],
-    #         verbose=True,
-    #         llm=self.llm_no_tools,
-    #         tools=[MeetingSchedulerTool()],
-    #         max_iter=1,
-    #         allow_delegation=False,
-    #         stop_on_tool_output=True,
-    #         respond_if_tool_output=True,
-    #         auto_terminate=True,
-    #         return_direct=True,  # ✅ add this line
-    #     )
-
     @agent
     def meeting_creator_agent(self) -> Agent:
         return Agent(
             config=self.agents_config["meeting_creator_agent"],
-            verbose=True,
-            llm=self.llm,  # <-- use regular llm
+            verbose=CREW_VERBOSE,
+            llm=self.llms[self.models["meeting_creator_agent"]],  # <-- use regular llm
             tools=[MeetingSchedulerTool()],
             max_iter=2,  # <-- allow one extra step to finalize
             allow_delegation=False,
             return_direct=True  # <-- crucial so tool output is the final answer
         )
 
+    @agent
+    def date_interpreter_assistant(self) -> Agent:
+        # JSON only (no tools); keeps dateinterpreter_task off the tool-using agents
+        return Agent(
+            config=self.agents_config["date_interpreter_assistant"],
+            verbose=CREW_VERBOSE,
+            llm=self.dates_llm,
+            tools=[],
+            max_iter=1,
+            allow_delegation=False,
+        )
+
     @agent
     def availability_checker_assistant(self) -> Agent:
         return Agent(
             config=self.agents_config["availability_checker_assistant"],
-            verbose=True,
-            llm=self.llm,
-            tools=[TimeAvailabilityTool()],
+            verbose=CREW_VERBOSE,
+            llm=self.llms[self.models["availability_checker_assistant"]],
+            tools=[TimeAvailabilityTool(), SlotSearchTool()],
         )
 
     @agent
     def event_checker_assistant(self) -> Agent:
         return Agent(
             config=self.agents_config["event_checker_assistant"],
-            verbose=True,
-            llm=self.llm,
+            verbose=CREW_VERBOSE,
+            llm=self.llms[self.models["event_checker_assistant"]],
             tools=[EventCheckerTool()],
         )
 
@@ -147,7 +117,8 @@ class CalendarAssistant:
     def meeting_crafter_task(self) -> Task:
         return Task(
             config=self.tasks_config["meeting_crafter_task"],
-            output_pydantic=MeetingCrafter,
+            i18n=i18n(),
+            output_pydantic=output_model(MeetingCrafter),
             return_direct=True,
         )
 
@@ -155,6 +126,7 @@ class CalendarAssistant:
     def meeting_scheduler_task(self) -> Task:
         return Task(
             config=self.tasks_config["meeting_scheduler_task"],
+            i18n=i18n(),
             output_pydantic=MeetingResult,  # ensure JSON shape
             return_direct=True,
         )
@@ -163,7 +135,8 @@ class CalendarAssistant:
     def dateinterpreter_task(self) -> Task:
         return Task(
             config=self.tasks_config["dateinterpreter_task"],
-            output_pydantic=DateInterpreter,
+            i18n=i18n(),
+            output_pydantic=output_model(DateInterpreter),
             return_direct=True,
         )
 
@@ -171,6 +144,7 @@ class CalendarAssistant:
     def availability_checker_task(self) -> Task:
         return Task(
             config=self.tasks_config["availability_checker_task"],
+            i18n=i18n(),
             return_direct=True,
         )
 
@@ -178,5 +152,6 @@ class CalendarAssistant:
     def event_checker_task(self) -> Task:
         return Task(
             config=self.tasks_config["event_checker_task"],
+            i18n=i18n(),
             return_direct=True,
         )
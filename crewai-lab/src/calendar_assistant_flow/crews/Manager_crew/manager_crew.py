@@ -1,53 +1,25 @@
 # manager_crew.py
 import os
-import requests
 from pathlib import Path
-from typing import Literal
 
-from dotenv import load_dotenv
-from pydantic import BaseModel, Field
-
-from crewai import Agent, Crew, Process, Task, LLM
+from crewai import Agent, Crew, Process, Task
 from crewai.project import CrewBase, agent, crew, task
 
+from calendar_assistant_flow.llm import ollama_llm
+from calendar_assistant_flow.ollama import agent_models, ollama_monitor
+
+from calendar_assistant_flow.models import RouterDecision
+from calendar_assistant_flow.prompts import CREW_VERBOSE, i18n, prompt_file, prompt_stats, task_budgets
+from calendar_assistant_flow.structured import format_params, output_model
+
 # --- Paths ---
 MANAGER_DIR = Path(__file__).resolve().parent
 MANAGER_CONFIG = MANAGER_DIR / "config"
 
-# --- .env ---
-load_dotenv()
-
-# --- Ollama config ---
-OLLAMA_BASE_URL = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434").rstrip("/")
-LLM_MODEL = os.getenv("LLM_MODEL", "llama3.1:8b")
+# --- Ollama config (models per tier: see ollama.py) ---
 LLM_TEMPERATURE = float(os.getenv("LLM_TEMPERATURE", "0.0"))
 
 
-def assert_ollama_ready():
-    """Fail fast if Ollama is offline or model not installed."""
-    try:
-        r = requests.get(f"{OLLAMA_BASE_URL}/api/tags", timeout=8)
-        r.raise_for_status()
-        models = {m.get("name") for m in r.json().get("models", [])}
-        if LLM_MODEL not in models:
-            raise RuntimeError(
-                f"Ollama model '{LLM_MODEL}' not found. Install with: ollama pull {LLM_MODEL}"
-            )
-    except Exception as e:
-        raise RuntimeError(
-            f"Cannot connect to Ollama at {OLLAMA_BASE_URL}. Start it with 'ollama serve'."
-        ) from e
-
-
-class RouterDecision(BaseModel):
-    agent: Literal[
-        "meeting_scheduler_assistant",
-        "availability_checker_assistant",
-        "event_checker_assistant",
-    ] = Field(..., description="Chosen agent to handle the request")
-    reason: str = Field(..., description="Short reason for routing")
-
-
 @CrewBase
 class ManagerServiceCrew:
     """Manager / router crew."""
@@ -55,19 +27,21 @@ class ManagerServiceCrew:
     agents_config = str(MANAGER_CONFIG / "agents.yaml")
     tasks_config = str(MANAGER_CONFIG / "tasks.yaml")
 
-    llm = LLM(
-        provider="ollama",
-        model=f"ollama/{LLM_MODEL}",
-        base_url=OLLAMA_BASE_URL,
-        api_key="ollama",   # placeholder
+    # Ollama model per agent, from its model_tier in agents.yaml
+    models = agent_models(MANAGER_CONFIG / "agents.yaml")
+    prompt_stats.budgets.update(task_budgets(MANAGER_CONFIG / "tasks.yaml"))
+
+    llm = ollama_llm(
+        models["project_manager"],
         temperature=0.0,
+        **format_params(RouterDecision),
     )
 
     @agent
     def project_manager(self) -> Agent:
         return Agent(
             config=self.agents_config["project_manager"],
-            verbose=True,
+            verbose=CREW_VERBOSE,
             llm=self.llm,
             allow_delegation=False,
             max_iter=1,
@@ -77,17 +51,19 @@ class ManagerServiceCrew:
     def project_manager_task(self) -> Task:
         return Task(
             config=self.tasks_config["project_manager_task"],
-            output_pydantic=RouterDecision,
+            i18n=i18n(),
+            output_pydantic=output_model(RouterDecision),
             return_direct=True,
             max_iter=1,
         )
 
     @crew
     def crew(self) -> Crew:
-        assert_ollama_ready()
+        ollama_monitor.assert_ready(self.models.values())
         return Crew(
             agents=self.agents,
             tasks=self.tasks,
             process=Process.sequential,
-            verbose=True,
+            verbose=CREW_VERBOSE,
+            prompt_file=prompt_file(),
         )
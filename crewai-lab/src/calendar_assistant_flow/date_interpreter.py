@@ -0,0 +1,276 @@
+# date_interpreter.py
+"""Rule-based natural-language date/time interpreter.
+
+Turns the common phrasings ("by 9pm today", "next Tuesday afternoon",
+"between Nov 17 and Nov 21", "from 2pm to 4pm tomorrow", "this week") into
+a DateInterpreter with "Month DD, YYYY, HH:MMAM/PM" strings, the format
+TimeAvailabilityTool and EventCheckerTool parse. Returns None for anything
+it does not confidently understand, so the caller can fall back to the
+dateinterpreter_task LLM.
+"""
+import re
+from datetime import date, datetime, time, timedelta
+from typing import List, Optional, Tuple
+
+from tzlocal import get_localzone
+
+from calendar_assistant_flow.models import DateInterpreter
+
+OUTPUT_FORMAT = "%B %d, %Y, %I:%M%p"
+DAY_START = time(0, 0)
+DAY_END = time(23, 59)
+
+_MONTHS = {
+    m: i
+    for i, names in enumerate(
+        [("jan", "january"), ("feb", "february"), ("mar", "march"), ("apr", "april"),
+         ("may",), ("jun", "june"), ("jul", "july"), ("aug", "august"),
+         ("sep", "sept", "september"), ("oct", "october"), ("nov", "november"), ("dec", "december")],
+        start=1,
+    )
+    for m in names
+}
+_WEEKDAYS = {name: i for i, name in enumerate(
+    ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"])}
+_PARTS_OF_DAY = {
+    "morning": (time(8, 0), time(12, 0)),
+    "afternoon": (time(12, 0), time(17, 0)),
+    "evening": (time(17, 0), time(21, 0)),
+    "tonight": (time(18, 0), DAY_END),
+    "night": (time(18, 0), DAY_END),
+}
+
+_MONTH_RX = r"(jan(?:uary)?|feb(?:ruary)?|mar(?:ch)?|apr(?:il)?|may|june?|july?|aug(?:ust)?|sep(?:t(?:ember)?)?|oct(?:ober)?|nov(?:ember)?|dec(?:ember)?)"
+_TIME_RX = r"(?:(noon|midnight)|(\d{1,2})(?::(\d{2}))?\s*(am|pm|a\.m\.|p\.m\.)?)"
+
+_RX_ISO = re.compile(r"\b(\d{4})-(\d{2})-(\d{2})\b")
+_RX_MONTH_DAY = re.compile(rf"\b{_MONTH_RX}\.?\s+(\d{{1,2}})(?:st|nd|rd|th)?(?:,?\s+(\d{{4}}))?\b")
+_RX_DAY_MONTH = re.compile(rf"\b(\d{{1,2}})(?:st|nd|rd|th)?\s+(?:of\s+)?{_MONTH_RX}\b(?:,?\s+(\d{{4}}))?")
+_RX_SLASH = re.compile(r"\b(\d{1,2})/(\d{1,2})(?:/(\d{4}))?\b")
+_RX_WEEKDAY = re.compile(r"\b(?:(this|next|coming|last)\s+)?(monday|tuesday|wednesday|thursday|friday|saturday|sunday)\b")
+_RX_RELATIVE_DAY = re.compile(r"\b(day after tomorrow|tomorrow|today|tonight|yesterday)\b")
+_RX_SPAN = re.compile(r"\b(this|next|last|coming)\s+(week|weekend|month)\b")
+_RX_N_DAYS = re.compile(r"\b(?:next|coming|following)\s+(\d{1,2})\s+days?\b")
+_RX_IN_N_DAYS = re.compile(r"\bin\s+(\d{1,2})\s+days?\b")
+
+_RX_TIME_RANGE = re.compile(rf"(?:\b(from|between)\s+)?\b{_TIME_RX}\s*(?:-|–|to|until|till|and)\s*{_TIME_RX}")
+_RX_TIME_BY = re.compile(rf"\b(by|before|until|till|after|from|at|around)\s+{_TIME_RX}")
+_RX_TIME_BARE = re.compile(r"\b(\d{1,2})(?::(\d{2}))?\s*(am|pm|a\.m\.|p\.m\.)")
+_RX_PART_OF_DAY = re.compile(r"\b(morning|afternoon|evening|tonight|night)\b")
+
+
+def _to_time(word: Optional[str], hour: Optional[str], minute: Optional[str],
+             meridiem: Optional[str]) -> Optional[time]:
+    if word:
+        return time(12, 0) if word == "noon" else time(0, 0)
+    if hour is None:
+        return None
+    h, m = int(hour), int(minute or 0)
+    if m > 59:
+        return None
+    if meridiem:
+        if h < 1 or h > 12:
+            return None
+        pm = meridiem.startswith("p")
+        h = (h % 12) + (12 if pm else 0)
+    elif h <= 23 and minute is not None:
+        pass  # 24-hour clock, e.g. 14:30
+    elif 1 <= h <= 12:
+        # Bare hour: assume working hours (1-6 -> pm, 7-11 -> am, 12 -> noon)
+        h = h + 12 if h <= 6 else h
+    else:
+        return None
+    return time(h, m)
+
+
+def _resolve_year(month: int, day: int, year: Optional[str], today: date) -> Optional[date]:
+    try:
+        if year:
+            return date(int(year), month, day)
+        candidate = date(today.year, month, day)
+    except ValueError:
+        return None
+    # A yearless date far in the past most likely means next year
+    if (today - candidate).days > 183:
+        candidate = candidate.replace(year=today.year + 1)
+    return candidate
+
+
+class DateEngine:
+    """Deterministic, timezone-aware interpreter for common date phrases."""
+
+    def __init__(self, tz=None):
+        self.tz = tz
+
+    # ----------------- Days -----------------
+    def _explicit_dates(self, text: str, today: date) -> List[Tuple[int, date]]:
+        found = []
+        for m in _RX_ISO.finditer(text):
+            try:
+                found.append((m.start(), date(int(m[1]), int(m[2]), int(m[3]))))
+            except ValueError:
+                return []
+        for m in _RX_MONTH_DAY.finditer(text):
+            d = _resolve_year(_MONTHS[m[1][:3]], int(m[2]), m[3], today)
+            if d:
+                found.append((m.start(), d))
+        for m in _RX_DAY_MONTH.finditer(text):
+            d = _resolve_year(_MONTHS[m[2][:3]], int(m[1]), m[3], today)
+            if d:
+                found.append((m.start(), d))
+        for m in _RX_SLASH.finditer(text):
+            d = _resolve_year(int(m[1]), int(m[2]), m[3], today) if 1 <= int(m[1]) <= 12 else None
+            if d:
+                found.append((m.start(), d))
+        for m in _RX_RELATIVE_DAY.finditer(text):
+            offset = {"today": 0, "tonight": 0, "tomorrow": 1, "day after tomorrow": 2, "yesterday": -1}[m[1]]
+            found.append((m.start(), today + timedelta(days=offset)))
+        for m in _RX_IN_N_DAYS.finditer(text):
+            found.append((m.start(), today + timedelta(days=int(m[1]))))
+        for m in _RX_WEEKDAY.finditer(text):
+            target = _WEEKDAYS[m[2]]
+            delta = (target - today.weekday()) % 7
+            if m[1] == "next" and delta == 0:
+                delta = 7
+            elif m[1] == "last":
+                delta = delta - 7 if delta else -7
+            found.append((m.start(), today + timedelta(days=delta)))
+        # Keep text order, drop duplicates of the same day
+        seen, out = set(), []
+        for pos, d in sorted(found):
+            if d not in seen:
+                seen.add(d)
+                out.append((pos, d))
+        return out
+
+    def _span(self, text: str, today: date) -> Optional[Tuple[date, date]]:
+        m = _RX_N_DAYS.search(text)
+        if m:
+            return today, today + timedelta(days=int(m[1]) - 1)
+        m = _RX_SPAN.search(text)
+        if not m:
+            return None
+        which, unit = m[1], m[2]
+        if unit == "week":
+            monday = today - timedelta(days=today.weekday())
+            if which in ("next", "coming"):
+                monday += timedelta(days=7)
+            elif which == "last":
+                monday -= timedelta(days=7)
+            first = max(monday, today) if which == "this" else monday
+            return first, monday + timedelta(days=6)
+        if unit == "weekend":
+            # Saturday of the current (or, on weekdays, the coming) weekend
+            saturday = today + timedelta(days=5 - today.weekday())
+            if which == "next":
+                saturday += timedelta(days=7)
+            elif which == "last":
+                saturday -= timedelta(days=7)
+            return max(saturday, today) if which == "this" else saturday, saturday + timedelta(days=1)
+        first = today.replace(day=1)
+        if which in ("next", "coming"):
+            first = (first + timedelta(days=32)).replace(day=1)
+        elif which == "last":
+            first = (first - timedelta(days=1)).replace(day=1)
+        last = (first + timedelta(days=32)).replace(day=1) - timedelta(days=1)
+        return (max(first, today) if which == "this" else first), last
+
+    # ----------------- Times -----------------
+    def _time_range(self, text: str):
+        """(start, end) for "2pm to 4pm" / "between 2 and 4" / "9-11am"; () if none, None if invalid."""
+        for m in _RX_TIME_RANGE.finditer(text):
+            prefix, m1 = m[1], m.groups()[1:]
+            # Without from/between, need an am/pm, minutes or noon to tell it apart from dates
+            if not (prefix or any(m1[i] for i in (0, 2, 3, 4, 6, 7))):
+                continue
+            t2 = _to_time(m1[4], m1[5], m1[6], m1[7])
+            # "2-4pm": the first time borrows the second one's am/pm
+            t1 = _to_time(m1[0], m1[1], m1[2], m1[3] or m1[7])
+            if t1 is not None and t2 is not None and t1 >= t2 and not m1[3]:
+                t1 = _to_time(m1[0], m1[1], m1[2], "am")
+            if t1 is None or t2 is None or t2 <= t1:
+                return None
+            return t1, t2
+        return ()
+
+    # ----------------- Public -----------------
+    def interpret(self, question: str, now: Optional[datetime] = None) -> Optional[DateInterpreter]:
+        tz = self.tz or get_localzone()
+        now = now.astimezone(tz) if now else datetime.now(tz)
+        today = now.date()
+        text = " ".join(question.lower().split())
+
+        days = self._explicit_dates(text, today)
+        span = self._span(text, today)
+        range_words = re.search(r"\b(between|from|through|thru|until|to|-)\b", text)
+
+        if span and days:
+            return None  # "next week on Tuesday" and the like: leave it to the LLM
+        if len(days) > 2 or (len(days) == 2 and not range_words):
+            return None
+
+        if span:
+            first_day, last_day = span
+        elif days:
+            first_day, last_day = days[0][1], days[-1][1]
+            if last_day < first_day:
+                return None
+        else:
+            first_day = last_day = None
+
+        start_t, end_t = DAY_START, DAY_END
+        found_time = False
+
+        time_range = self._time_range(text)
+        if time_range:
+            start_t, end_t = time_range
+            found_time = True
+        elif time_range is None:
+            return None
+        else:
+            m = _RX_TIME_BY.search(text)
+            bare = None if m else _RX_TIME_BARE.search(text)
+            if m or bare:
+                word, t = (m[1], _to_time(m[2], m[3], m[4], m[5])) if m else \
+                    ("at", _to_time(None, bare[1], bare[2], bare[3]))
+                if t is None:
+                    return None
+                found_time = True
+                if word in ("by", "before", "until", "till"):
+                    end_t = t
+                    if first_day in (None, today) and now.time() < t:
+                        start_t = now.time().replace(second=0, microsecond=0)
+                elif word in ("after", "from"):
+                    start_t = t
+                else:  # at / around: a one-hour window
+                    start_t = t
+                    end_t = time(t.hour + 1, t.minute) if t.hour < 23 else DAY_END
+            else:
+                m = _RX_PART_OF_DAY.search(text)
+                if m:
+                    start_t, end_t = _PARTS_OF_DAY[m[1]]
+                    found_time = True
+
+        if first_day is None:
+            if not found_time:
+                return None  # no date or time cue at all
+            first_day = last_day = today
+
+        start = datetime.combine(first_day, start_t, tzinfo=tz)
+        end = datetime.combine(last_day, end_t, tzinfo=tz)
+        if end <= start:
+            return None
+        return DateInterpreter(
+            original_query=question,
+            start=start.strftime(OUTPUT_FORMAT),
+            end=end.strftime(OUTPUT_FORMAT),
+            timezone=str(tz),
+        )
+
+
+date_engine = DateEngine()
+
+
+def interpret_dates(question: str, now: Optional[datetime] = None) -> Optional[DateInterpreter]:
+    """DateInterpreter for ``question``, or None if the LLM should handle it."""
+    return date_engine.interpret(question, now)
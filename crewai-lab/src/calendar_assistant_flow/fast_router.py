@@ -0,0 +1,107 @@
+# fast_router.py
+"""Keyword/rule router that answers obvious requests without the Manager LLM.
+
+Each assistant has weighted regex cues. The best-scoring assistant wins and
+the confidence reflects both how strong its cues are and how far it is ahead
+of the runner-up, so mixed questions land below the threshold and go to the
+LLM crew. The exception is a compound request whose clauses ("check my
+availability" / "and schedule a meeting with ...") each route confidently on
+their own: that returns every clause's assistant.
+"""
+import os
+import re
+from typing import Dict, List, Tuple
+
+from calendar_assistant_flow.models import RouterDecision
+
+ROUTER_CONFIDENCE_THRESHOLD = float(os.getenv("ROUTER_CONFIDENCE_THRESHOLD", "0.75"))
+
+# Score at which a cue set alone counts as certain
+_SATURATION = 3.0
+
+_RULES: Dict[str, List[Tuple[str, float]]] = {
+    "meeting_scheduler_assistant": [
+        (r"(?<!my )(?<!the )\b(schedule|book|arrange|set ?up|organi[sz]e|plan)\b", 2.0),
+        (r"^\W*(please\s+)?((can|could|would) you\s+)?(please\s+)?(schedule|book|arrange|set ?up|organi[sz]e|plan|invite|send|create|add|put|make)\b", 1.5),
+        (r"\b(create|add|put|make)\b.{0,40}\b(meeting|call|event|appointment|standup|stand-up|sync|1:1|one-on-one|review|interview|invite)\b", 2.5),
+        (r"\b(invite|send (an )?invite)\b", 2.0),
+        (r"\bwith [\w.+-]+@[\w-]+\.[\w.]+", 1.0),
+        (r"\b(meeting|call|standup|stand-up|sync|1:1|appointment)\b", 0.5),
+    ],
+    "availability_checker_assistant": [
+        (r"\b(available|availability|free|busy|open (slot|time)s?|free time|time slots?)\b", 3.0),
+        (r"\bwhen (am i|can i|could i|do i have time)\b", 2.0),
+        (r"\b(do i have|have i got) (any )?(free )?(time|room|gaps?)\b", 3.0),
+        (r"\b(fit|squeeze) (in|it in)\b", 2.5),
+        (r"\b(gaps?|slots?)\b", 1.5),
+    ],
+    "event_checker_assistant": [
+        (r"\b(what|which|list|show|tell me|any)\b.{0,40}\b(events?|meetings?|appointments?|calls?)\b", 2.5),
+        (r"\b(my|the) (calendar|agenda|schedule) (for|on|today|tomorrow|this|next)\b", 2.0),
+        (r"\b(on|in) my (calendar|agenda)\b", 1.5),
+        (r"\b(agenda|upcoming|events?)\b", 1.5),
+        (r"\b(check|read|review|show)\b.{0,20}\b(events?|agenda|schedule)\b", 1.5),
+        (r"\bwhat does .{0,30} look like\b", 2.5),
+        (r"\bwhat'?s (on|happening|planned|coming up)\b", 2.5),
+        (r"\b(do i have|have i got) (any )?(events?|meetings?|appointments?|calls?)\b", 2.5),
+    ],
+}
+
+# Clause boundaries for compound requests
+_CLAUSE_SPLIT = re.compile(r"\s*(?:[;?]|,?\s+\b(?:and(?: then| also)?|then|also|plus)\b)\s+", re.IGNORECASE)
+
+_COMPILED = {
+    name: [(re.compile(pattern, re.IGNORECASE), weight) for pattern, weight in rules]
+    for name, rules in _RULES.items()
+}
+
+
+class FastRouter:
+    """Deterministic router returning a RouterDecision with a confidence score."""
+
+    def scores(self, question: str) -> Dict[str, float]:
+        return {
+            name: sum(weight for rx, weight in rules if rx.search(question))
+            for name, rules in _COMPILED.items()
+        }
+
+    def classify(self, question: str) -> RouterDecision:
+        compound = self._classify_clauses(question)
+        if compound is not None:
+            return compound
+        return self._classify_whole(question)
+
+    def _classify_clauses(self, question: str):
+        """Decision listing several assistants if each clause routes confidently on its own."""
+        clauses = [c for c in _CLAUSE_SPLIT.split(question) if c.strip()]
+        if len(clauses) < 2:
+            return None
+        decisions = [self._classify_whole(c) for c in clauses]
+        if any(d.confidence < ROUTER_CONFIDENCE_THRESHOLD for d in decisions):
+            return None
+        agents = list(dict.fromkeys(d.agent for d in decisions))
+        if len(agents) < 2:
+            return None
+        return RouterDecision(
+            agent=agents[0],
+            agents=agents,
+            reason="fast-path rules, compound request: " + ", ".join(agents),
+            confidence=min(d.confidence for d in decisions),
+        )
+
+    def _classify_whole(self, question: str) -> RouterDecision:
+        scores = self.scores(question)
+        ranked = sorted(scores.items(), key=lambda kv: kv[1], reverse=True)
+        (best, top), (_, second) = ranked[0], ranked[1]
+        if top <= 0:
+            confidence = 0.0
+        else:
+            confidence = min(top / _SATURATION, 1.0) * (top - second) / top
+        return RouterDecision(
+            agent=best,
+            reason=f"fast-path rules: {best}={top:g}, runner-up={second:g}",
+            confidence=round(confidence, 3),
+        )
+
+
+fast_router = FastRouter()
@@ -0,0 +1,289 @@
+# flow.py
+"""CalendarAssistantFlow: route a question, then run the chosen assistants.
+
+Importing this module loads crewai (the flow base class) but not the crews,
+their LLM clients, the tools or the Google client libraries; those are
+imported when the first question needs them.
+"""
+import contextvars
+import functools
+import os
+import warnings
+import json
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Callable, Dict, List
+from uuid import uuid4
+
+from tzlocal import get_localzone
+from datetime import datetime
+from pydantic import BaseModel, Field
+
+warnings.filterwarnings("ignore", category=SyntaxWarning, module="pysbd")
+
+from crewai import Crew, Process
+from crewai.flow.flow import Flow, listen, start
+
+from calendar_assistant_flow.checkpoint import checkpoints
+from calendar_assistant_flow.fast_router import ROUTER_CONFIDENCE_THRESHOLD, fast_router
+from calendar_assistant_flow.date_interpreter import interpret_dates
+from calendar_assistant_flow.memo import llm_memo
+from calendar_assistant_flow.models import DateInterpreter, MeetingCrafter, RouterDecision
+from calendar_assistant_flow.ollama import ollama_monitor
+from calendar_assistant_flow.pool import CrewPool
+from calendar_assistant_flow.prompts import CREW_VERBOSE, prompt_file
+from calendar_assistant_flow.stream import emit
+from calendar_assistant_flow.structured import parse_output
+from calendar_assistant_flow.tools.calendar_client import current_user
+from calendar_assistant_flow.tracing import tracer
+
+if TYPE_CHECKING:
+    from calendar_assistant_flow.crews.Assistant_crew.assistant_crew import CalendarAssistant
+    from calendar_assistant_flow.crews.Manager_crew.manager_crew import ManagerServiceCrew
+
+
+def _assistant_crew_class():
+    from calendar_assistant_flow.crews.Assistant_crew.assistant_crew import CalendarAssistant
+    return CalendarAssistant
+
+
+def _manager_crew_class():
+    from calendar_assistant_flow.crews.Manager_crew.manager_crew import ManagerServiceCrew
+    return ManagerServiceCrew
+
+
+# Warm crew instances, leased to one flow at a time; the crew modules load with the first one
+assistant_pool: "CrewPool[CalendarAssistant]" = CrewPool(lambda: _assistant_crew_class()())
+manager_pool: "CrewPool[ManagerServiceCrew]" = CrewPool(lambda: _manager_crew_class()())
+
+# Create the event in code from the crafted JSON instead of via meeting_creator_agent
+MEETING_DIRECT_EXECUTION = os.getenv("MEETING_DIRECT_EXECUTION", "1") == "1"
+
+# Agent and task methods on CalendarAssistant for each assistant path, tasks in sequence
+ASSISTANT_PATHS = {
+    "meeting_scheduler_assistant": (
+        "meeting_scheduler_assistant",
+        ["meeting_crafter_task"] + ([] if MEETING_DIRECT_EXECUTION else ["meeting_scheduler_task"]),
+    ),
+    "availability_checker_assistant": ("availability_checker_assistant", ["availability_checker_task"]),
+    "event_checker_assistant": ("event_checker_assistant", ["event_checker_task"]),
+}
+# Paths that need the question's dates resolved first
+DATE_PATHS = {"availability_checker_assistant", "event_checker_assistant"}
+
+
+@functools.lru_cache(maxsize=None)
+def memo_models() -> Dict[str, str]:
+    """Model behind each memoized output kind: part of the memo key, as another model may answer differently."""
+    manager, assistant = _manager_crew_class(), _assistant_crew_class()
+    return {
+        "router": manager.llm.model,
+        "dates": assistant.dates_llm.model,
+        "meeting": assistant.crafter_llm.model,
+    }
+
+
+def ollama_models() -> List[str]:
+    """Every Ollama model some agent is configured for."""
+    return sorted(set(_manager_crew_class().models.values()) | set(_assistant_crew_class().models.values()))
+
+
+def _assert_ready(agents, tasks) -> None:
+    """Fail fast unless the models these agents, and the agents the tasks run on, are installed."""
+    llms = [a.llm for a in agents] + [t.agent.llm for t in tasks if t.agent is not None]
+    ollama_monitor.assert_ready({llm.model.removeprefix("ollama/") for llm in llms})
+
+
+class CalendarState(BaseModel):
+    # Keys the run's checkpoints: kick off with an earlier run's id to resume it
+    id: str = Field(default_factory=lambda: str(uuid4()))
+    question: str = (
+        "Can you help me check my availability and schedule a meeting with "
+        "joe@gmail.com by 9pm today for daily standup."
+    )
+    chosen_assistant: List[str] = []
+    response: List[str] = []
+    current_date: str = ""
+
+class CalendarAssistantFlow(Flow[CalendarState]):
+    initial_state = CalendarState
+
+    @start()
+    def execute_manager(self):
+        with tracer.span("flow.execute_manager") as span:
+            # Steps an earlier run with this id completed for this user (see checkpoint.py)
+            self._user = current_user.get()
+            self._restored = checkpoints.load(self._user, self.state.id, self.state.question)
+            span.set("checkpoint.steps_restored", len(self._restored))
+            if self._restored:
+                print(f"[checkpoint] resuming flow {self.state.id}: {sorted(self._restored)}")
+            chosen_assistant = self._execute_manager(span)
+        return chosen_assistant
+
+    def _checkpointed(self, step: str, compute: Callable[[], str]) -> str:
+        """compute() unless an earlier run with this id finished ``step``; the result is checkpointed."""
+        if step in self._restored:
+            return self._restored[step]
+        value = compute()
+        checkpoints.save(self._user, self.state.id, self.state.question, step, value)
+        return value
+
+    def _execute_manager(self, span):
+        if "route" in self._restored:
+            route = json.loads(self._restored["route"])
+            span.set("router.path", "checkpoint")
+            self.state.chosen_assistant = route["chosen_assistant"]
+            self.state.current_date = route["current_date"]
+            emit("route", agents=self.state.chosen_assistant)
+            return self.state.chosen_assistant
+
+        print("Kickoff the Manager Crew")
+        local_tz = get_localzone()
+        current_date = str(datetime.now(local_tz).date())
+
+        # Obvious intents are routed locally; only ambiguous ones pay for the LLM call
+        decision = fast_router.classify(self.state.question)
+        span.set("router.confidence", decision.confidence)
+        if decision.confidence >= ROUTER_CONFIDENCE_THRESHOLD:
+            span.set("router.path", "fast")
+            data = decision.model_dump()
+        elif (memoized := llm_memo.get("router", self.state.question, current_date,
+                                       memo_models()["router"], RouterDecision)) is not None:
+            span.set("router.path", "memo")
+            data = memoized.model_dump()
+        else:
+            span.set("router.path", "llm")
+            with manager_pool.lease() as manager, tracer.span("crew.kickoff", crew="manager"):
+                router_output = manager.crew().kickoff(inputs={"question": self.state.question})
+            try:
+                routed = parse_output(router_output, RouterDecision)
+                llm_memo.put("router", self.state.question, current_date, memo_models()["router"], routed)
+            except ValueError as e:
+                # Unusable router output: go with the fast path's best guess rather than fail
+                print(f"[router] {e}; using fast-path decision")
+                routed = decision
+            data = routed.model_dump()
+        # Compound questions name several assistants; they run in parallel
+        chosen_assistant = list(data.get("agents") or [data["agent"]])
+        print(f"[router] agents={chosen_assistant} reason={data.get('reason','')}")
+        span.set("router.agent", ",".join(chosen_assistant))
+        emit("route", agents=chosen_assistant)
+
+        self.state.chosen_assistant = chosen_assistant
+        self.state.current_date = current_date
+        checkpoints.save(self._user, self.state.id, self.state.question, "route",
+                         json.dumps({"chosen_assistant": chosen_assistant, "current_date": current_date}))
+        print("Selected_assistant:", chosen_assistant)
+        return chosen_assistant
+
+    @listen(execute_manager)
+    def assistant_crew(self):
+        with tracer.span("flow.assistant_crew", agents=",".join(self.state.chosen_assistant)):
+            self._assistant_crew()
+
+    def _assistant_crew(self):
+        chosen_assistant = [str(x).strip() for x in self.state.chosen_assistant]
+        print("Chosen assistants:", chosen_assistant)
+
+        branches = []
+        for name in chosen_assistant:
+            if name not in ASSISTANT_PATHS:
+                print(f"No agent ctor for: {name}")
+            elif name not in branches:
+                branches.append(name)
+
+        inputs = {"question": self.state.question, "current_date": self.state.current_date}
+        if DATE_PATHS.intersection(branches):
+            # Resolved once and shared by every branch that needs it
+            inputs["interpreted_dates"] = self._checkpointed("dates", lambda: self._interpret_dates(inputs))
+
+        if len(branches) > 1:
+            # Each branch leases its own crew instance; copy_context keeps trace spans nested
+            with ThreadPoolExecutor(max_workers=len(branches), thread_name_prefix="branch") as pool:
+                futures = [pool.submit(contextvars.copy_context().run, self._run_branch, name, inputs)
+                           for name in branches]
+                outputs = [f.result() for f in futures]
+        else:
+            outputs = [self._run_branch(name, inputs) for name in branches]
+
+        self.state.response = [f"{name}: {out}" for name, out in zip(branches, outputs)]
+
+    def _interpret_dates(self, inputs: dict) -> str:
+        """Question's date range as DateInterpreter JSON; the LLM task only for phrases the rules miss."""
+        with tracer.span("dates.interpret") as span:
+            dates = interpret_dates(self.state.question)
+            span.set("dates.resolved", dates is not None)
+            if dates is not None:
+                print(f"[dates] {dates.start} -> {dates.end} ({dates.timezone})")
+                return dates.model_dump_json()
+
+            dates = llm_memo.get("dates", self.state.question, inputs["current_date"], memo_models()["dates"],
+                                 DateInterpreter)
+            span.set("dates.memo_hit", dates is not None)
+            if dates is not None:
+                return dates.model_dump_json()
+
+            with assistant_pool.lease() as calendar_assistant:
+                agent = calendar_assistant.date_interpreter_assistant()
+                tasks = [calendar_assistant.dateinterpreter_task()]
+                _assert_ready([agent], tasks)
+                c = Crew(agents=[agent], tasks=tasks,
+                         process=Process.sequential, verbose=CREW_VERBOSE, prompt_file=prompt_file())
+                with tracer.span("crew.kickoff", crew="assistant", agent="dateinterpreter", tasks=1):
+                    out = c.kickoff(inputs=inputs)
+            try:
+                dates = parse_output(out, DateInterpreter)
+            except ValueError:
+                return out.raw  # let the branch agents make what they can of it
+            llm_memo.put("dates", self.state.question, inputs["current_date"], memo_models()["dates"], dates)
+            return dates.model_dump_json()
+
+    def _run_branch(self, name: str, inputs: dict) -> str:
+        step = f"branch:{name}"
+        if step in self._restored:
+            output = self._restored[step]
+        elif name == "meeting_scheduler_assistant" and MEETING_DIRECT_EXECUTION:
+            # Checkpoints its own result, once the meeting exists
+            output = self._craft_and_schedule(name, inputs)
+        else:
+            output = self._checkpointed(step, lambda: str(self._kickoff_branch(name, inputs)))
+        emit("branch", agent=name, output=output)
+        return output
+
+    def _kickoff_branch(self, name: str, inputs: dict):
+        agent_method, task_methods = ASSISTANT_PATHS[name]
+        with assistant_pool.lease() as calendar_assistant:
+            agent = getattr(calendar_assistant, agent_method)()
+            tasks = [getattr(calendar_assistant, t)() for t in task_methods]
+            _assert_ready([agent], tasks)
+            c = Crew(agents=[agent], tasks=tasks, process=Process.sequential, verbose=CREW_VERBOSE,
+                     prompt_file=prompt_file())
+            with tracer.span("crew.kickoff", crew="assistant", agent=name, tasks=len(tasks)):
+                return c.kickoff(inputs=inputs)
+
+    def _craft_and_schedule(self, name: str, inputs: dict) -> str:
+        from calendar_assistant_flow.tools.custom_tool import schedule_crafted_meeting
+
+        question, current_date = inputs["question"], inputs["current_date"]
+        crafted = llm_memo.get("meeting", question, current_date, memo_models()["meeting"], MeetingCrafter)
+        remember = crafted is None
+        if remember:
+            crafted = MeetingCrafter.model_validate_json(self._checkpointed(
+                "crafted", lambda: parse_output(self._kickoff_branch(name, inputs), MeetingCrafter).model_dump_json()))
+        # Failures propagate: the caller sees the error and can retry with this flow id, which
+        # resumes from the checkpointed craft instead of asking the LLM again
+        try:
+            with tracer.span("meeting.schedule"):
+                result = schedule_crafted_meeting(crafted).model_dump_json()
+        except ValueError:
+            # The crafted meeting itself is invalid (e.g. ends before it starts): re-craft on retry
+            checkpoints.discard(self._user, self.state.id, "crafted")
+            raise
+        checkpoints.save(self._user, self.state.id, question, f"branch:{name}", result)
+        # Only remember crafts that produced a valid meeting
+        if remember:
+            llm_memo.put("meeting", question, current_date, memo_models()["meeting"], crafted)
+        return result
+
+    @listen(assistant_crew)
+    def generate_client_response(self):
+        return self.state.response
@@ -0,0 +1,57 @@
+# limits.py
+"""Process-wide caps on in-flight Ollama and Google Calendar calls.
+
+Unlimited by default. Batch runs and the service set them with configure(),
+so flow-level concurrency can be higher than what Ollama or the Calendar
+quota can take. Slots are re-entrant per thread: a call made while the same
+thread already holds a slot (e.g. crewai retrying an LLM call from inside
+LLM.call) does not wait for a second one.
+"""
+import threading
+from contextlib import contextmanager
+from typing import Optional
+
+
+class Limiter:
+    def __init__(self, name: str, limit: Optional[int] = None):
+        self.name = name
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.peak = 0
+        self.set_limit(limit)
+
+    def set_limit(self, limit: Optional[int]) -> None:
+        self.limit = limit
+        self._sem = threading.BoundedSemaphore(limit) if limit else None
+
+    @contextmanager
+    def slot(self):
+        depth = getattr(self._local, "depth", 0)
+        sem = self._sem if depth == 0 else None
+        if sem is not None:
+            sem.acquire()
+        self._local.depth = depth + 1
+        if depth == 0:
+            with self._lock:
+                self.in_flight += 1
+                self.peak = max(self.peak, self.in_flight)
+        try:
+            yield
+        finally:
+            self._local.depth = depth
+            if depth == 0:
+                with self._lock:
+                    self.in_flight -= 1
+            if sem is not None:
+                sem.release()
+
+
+llm_limiter = Limiter("ollama")
+google_limiter = Limiter("google")
+
+
+def configure(max_llm: Optional[int] = None, max_google: Optional[int] = None) -> None:
+    """Set the caps (None = unlimited). Call before starting concurrent work."""
+    llm_limiter.set_limit(max_llm)
+    google_limiter.set_limit(max_google)
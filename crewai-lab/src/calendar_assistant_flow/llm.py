@@ -0,0 +1,108 @@
+# llm.py
+import time
+from typing import Optional
+
+import httpx
+from crewai import LLM
+from crewai.events.event_bus import crewai_event_bus
+from crewai.events.types.llm_events import LLMStreamChunkEvent
+from litellm.llms.custom_httpx.http_handler import HTTPHandler
+
+from calendar_assistant_flow.limits import llm_limiter
+from calendar_assistant_flow.ollama import OLLAMA_BASE_URL
+from calendar_assistant_flow.prompts import prompt_stats
+from calendar_assistant_flow.stream import streaming
+from calendar_assistant_flow.tracing import Span, tracer
+
+
+class _UsageRecorder:
+    """crewai LLM callback that keeps litellm's token usage for one call."""
+
+    def __init__(self):
+        self.input_tokens: Optional[int] = None
+        self.output_tokens: Optional[int] = None
+
+    def log_success_event(self, kwargs, response_obj, start_time, end_time):
+        usage = response_obj.get("usage")
+        if usage is None:
+            return
+        get = usage.get if isinstance(usage, dict) else lambda k: getattr(usage, k, None)
+        self.input_tokens = get("prompt_tokens")
+        self.output_tokens = get("completion_tokens")
+
+
+def _estimate_tokens(messages) -> int:
+    text = messages if isinstance(messages, str) else " ".join(str(m.get("content", "")) for m in messages)
+    return len(text) // 4
+
+
+@crewai_event_bus.on(LLMStreamChunkEvent)
+def _mark_first_token(source, event):
+    # Only streamed calls emit chunks, so only their spans get a TTFT; a non-streamed call's
+    # first token arrives with its last, and the span's duration is all there is to measure.
+    # Handlers run synchronously in the calling thread, so the open span is the LLM call's
+    span = tracer.current()
+    if isinstance(span, Span) and span.name == "llm.call":
+        span.set_once("gen_ai.time_to_first_token_ms", round((time.time_ns() - span.start_ns) / 1e6, 1))
+
+
+class PooledLLM(LLM):
+    """crewai LLM whose calls count against the process-wide Ollama limit.
+
+    Responses are streamed whenever the current run is (see stream.py), so
+    its listener gets tokens as Ollama produces them. Only streamed calls
+    record ``gen_ai.time_to_first_token_ms`` on their span.
+    """
+
+    @property
+    def stream(self) -> bool:
+        return self._stream or streaming()
+
+    @stream.setter
+    def stream(self, value: bool) -> None:
+        self._stream = value
+
+    def call(self, messages, tools=None, callbacks=None, available_functions=None,
+             from_task=None, from_agent=None):
+        with tracer.span("llm.call", **{"gen_ai.request.model": self.model}) as span:
+            usage = _UsageRecorder()
+            callbacks = [*(callbacks or []), usage]
+            if tracer.enabled:
+                span.set("gen_ai.request.stream", bool(self.stream))
+                span.set("crewai.agent", getattr(from_agent, "role", None))
+            with llm_limiter.slot():
+                if tracer.enabled:
+                    span.set("llm.queue_ms", round((time.time_ns() - span.start_ns) / 1e6, 1))
+                result = super().call(messages, tools=tools, callbacks=callbacks,
+                                      available_functions=available_functions,
+                                      from_task=from_task, from_agent=from_agent)
+            prompt_tokens = _estimate_tokens(messages)
+            prompt_stats.record(getattr(from_task, "name", None) or "other", prompt_tokens, usage.input_tokens)
+            if tracer.enabled:
+                span.set("gen_ai.prompt.estimated_tokens", prompt_tokens)
+                # Ollama does not always report usage; fall back to a chars/4 estimate
+                if usage.input_tokens is None:
+                    span.set("gen_ai.usage.input_tokens", prompt_tokens)
+                    span.set("gen_ai.usage.output_tokens", len(str(result)) // 4)
+                    span.set("gen_ai.usage.estimated", True)
+                else:
+                    span.set("gen_ai.usage.input_tokens", usage.input_tokens)
+                    span.set("gen_ai.usage.output_tokens", usage.output_tokens)
+            return result
+
+
+# One client for every Ollama call. Left to itself litellm caches one per process, but two threads missing
+# that cache at once each build their own, and the loser's is closed mid-stream when it is garbage collected
+ollama_http = HTTPHandler(timeout=httpx.Timeout(timeout=600.0, connect=5.0))
+
+
+def ollama_llm(model: str, **params) -> PooledLLM:
+    """PooledLLM for a local Ollama model."""
+    return PooledLLM(
+        provider="ollama",
+        model=f"ollama/{model}",
+        base_url=OLLAMA_BASE_URL,
+        api_key="ollama",
+        client=ollama_http,
+        **params,
+    )
@@ -1,115 +1,92 @@
-import warnings
-import json
-from typing import List
-
-from tzlocal import get_localzone
-from datetime import datetime
-from pydantic import BaseModel
-
-from crewai import Crew, Process
-from crewai.flow.flow import Flow, listen, start
-
-from calendar_assistant_flow.crews.Manager_crew.manager_crew import ManagerServiceCrew
-from calendar_assistant_flow.crews.Assistant_crew.assistant_crew import CalendarAssistant
-
-warnings.filterwarnings("ignore", category=SyntaxWarning, module="pysbd")
-
-calendar_assistant = CalendarAssistant()
-
-class CalendarState(BaseModel):
-    id: str = "1"
-    question: str = (
-        "Can you help me check my availability and schedule a meeting with "
-        "joe@gmail.com by 9pm today for daily standup."
-    )
-    chosen_assistant: List[str] = []
-    response: List[str] = []
-    current_date: str = ""
-
-class CalendarAssistantFlow(Flow[CalendarState]):
-    initial_state = CalendarState
-
-    @start()
-    def execute_manager(self):
-        print("Kickoff the Manager Crew")
-        local_tz = get_localzone()
-        current_date = str(datetime.now(local_tz).date())
-
-        router_output = (
-            ManagerServiceCrew()
-            .crew()
-            .kickoff(inputs={"question": self.state.question})
-        )
-        # CrewOutput may be a string or have .raw; normalize to dict
-        try:
-            raw = router_output if isinstance(router_output, str) else router_output.raw  # type: ignore
-        except Exception:
-            raw = str(router_output)
-
-        data = json.loads(raw) if isinstance(raw, str) else raw
-        agent_name = data["agent"]
-        print(f"[router] agent={agent_name} reason={data.get('reason','')}")
-        chosen_assistant = [agent_name]
-
-        self.state.chosen_assistant = chosen_assistant
-        self.state.current_date = current_date
-        print("Selected_assistant:", chosen_assistant)
-        return chosen_assistant
-
-    @listen(execute_manager)
-    def assistant_crew(self):
-        chosen_assistant = [str(x).strip() for x in self.state.chosen_assistant]
-        print("Chosen assistants:", chosen_assistant)
-
-        # Map agent constructors
-        agent_map = {
-            "meeting_scheduler_assistant": calendar_assistant.meeting_scheduler_assistant,
-            "availability_checker_assistant": calendar_assistant.availability_checker_assistant,
-            "event_checker_assistant": calendar_assistant.event_checker_assistant,
-        }
-
-        # Map tasks in sequence per assistant
-        task_map = {
-            "meeting_scheduler_assistant": [
-                calendar_assistant.meeting_crafter_task,
-                calendar_assistant.meeting_scheduler_task,
-            ],
-            "availability_checker_assistant": [
-                calendar_assistant.dateinterpreter_task,
-                calendar_assistant.availability_checker_task,
-            ],
-            "event_checker_assistant": [
-                calendar_assistant.dateinterpreter_task,
-                calendar_assistant.event_checker_task,
-            ],
-        }
-
-        feedbacks: List[str] = []
-        for name in chosen_assistant:
-            fn = agent_map.get(name)
-            if not fn:
-                print(f"No agent ctor for: {name}")
-                continue
-
-            agent = fn()
-            tasks = [t() for t in task_map.get(name, [])]
-            if not tasks:
-                print(f"No tasks for: {name}")
-                continue
-
-            c = Crew(agents=[agent], tasks=tasks, process=Process.sequential, verbose=True)
-            out = c.kickoff(inputs={"question": self.state.question, "current_date": self.state.current_date})
-            feedbacks.append(f"{name}: {out}")
-
-        self.state.response = feedbacks
-
-    @listen(assistant_crew)
-    def generate_client_response(self):
-        return self.state.response
+# main.py
+"""Entry points: kickoff, plot, authorize, run_question and warmup.
+
+Importing this module is cheap. crewai, the crews and their LLM clients and
+the Google libraries load the first time a flow is built (see
+``profile_startup`` for the import-time breakdown).
+"""
+import time
+from typing import Optional
+
+from dotenv import load_dotenv
+
+# The one place .env is read; modules read their settings from os.environ at import
+load_dotenv()
+
+from calendar_assistant_flow.tracing import tracer
+
+
+def __getattr__(name):
+    # CalendarAssistantFlow and CalendarState used to live here
+    if name in ("CalendarAssistantFlow", "CalendarState"):
+        from calendar_assistant_flow import flow
+        return getattr(flow, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def warmup(instances: int = 1) -> None:
+    """Pre-build crews, run the Ollama readiness check, load the models and connect the Calendar client."""
+    from calendar_assistant_flow.flow import assistant_pool, manager_pool, ollama_models
+    from calendar_assistant_flow.ollama import keep_alive, warm_up
+    from calendar_assistant_flow.tools.calendar_client import calendar_clients
+
+    assistant_pool.prewarm(instances)
+    manager_pool.prewarm(instances, setup=lambda manager: manager.crew())
+    models = ollama_models()
+    loads = warm_up(models)
+    print(f"[warmup] Ollama models loaded (ms): {loads}")
+    keep_alive.start(models)
+    try:
+        calendar_clients.service()
+    except Exception as e:
+        print(f"[warmup] Calendar client not ready: {e}")
+
+def run_question(question: str, user: Optional[str] = None, flow_id: Optional[str] = None) -> dict:
+    """Run one flow for ``question`` on ``user``'s calendar and return its response, timing and Google quota cost.
+
+    Passing the ``flow_id`` of an earlier run of the same question resumes it
+    from its checkpoints (see checkpoint.py) instead of starting over.
+    """
+    from calendar_assistant_flow.flow import CalendarAssistantFlow
+    from calendar_assistant_flow.tools.calendar_client import as_user
+    from calendar_assistant_flow.tools.google_api import metered
+
+    t0 = time.perf_counter()
+    flow = CalendarAssistantFlow()
+    inputs = {"question": question} if flow_id is None else {"id": flow_id, "question": question}
+    with as_user(user), metered() as quota, tracer.span("flow.kickoff", question_chars=len(question)):
+        response = flow.kickoff(inputs=inputs)
+    return {
+        "flow_id": flow.state.id,
+        "response": response,
+        "chosen_assistant": flow.state.chosen_assistant,
+        "latency_ms": round((time.perf_counter() - t0) * 1000, 1),
+        "google_quota": quota.units,
+    }
 
 def kickoff():
+    from calendar_assistant_flow.flow import CalendarAssistantFlow
+
     flow = CalendarAssistantFlow()
-    flow.kickoff()
+    with tracer.span("flow.kickoff"):
+        flow.kickoff()
+
+def authorize():
+    """Grant calendar access for a user: ``authorize alice`` (default: GOOGLE_DEFAULT_USER)."""
+    import argparse
+
+    from calendar_assistant_flow.tools.credentials import DEFAULT_USER, credential_store
+
+    ap = argparse.ArgumentParser(description="Store a user's Google Calendar token via the consent flow")
+    ap.add_argument("user", nargs="?", default=DEFAULT_USER)
+    args = ap.parse_args()
+    credential_store.authorize(args.user)
+    print(f"[authorize] stored calendar credentials for {args.user!r}")
+
+def plot():
+    from calendar_assistant_flow.flow import CalendarAssistantFlow
+
+    CalendarAssistantFlow().plot("calendar_assistant_flow")
 
 if __name__ == "__main__":
     kickoff()
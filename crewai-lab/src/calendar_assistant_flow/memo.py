@@ -0,0 +1,165 @@
+# memo.py
+"""Persistent memo of structured LLM outputs for repeated questions.
+
+Router decisions, interpreted dates and crafted meetings are stored in a
+SQLite file keyed on (kind, normalized question, current_date, model).
+Normalization lowercases, collapses whitespace, drops trailing punctuation
+and replaces email addresses with positional placeholders, so
+"Book a call with Ann@x.com " and "book a call with bob@y.org" share an
+entry; emails in the stored output are templated the same way and filled
+back in from the new question on a hit.
+
+    LLM_MEMO=0                     bypass (no reads, no writes)
+    LLM_MEMO_PATH=                 file location (":memory:" for process-local); default
+                                   $XDG_CACHE_HOME/calendar_assistant/llm_memo.sqlite (~/.cache/...),
+                                   so runs from different directories share one memo
+    LLM_MEMO_MAX_ENTRIES=10000     least recently used entries are evicted past this
+"""
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import List, Optional, Tuple, Type, TypeVar
+
+from pydantic import BaseModel, ValidationError
+
+LLM_MEMO_ENABLED = os.getenv("LLM_MEMO", "1") == "1"
+# Per-user cache directory, shared with the flow checkpoints
+CACHE_DIR = os.path.join(os.getenv("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache"),
+                          "calendar_assistant")
+LLM_MEMO_PATH = os.getenv("LLM_MEMO_PATH") or os.path.join(CACHE_DIR, "llm_memo.sqlite")
+LLM_MEMO_MAX_ENTRIES = int(os.getenv("LLM_MEMO_MAX_ENTRIES", "10000"))
+
+_EMAIL = re.compile(r"[\w.+-]+@[\w-]+(?:\.[\w-]+)+")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS memo (
+    key        TEXT PRIMARY KEY,
+    kind       TEXT NOT NULL,
+    value      TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    used_at    REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_memo_used ON memo (used_at);
+"""
+
+M = TypeVar("M", bound=BaseModel)
+
+
+def normalize_question(question: str) -> Tuple[str, List[str]]:
+    """(normalized text, emails in order of first appearance)."""
+    emails: List[str] = []
+    for m in _EMAIL.findall(question):
+        if m.lower() not in emails:
+            emails.append(m.lower())
+    text = _EMAIL.sub(lambda m: f"<email{emails.index(m[0].lower())}>", question)
+    return " ".join(text.lower().split()).rstrip(" .!?"), emails
+
+
+def _template(text: str, emails: List[str]) -> str:
+    for i, email in enumerate(emails):
+        text = re.sub(re.escape(email), f"<email{i}>", text, flags=re.IGNORECASE)
+    return text
+
+
+def _fill(text: str, emails: List[str]) -> str:
+    for i, email in enumerate(emails):
+        text = text.replace(f"<email{i}>", email)
+    return text
+
+
+class LLMMemo:
+    """Thread-safe, size-bounded SQLite memo of pydantic LLM outputs."""
+
+    def __init__(self, path: str = LLM_MEMO_PATH, max_entries: int = LLM_MEMO_MAX_ENTRIES,
+                 enabled: bool = LLM_MEMO_ENABLED):
+        self.path = path
+        self.max_entries = max_entries
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        self._stats = {"hits": 0, "misses": 0, "writes": 0, "evictions": 0}
+
+    def _conn(self) -> sqlite3.Connection:
+        # Opened on first use so importing the module never touches the disk
+        if self._db is None:
+            directory = os.path.dirname(self.path) if self.path != ":memory:" else ""
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._db = sqlite3.connect(self.path, check_same_thread=False)
+            self._db.executescript(_SCHEMA)
+        return self._db
+
+    @staticmethod
+    def _key(kind: str, normalized: str, current_date: str, model: str) -> str:
+        raw = "\x1f".join((kind, normalized, current_date, model))
+        return hashlib.sha256(raw.encode()).hexdigest()
+
+    def get(self, kind: str, question: str, current_date: str, model: str, schema: Type[M]) -> Optional[M]:
+        if not self.enabled:
+            return None
+        normalized, emails = normalize_question(question)
+        key = self._key(kind, normalized, current_date, model)
+        with self._lock:
+            db = self._conn()
+            row = db.execute("SELECT value FROM memo WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self._stats["misses"] += 1
+                return None
+            db.execute("UPDATE memo SET used_at = ? WHERE key = ?", (time.time(), key))
+            db.commit()
+        try:
+            value = schema.model_validate_json(_fill(row[0], emails))
+        except ValidationError:
+            # Schema changed since it was stored: treat as a miss
+            with self._lock:
+                self._stats["misses"] += 1
+            return None
+        if "original_query" in schema.model_fields:
+            value = value.model_copy(update={"original_query": question})
+        with self._lock:
+            self._stats["hits"] += 1
+        return value
+
+    def put(self, kind: str, question: str, current_date: str, model: str, value: BaseModel) -> None:
+        if not self.enabled:
+            return
+        normalized, emails = normalize_question(question)
+        key = self._key(kind, normalized, current_date, model)
+        now = time.time()
+        with self._lock:
+            db = self._conn()
+            db.execute(
+                "INSERT OR REPLACE INTO memo (key, kind, value, created_at, used_at) VALUES (?, ?, ?, ?, ?)",
+                (key, kind, _template(value.model_dump_json(), emails), now, now),
+            )
+            self._stats["writes"] += 1
+            (count,) = db.execute("SELECT COUNT(*) FROM memo").fetchone()
+            if count > self.max_entries:
+                # Evict a tenth at a time so a full memo does not pay for a DELETE on every write
+                excess = count - self.max_entries + max(self.max_entries // 10, 1)
+                db.execute(
+                    "DELETE FROM memo WHERE key IN (SELECT key FROM memo ORDER BY used_at LIMIT ?)",
+                    (excess,),
+                )
+                self._stats["evictions"] += excess
+            db.commit()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn().execute("DELETE FROM memo")
+            self._conn().commit()
+
+    def stats(self) -> dict:
+        with self._lock:
+            out = dict(self._stats, enabled=self.enabled, max_entries=self.max_entries)
+            if self.enabled and self._db is not None:
+                out["entries"] = self._db.execute("SELECT COUNT(*) FROM memo").fetchone()[0]
+        lookups = out["hits"] + out["misses"]
+        out["hit_rate"] = round(out["hits"] / lookups, 3) if lookups else None
+        return out
+
+
+llm_memo = LLMMemo()
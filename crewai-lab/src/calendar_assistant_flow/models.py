@@ -1,5 +1,5 @@
-from typing import Tuple, List, Optional, Union
-from pydantic import BaseModel, Field,EmailStr
+from typing import Tuple, List, Literal, Optional, Union
+from pydantic import BaseModel, Field,EmailStr, model_validator
 from datetime import date, datetime, time
 
 
@@ -8,12 +8,12 @@ class AgentSelection(BaseModel):
 
 class MeetingCrafter(BaseModel):
     """Model for crafting meetings and events"""
-    summary: str = Field(..., description="Meeting Title")
-    location: Optional[str] = Field(None, description="The location of the event")
-    description: Optional[str] = Field(None, description="A short description of the event is all about")
-    start: str = Field(..., description="The Start datetime the user sent in string format")
-    end: str  = Field(..., description="end datetime the user sent in string format")
-    attendees: List[EmailStr] = Field(None, description="The guest joining the meeting")
+    summary: str = Field(..., description="Meeting title")
+    location: str = Field(default="", description="Meeting location")
+    description: str = Field(default="", description="Meeting description")
+    start: str = Field(..., description="Start time in YYYY-MM-DDTHH:MM:SS")
+    end: str = Field(..., description="End time in YYYY-MM-DDTHH:MM:SS")
+    attendees: List[str] = Field(default_factory=list, description="Attendee emails")
 
 class MeetingScheduler(BaseModel):
     """Model for meeting scheduler"""
@@ -21,10 +21,42 @@ class MeetingScheduler(BaseModel):
     description: Optional[str] = Field(..., description="A short summary of the response")
 
 
+class MeetingResult(BaseModel):
+    """Model for the created calendar event"""
+    status: str
+    id: str
+    summary: str
+    start: str
+    end: str
+    htmlLink: Optional[str] = None
+
+
+class BulkMeetingItem(BaseModel):
+    """Outcome of one meeting in a bulk create"""
+    index: int = Field(..., description="Position of the meeting in the request")
+    status: Literal["success", "error"]
+    id: Optional[str] = None
+    summary: Optional[str] = None
+    start: Optional[str] = None
+    end: Optional[str] = None
+    htmlLink: Optional[str] = None
+    error: Optional[str] = None
+
+
+class BulkMeetingResult(BaseModel):
+    """Model for a bulk create: per-meeting outcomes in request order"""
+    created: int
+    failed: int
+    recurrence: Optional[str] = None
+    results: List[BulkMeetingItem]
+
+
 class DateInterpreter(BaseModel):
     """Model for date interpretation"""
-    start: Optional[str] = Field(..., description="The start date and time computed")
-    end: Optional[str] = Field(..., description="The end date and time computed")
+    original_query: str
+    start: str = Field(..., description="The start date and time computed, Month DD, YYYY, HH:MMAM/PM")
+    end: str = Field(..., description="The end date and time computed, Month DD, YYYY, HH:MMAM/PM")
+    timezone: str
     
   
 class AvailabilityChecker(BaseModel):
@@ -32,3 +64,26 @@ class AvailabilityChecker(BaseModel):
     date: Optional[datetime] = Field(..., description="users available date from the calendar")
     available: List[Tuple[time, time]] = Field(..., description= "List of available time intervals")
     # start: Optional[str] = Field(..., description="The start date and time computed")
+
+
+AssistantName = Literal[
+    "meeting_scheduler_assistant",
+    "availability_checker_assistant",
+    "event_checker_assistant",
+]
+
+
+class RouterDecision(BaseModel):
+    agent: AssistantName = Field(..., description="Chosen agent to handle the request")
+    agents: List[AssistantName] = Field(
+        default_factory=list,
+        description="Every assistant a compound question needs, in order; defaults to [agent]",
+    )
+    reason: str = Field(..., description="Short reason for routing")
+    confidence: Optional[float] = Field(None, description="Router confidence in [0, 1]; set by the fast-path router")
+
+    @model_validator(mode="after")
+    def _agents_include_primary(self):
+        agents = self.agents if self.agent in self.agents else [self.agent, *self.agents]
+        self.agents = list(dict.fromkeys(agents))
+        return self
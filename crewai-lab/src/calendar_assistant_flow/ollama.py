@@ -0,0 +1,217 @@
+# ollama.py
+"""Ollama model tiers, warm-up and keep-alive.
+
+Agents choose a tier with ``model_tier`` in their crew's agents.yaml (default
+"large"); a task runs on its agent's tier. Tiers map to Ollama models:
+
+    LLM_MODEL=llama3.1:8b             large: tool-using assistants, anything untiered
+    LLM_MODEL_SMALL=llama3.2:3b       small: routing and JSON extraction
+    OLLAMA_KEEP_ALIVE=30m             how long warmed models stay loaded (Ollama duration, -1 = forever)
+    OLLAMA_KEEP_ALIVE_REFRESH=120     seconds between keep-alive pings, 0 disables
+    OLLAMA_READY_TTL_SECONDS=30       how often ollama_monitor re-reads /api/tags
+
+litellm sends ``keep_alive`` inside ``options`` on /api/generate, where Ollama
+ignores it, so every generation resets a model's expiry to the server default
+(5m unless the Ollama server sets OLLAMA_KEEP_ALIVE). warm_up() loads models
+with our keep_alive up front and KeepAlive re-pins them in the background, so
+an idle spell longer than the server default does not unload them.
+
+ollama_monitor answers "is Ollama up with our models installed?" from a
+cached /api/tags result that a background thread keeps fresh, so building a
+crew does not cost an HTTP round trip. All calls here share one pooled
+requests.Session.
+"""
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set
+
+import requests
+import yaml
+
+OLLAMA_BASE_URL = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434").rstrip("/")
+OLLAMA_KEEP_ALIVE = os.getenv("OLLAMA_KEEP_ALIVE", "30m")
+OLLAMA_KEEP_ALIVE_REFRESH = float(os.getenv("OLLAMA_KEEP_ALIVE_REFRESH", "120"))
+OLLAMA_READY_TTL_SECONDS = float(os.getenv("OLLAMA_READY_TTL_SECONDS", "30"))
+
+MODEL_TIERS = {
+    "small": os.getenv("LLM_MODEL_SMALL", "llama3.2:3b"),
+    "large": os.getenv("LLM_MODEL", "llama3.1:8b"),
+}
+DEFAULT_TIER = "large"
+
+# Keep-alive connections to Ollama shared by everything in this module
+session = requests.Session()
+
+
+def tier_model(tier: str) -> str:
+    try:
+        return MODEL_TIERS[tier]
+    except KeyError:
+        raise ValueError(f"Unknown model_tier {tier!r}; expected one of {sorted(MODEL_TIERS)}") from None
+
+
+def agent_models(agents_config: Path) -> Dict[str, str]:
+    """Ollama model for each agent in an agents.yaml, from its ``model_tier``."""
+    with open(agents_config, encoding="utf-8") as f:
+        agents = yaml.safe_load(f) or {}
+    return {name: tier_model((cfg or {}).get("model_tier", DEFAULT_TIER)) for name, cfg in agents.items()}
+
+
+def load_model(model: str, keep_alive=OLLAMA_KEEP_ALIVE, timeout: float = 300) -> float:
+    """Load ``model`` (no-op if resident) and set its expiry; returns elapsed ms."""
+    t0 = time.perf_counter()
+    # An empty prompt only loads the model; keep_alive=0 unloads it instead
+    r = session.post(f"{OLLAMA_BASE_URL}/api/generate",
+                     json={"model": model, "keep_alive": keep_alive, "stream": False}, timeout=timeout)
+    r.raise_for_status()
+    return round((time.perf_counter() - t0) * 1000, 1)
+
+
+def unload_model(model: str) -> None:
+    load_model(model, keep_alive=0)
+
+
+def loaded_models() -> Dict[str, str]:
+    """Resident models and when Ollama will unload them."""
+    r = session.get(f"{OLLAMA_BASE_URL}/api/ps", timeout=8)
+    r.raise_for_status()
+    return {m.get("name"): m.get("expires_at") for m in r.json().get("models", [])}
+
+
+def warm_up(models: Iterable[str], keep_alive=OLLAMA_KEEP_ALIVE) -> Dict[str, Optional[float]]:
+    """Load each model with ``keep_alive``; ms per model, None where loading failed."""
+    loads: Dict[str, Optional[float]] = {}
+    for model in models:
+        try:
+            loads[model] = load_model(model, keep_alive)
+        except requests.RequestException as e:
+            print(f"[warmup] Could not load Ollama model {model}: {e}")
+            loads[model] = None
+    return loads
+
+
+class KeepAlive:
+    """Background thread that re-pins models before Ollama's default expiry unloads them."""
+
+    def __init__(self, interval: float = OLLAMA_KEEP_ALIVE_REFRESH, keep_alive=OLLAMA_KEEP_ALIVE):
+        self.interval = interval
+        self.keep_alive = keep_alive
+        self.models: List[str] = []
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self, models: Iterable[str]) -> None:
+        self.models = sorted(set(models))
+        if self.interval <= 0 or (self._thread is not None and self._thread.is_alive()):
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="ollama-keep-alive", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self) -> None:
+        while True:
+            for model in self.models:
+                try:
+                    load_model(model, self.keep_alive)
+                except requests.RequestException:
+                    # Ollama restarting or busy: the next tick tries again
+                    pass
+            if self._stop.wait(self.interval):
+                return
+
+
+keep_alive = KeepAlive()
+
+
+class OllamaMonitor:
+    """Cached Ollama health and installed-model list, refreshed in the background.
+
+    The first check blocks (nothing is cached yet); after that, assert_ready()
+    only reads the cache and raises straight away while Ollama is known to be
+    down. The refresher re-reads /api/tags every ``ttl`` seconds, or sooner
+    while Ollama is down so recovery is noticed quickly.
+    """
+
+    def __init__(self, ttl: float = OLLAMA_READY_TTL_SECONDS, timeout: float = 8):
+        self.ttl = ttl
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._models: Optional[Set[str]] = None
+        self._error: Optional[str] = None
+        self._checked_at: Optional[float] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._stats = {"checks": 0, "failures": 0, "cached_answers": 0}
+
+    def refresh(self) -> None:
+        """Re-read /api/tags now."""
+        try:
+            r = session.get(f"{OLLAMA_BASE_URL}/api/tags", timeout=self.timeout)
+            r.raise_for_status()
+            models, error = {m.get("name") for m in r.json().get("models", [])}, None
+        except (requests.RequestException, ValueError) as e:
+            models, error = None, f"{type(e).__name__}: {e}"
+        with self._lock:
+            self._models, self._error = models, error
+            self._checked_at = time.monotonic()
+            self._stats["checks"] += 1
+            self._stats["failures"] += error is not None
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="ollama-monitor", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self) -> None:
+        while True:
+            with self._lock:
+                down = self._error is not None
+            if self._stop.wait(min(self.ttl, 5) if down else self.ttl):
+                return
+            self.refresh()
+
+    def assert_ready(self, models: Iterable[str]) -> None:
+        """Fail fast if Ollama is offline or one of ``models`` is not installed."""
+        with self._lock:
+            checked = self._checked_at is not None
+        if not checked:
+            self.refresh()
+            self.start()
+        with self._lock:
+            installed, error = self._models, self._error
+            self._stats["cached_answers"] += checked
+        if error is not None:
+            raise RuntimeError(
+                f"Cannot connect to Ollama at {OLLAMA_BASE_URL}. Start it with 'ollama serve'. ({error})"
+            )
+        missing = sorted(set(models) - installed)
+        if missing:
+            raise RuntimeError(
+                f"Ollama model(s) {missing} not found. Install with: "
+                + " && ".join(f"ollama pull {m}" for m in missing)
+            )
+
+    def stats(self) -> dict:
+        with self._lock:
+            age = None if self._checked_at is None else round(time.monotonic() - self._checked_at, 1)
+            return dict(self._stats, ready=self._checked_at is not None and self._error is None,
+                        error=self._error, models=sorted(self._models or []), age_seconds=age, ttl=self.ttl)
+
+
+ollama_monitor = OllamaMonitor()
@@ -0,0 +1,49 @@
+# pool.py
+import queue
+import threading
+from contextlib import contextmanager
+from typing import Callable, Generic, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class CrewPool(Generic[T]):
+    """Pool of ready-built @CrewBase instances.
+
+    Building a crew class parses its YAML configs, and its @agent/@task
+    methods are memoized per instance, so an instance is expensive to make
+    but cheap to reuse. crewai mutates tasks and agents during kickoff, so
+    each instance is leased to one request at a time; the pool grows on
+    demand when every instance is busy.
+    """
+
+    def __init__(self, factory: Callable[[], T]):
+        self.factory = factory
+        self._idle: "queue.LifoQueue[T]" = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self.created = 0
+
+    def _new(self) -> T:
+        instance = self.factory()
+        with self._lock:
+            self.created += 1
+        return instance
+
+    def prewarm(self, n: int, setup: Optional[Callable[[T], object]] = None) -> None:
+        """Make sure at least ``n`` instances exist, running ``setup`` on each new one."""
+        while self.created < n:
+            instance = self._new()
+            if setup is not None:
+                setup(instance)
+            self._idle.put(instance)
+
+    @contextmanager
+    def lease(self):
+        try:
+            instance = self._idle.get_nowait()
+        except queue.Empty:
+            instance = self._new()
+        try:
+            yield instance
+        finally:
+            self._idle.put(instance)
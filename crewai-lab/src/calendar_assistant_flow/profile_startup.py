@@ -0,0 +1,91 @@
+# profile_startup.py
+"""Import-time profile of the entry points, checked against a startup budget.
+
+    profile_startup                                   # every entry point
+    profile_startup calendar_assistant_flow.main --budget-ms 150
+    profile_startup --top 15 --repeat 5
+
+Each module is imported in a fresh interpreter under ``python -X importtime``
+(best of --repeat runs). The report gives the import's wall time, self time
+summed per top-level package and the slowest individual imports. The exit
+status is 1 when a module with a budget goes over it, so CI can run this as
+a startup regression check.
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+# Wall-time budgets (ms). The flow itself imports crewai, so it is reported but not budgeted.
+STARTUP_BUDGETS_MS: Dict[str, Optional[float]] = {
+    "calendar_assistant_flow.main": float(os.getenv("STARTUP_BUDGET_MS", "250")),
+    "calendar_assistant_flow.batch": float(os.getenv("STARTUP_BUDGET_MS", "250")),
+    "calendar_assistant_flow.server": 600.0,
+    "calendar_assistant_flow.flow": None,
+}
+
+_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+# (self us, cumulative us, depth, module)
+Row = Tuple[int, int, int, str]
+
+
+def _import_once(module: str) -> Tuple[float, List[Row]]:
+    code = f"import time; t = time.perf_counter(); import {module}; print((time.perf_counter() - t) * 1000)"
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                          capture_output=True, text=True, env={**os.environ, "PYTHONWARNINGS": "ignore"})
+    if proc.returncode != 0:
+        raise RuntimeError(f"importing {module} failed:\n{proc.stderr[-2000:]}")
+    rows = [(int(m[1]), int(m[2]), len(m[3]) // 2, m[4]) for m in _LINE.finditer(proc.stderr)]
+    # Output is post-order: the module's subtree is everything after the previous top-level line
+    start = max((i + 1 for i, r in enumerate(rows[:-1]) if r[2] == 0), default=0)
+    return float(proc.stdout.strip().splitlines()[-1]), rows[start:]
+
+
+def profile(module: str, repeat: int = 3) -> Tuple[float, List[Row]]:
+    """(best wall ms, importtime rows of that run) for importing ``module``."""
+    return min((_import_once(module) for _ in range(repeat)), key=lambda run: run[0])
+
+
+def report(module: str, wall_ms: float, rows: List[Row], budget: Optional[float], top: int) -> bool:
+    ok = budget is None or wall_ms <= budget
+    verdict = "no budget" if budget is None else f"budget {budget:.0f}ms {'OK' if ok else 'OVER'}"
+    print(f"\n{module}: {wall_ms:.1f}ms ({verdict}), {len(rows)} modules imported")
+
+    by_package = Counter()
+    for self_us, _, _, name in rows:
+        by_package[name.split(".")[0]] += self_us
+    print(f"  {'package':<32} {'self ms':>9}")
+    for package, us in by_package.most_common(top):
+        print(f"  {package:<32} {us / 1000:>9.1f}")
+
+    print(f"  {'slowest imports':<48} {'cumulative ms':>14}")
+    for _, cum_us, depth, name in sorted(rows, key=lambda r: -r[1])[1:top + 1]:
+        print(f"  {'  ' * min(depth, 4) + name:<48} {cum_us / 1000:>14.1f}")
+    return ok
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("modules", nargs="*", default=list(STARTUP_BUDGETS_MS))
+    ap.add_argument("--budget-ms", type=float, help="budget for every listed module (default: per module)")
+    ap.add_argument("--repeat", type=int, default=3, help="runs per module; the fastest is reported")
+    ap.add_argument("--top", type=int, default=10, help="rows in each breakdown")
+    args = ap.parse_args()
+
+    over = []
+    for module in args.modules:
+        budget = args.budget_ms if args.budget_ms is not None else STARTUP_BUDGETS_MS.get(module)
+        wall_ms, rows = profile(module, args.repeat)
+        if not report(module, wall_ms, rows, budget, args.top):
+            over.append(module)
+    if over:
+        print(f"\nover budget: {', '.join(over)}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
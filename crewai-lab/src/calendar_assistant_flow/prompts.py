@@ -0,0 +1,147 @@
+# prompts.py
+"""Prompt layout shared by every crew: one stable prefix first, the question last.
+
+Ollama (llama.cpp) keeps the evaluated prompt of each request and, on the
+next one, only evaluates the tokens after the longest prefix the two share.
+crewai's default layout starts every system prompt with the agent's role and
+the task descriptions had the question in the middle, so consecutive calls
+shared a few tokens at most. The crews now run with these crewai prompt
+slices instead:
+
+    system   SYSTEM_PREFIX, then the answer format or tool list    same for every tool-less agent
+    user     role and goal, task instructions, expected answer     same for every call of a task
+             ... and last the run's inputs (date, dates, question)
+
+Task descriptions in the crews' tasks.yaml end with their inputs for the
+same reason. The slices go into a crewai prompt file, prompt_file(), which
+every Crew is built with; crewai formats a task's expected output with the
+task's own i18n, so tasks take i18n().
+
+Each LLM call's prompt is counted per task in prompt_stats:
+
+    prompt_tokens      size of the prompt sent (chars / 4)
+    evaluated_tokens   what Ollama reports evaluating (prompt_eval_count; the cached prefix is not re-evaluated)
+    budget             ``prompt_token_budget`` in tasks.yaml; calls over it are counted and logged
+
+    CREW_VERBOSE=1     crewai's step-by-step console output for agents and crews (off by default)
+"""
+import functools
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, Optional
+
+import yaml
+
+if TYPE_CHECKING:
+    from crewai.utilities.i18n import I18N
+
+CREW_VERBOSE = os.getenv("CREW_VERBOSE", "0") == "1"
+
+SYSTEM_PREFIX = """You are one of the assistants of a Google Calendar service. Each request names your role and \
+one task; do exactly that task and nothing else.
+
+Rules for every answer:
+- Follow the answer format below and the task's expected answer exactly.
+- When the task asks for JSON, the Final Answer is only that JSON: no markdown fences, no comments, no prose.
+- Use only the dates, times, people and events given in the task or returned by a tool. Never invent them.
+- Times are in the user's local timezone unless the task says otherwise.
+- Be brief: no explanations unless the task asks for one."""
+
+# crewai slices (see crewai/translations/en.json) rewritten for the layout above. The tools slice
+# is also str.format()ted with just tools and tool_names, so it may hold no other braces
+SLICES = {
+    "role_playing": SYSTEM_PREFIX,
+    "no_tools": "\n\nAnswer format:\n\nThought: I now can give a great answer\nFinal Answer: the complete answer",
+    "tools": (
+        "\n\nTo use a tool, reply with:\n\n```\nThought: what to do next\n"
+        "Action: the tool to use, one of [{tool_names}], written exactly as listed\n"
+        "Action Input: the tool's input as a JSON object, with \" around keys and values\n"
+        "Observation: the tool's result\n```\n\n"
+        "Once you have what you need, reply with:\n\n```\nThought: I now know the final answer\n"
+        "Final Answer: the complete answer\n```\n\n"
+        "Your tools (use no others):\n\n{tools}"
+    ),
+    "task": "\nYou are the {role}. {backstory}\nGoal: {goal}\n\nCurrent Task: {input}\n\nThought:",
+    "expected_output": "\nExpected answer: {expected_output}",
+}
+
+
+@functools.lru_cache(maxsize=None)
+def prompt_file() -> str:
+    """Path of a crewai prompt file: crewai's own prompts with SLICES in place of its slices."""
+    import crewai
+
+    with open(Path(crewai.__file__).parent / "translations" / "en.json", encoding="utf-8") as f:
+        prompts = json.load(f)
+    prompts["slices"].update(SLICES)
+    text = json.dumps(prompts, ensure_ascii=False, indent=2)
+    path = Path(tempfile.gettempdir()) / f"calendar_assistant_prompts-{hashlib.sha1(text.encode()).hexdigest()[:12]}.json"
+    if not path.exists():
+        # Written under a unique name, then renamed: concurrent processes never read half a file
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(text, encoding="utf-8")
+        os.replace(tmp, path)
+    return str(path)
+
+
+@functools.lru_cache(maxsize=None)
+def i18n() -> "I18N":
+    """crewai I18N over prompt_file(), for tasks."""
+    from crewai.utilities.i18n import I18N
+
+    return I18N(prompt_file=prompt_file())
+
+
+def task_budgets(tasks_config: Path) -> Dict[str, int]:
+    """``prompt_token_budget`` of each task in a tasks.yaml that sets one."""
+    with open(tasks_config, encoding="utf-8") as f:
+        tasks = yaml.safe_load(f) or {}
+    return {name: int(cfg["prompt_token_budget"]) for name, cfg in tasks.items()
+            if (cfg or {}).get("prompt_token_budget") is not None}
+
+
+class PromptStats:
+    """Prompt tokens per task, against the task's budget."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.budgets: Dict[str, int] = {}
+        self._tasks: Dict[str, dict] = {}
+
+    def record(self, task: str, prompt_tokens: int, evaluated_tokens: Optional[int] = None) -> None:
+        budget = self.budgets.get(task)
+        with self._lock:
+            s = self._tasks.setdefault(task, {"calls": 0, "prompt_tokens": 0, "max_prompt_tokens": 0,
+                                              "reported": 0, "evaluated_tokens": 0, "over_budget": 0})
+            s["calls"] += 1
+            s["prompt_tokens"] += prompt_tokens
+            s["max_prompt_tokens"] = max(s["max_prompt_tokens"], prompt_tokens)
+            if evaluated_tokens is not None:
+                s["reported"] += 1
+                s["evaluated_tokens"] += evaluated_tokens
+            over = budget is not None and prompt_tokens > budget
+            first_over = over and not s["over_budget"]
+            s["over_budget"] += over
+        if first_over:
+            print(f"[prompt] {task}: ~{prompt_tokens} prompt tokens, over its budget of {budget}")
+
+    def snapshot(self) -> Dict[str, dict]:
+        with self._lock:
+            out = {}
+            for task, s in self._tasks.items():
+                out[task] = {
+                    "calls": s["calls"],
+                    "avg_prompt_tokens": round(s["prompt_tokens"] / s["calls"]),
+                    "max_prompt_tokens": s["max_prompt_tokens"],
+                    "avg_evaluated_tokens": round(s["evaluated_tokens"] / s["reported"]) if s["reported"] else None,
+                    "budget": self.budgets.get(task),
+                    "over_budget": s["over_budget"],
+                }
+            return out
+
+
+prompt_stats = PromptStats()
@@ -0,0 +1,294 @@
+# server.py
+"""Long-running HTTP service around CalendarAssistantFlow.
+
+Crews, LLM clients, YAML configs and the Calendar client are built once at
+startup and kept warm; each request only pays for the flow itself. Every
+request acts for one user, whose stored Google credentials and calendar it
+uses, and the server decides who that may be:
+
+    SERVICE_API_KEYS="k1=alice,k2=bob"  requests must send "Authorization: Bearer <key>" and act
+                                         as that key's user (401 without a valid key; 403 if the
+                                         body's "user" names someone else)
+    SERVICE_USERS="alice,bob"           without API keys: the users "user" may name (403 otherwise);
+                                         default GOOGLE_DEFAULT_USER only
+
+Users are never asked for consent from a request: one without a stored token
+gets a 403 until ``authorize <user>`` has been run (see credentials.py). Every answer, and every 500, carries a
+"flow_id"; sending it back with the same question resumes that run from
+its last completed step (see checkpoint.py). A 500 (or a stream's error
+event) only says "internal error"; the exception is printed in the server log.
+
+    serve --host 127.0.0.1 --port 8080 --max-concurrency 4
+
+    POST /ask     {"question": "...", "user": "...", "flow_id": "..."}
+                  -> {"flow_id": "...", "response": [...], "chosen_assistant": [...], "latency_ms": ..., "google_quota": n}
+    POST /ask/stream  same body -> text/event-stream of route/token/tool/branch events, then final (see stream.py)
+    POST /meetings  {"meetings": [{"summary", "start", "end", ...}], "recurrence": "RRULE:...", "user": "..."}
+                  -> {"created": n, "failed": n, "results": [...]}  bulk create, no LLM (see schedule_meetings)
+    GET  /health                       -> {"status": "ok", "in_flight": n, ...}
+    GET  /stats                        -> latency percentiles, Calendar client, quota and cache stats
+"""
+import argparse
+import hmac
+import json
+import os
+import threading
+import time
+import traceback
+from collections import deque
+from uuid import uuid4
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from calendar_assistant_flow.checkpoint import checkpoints
+from calendar_assistant_flow.main import run_question, warmup
+from calendar_assistant_flow.memo import llm_memo
+from calendar_assistant_flow.ollama import ollama_monitor
+from calendar_assistant_flow.stream import stream_question
+from calendar_assistant_flow.prompts import prompt_stats
+from calendar_assistant_flow.structured import structured_stats
+from calendar_assistant_flow.tools.calendar_client import as_user, calendar_clients
+from calendar_assistant_flow.tools.credentials import DEFAULT_USER, UserNotAuthorized, credential_store
+from calendar_assistant_flow.tools.google_api import google_api
+from calendar_assistant_flow.tools.query_cache import query_cache
+
+# key -> user; see the module docstring
+API_KEYS = dict(pair.split("=", 1) for pair in os.getenv("SERVICE_API_KEYS", "").split(",") if "=" in pair)
+ALLOWED_USERS = frozenset(u.strip() for u in os.getenv("SERVICE_USERS", DEFAULT_USER).split(",") if u.strip())
+# All a client learns about a failure; the details go to the server log
+INTERNAL_ERROR = "internal error"
+
+
+class Forbidden(Exception):
+    """The request may not act for the user it asked for."""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+def authenticate(authorization: str, requested: str = None) -> str:
+    """User a request acts for, from its Authorization header and body "user"; raises Forbidden."""
+    if API_KEYS:
+        scheme, _, key = (authorization or "").partition(" ")
+        user = None
+        if scheme.lower() == "bearer":
+            # Every key compared in constant time, so timing gives nothing away
+            for known, owner in API_KEYS.items():
+                if hmac.compare_digest(known.encode(), key.strip().encode()):
+                    user = owner
+        if user is None:
+            raise Forbidden(401, "missing or invalid API key")
+        if requested and requested != user:
+            raise Forbidden(403, f"this API key acts for {user!r}, not {requested!r}")
+        return user
+    user = requested or DEFAULT_USER
+    if user not in ALLOWED_USERS:
+        raise Forbidden(403, f"user {user!r} is not served here")
+    return user
+
+
+class ServiceStats:
+    """Request counters plus a sliding window of latencies."""
+
+    def __init__(self, window: int = 1000):
+        self._lock = threading.Lock()
+        self._latencies = deque(maxlen=window)
+        self.started = time.time()
+        self.requests = 0
+        self.errors = 0
+        self.in_flight = 0
+
+    def begin(self) -> None:
+        with self._lock:
+            self.requests += 1
+            self.in_flight += 1
+
+    def end(self, latency_ms: float, ok: bool) -> None:
+        with self._lock:
+            self.in_flight -= 1
+            self.errors += not ok
+            self._latencies.append(latency_ms)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            lat = sorted(self._latencies)
+        pct = lambda q: round(lat[min(int(q * len(lat)), len(lat) - 1)], 1) if lat else None
+        return {
+            "uptime_s": round(time.time() - self.started, 1),
+            "requests": self.requests,
+            "errors": self.errors,
+            "in_flight": self.in_flight,
+            "latency_ms": {"p50": pct(0.50), "p95": pct(0.95), "p99": pct(0.99), "window": len(lat)},
+        }
+
+
+class AssistantHandler(BaseHTTPRequestHandler):
+    server: "AssistantServer"
+
+    def _send_json(self, status: int, payload: dict) -> None:
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == "/health":
+            self._send_json(200, {"status": "ok", "in_flight": self.server.stats.in_flight})
+        elif self.path == "/stats":
+            self._send_json(200, {
+                **self.server.stats.snapshot(),
+                "calendar_client": calendar_clients.stats(),
+                "google_api": google_api.stats(),
+                "query_cache": query_cache.stats(),
+                "llm_memo": llm_memo.stats(),
+                "checkpoints": checkpoints.stats(),
+                "ollama": ollama_monitor.stats(),
+                "structured_output": structured_stats.snapshot(),
+                "prompts": prompt_stats.snapshot(),
+            })
+        else:
+            self._send_json(404, {"error": "not found"})
+
+    def _send_events(self, events) -> bool:
+        """Write ``events`` as server-sent events, one flush each; True if the last was "final"."""
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        last, connected = None, True
+        for last in events:
+            if not connected:
+                continue  # drain: the run keeps its concurrency slot until it ends
+            if last["type"] == "error":
+                print(f"[serve] {self.path} flow {last.get('flow_id')} failed: {last['error']}")
+                last = dict(last, error=INTERNAL_ERROR)
+            try:
+                self.wfile.write(f"event: {last['type']}\ndata: {json.dumps(last)}\n\n".encode())
+                self.wfile.flush()
+            except (BrokenPipeError, ConnectionResetError):
+                connected = False
+        return last is not None and last["type"] == "final"
+
+    def do_POST(self):
+        if self.path == "/meetings":
+            self._create_meetings()
+            return
+        if self.path not in ("/ask", "/ask/stream"):
+            self._send_json(404, {"error": "not found"})
+            return
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            body = json.loads(self.rfile.read(length) or b"{}")
+            question, user = body["question"], body.get("user")
+            flow_id = str(body.get("flow_id") or uuid4())
+        except (ValueError, KeyError, TypeError):
+            self._send_json(400, {"error": 'expected JSON body {"question": "...", "user": "...", "flow_id": "..."}'})
+            return
+        try:
+            user = authenticate(self.headers.get("Authorization"), user)
+        except Forbidden as e:
+            self._send_json(e.status, {"error": str(e)})
+            return
+
+        if self.path == "/ask/stream":
+            self._serve(lambda: self._send_events(stream_question(question, user=user, flow_id=flow_id)),
+                        flow_id=flow_id)
+        else:
+            self._serve(lambda: run_question(question, user=user, flow_id=flow_id), flow_id=flow_id)
+
+    def _serve(self, work, **context) -> None:
+        """Answer with work()'s JSON result, run in a concurrency slot and counted in the stats.
+
+        A work() that answers by itself (a stream) returns whether it succeeded
+        instead of a result. ``context`` (the flow_id) goes into error bodies.
+        """
+        stats = self.server.stats
+        t0 = time.perf_counter()
+        stats.begin()
+        ok = False
+        try:
+            with self.server.slots:
+                result = work()
+            if isinstance(result, bool):
+                ok = result
+                return
+            ok = True
+            self._send_json(200, result)
+        except UserNotAuthorized as e:
+            self._send_json(403, {"error": str(e), **context})
+        except Exception:
+            # Exceptions can carry paths, tokens or Google's response bodies: log them, don't send them
+            print(f"[serve] {self.path} failed", *(f"{k}={v}" for k, v in context.items()))
+            traceback.print_exc()
+            self._send_json(500, {"error": INTERNAL_ERROR, **context})
+        finally:
+            stats.end((time.perf_counter() - t0) * 1000, ok)
+
+    def _create_meetings(self) -> None:
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            body = json.loads(self.rfile.read(length) or b"{}")
+            meetings, recurrence, user = body["meetings"], body.get("recurrence"), body.get("user")
+            if not isinstance(meetings, list):
+                raise TypeError("meetings must be a list")
+        except (ValueError, KeyError, TypeError):
+            self._send_json(400, {"error": 'expected JSON body {"meetings": [...], "recurrence": "...", "user": "..."}'})
+            return
+        try:
+            user = authenticate(self.headers.get("Authorization"), user)
+        except Forbidden as e:
+            self._send_json(e.status, {"error": str(e)})
+            return
+
+        def create() -> dict:
+            # custom_tool loads crewai's tool base class; not worth paying for at startup
+            from calendar_assistant_flow.tools.custom_tool import schedule_meetings
+
+            with as_user(user):
+                return schedule_meetings(meetings, recurrence).model_dump()
+
+        self._serve(create)
+
+    def log_message(self, fmt, *args):
+        print(f"[serve] {self.address_string()} {fmt % args}")
+
+
+class AssistantServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, max_concurrency: int):
+        super().__init__(address, AssistantHandler)
+        self.stats = ServiceStats()
+        # Bounds concurrent flows; further requests queue on the semaphore
+        self.slots = threading.BoundedSemaphore(max_concurrency)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Serve the calendar assistant over HTTP")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8080)
+    ap.add_argument("--max-concurrency", type=int, default=4, help="flows running at once")
+    ap.add_argument("--no-warmup", action="store_true", help="skip building crews/clients at startup")
+    args = ap.parse_args()
+
+    # A request must never block on a browser consent page
+    credential_store.interactive = False
+    if not args.no_warmup:
+        t0 = time.perf_counter()
+        warmup(instances=args.max_concurrency)
+        print(f"[serve] warm-up done in {(time.perf_counter() - t0) * 1000:.0f}ms")
+
+    server = AssistantServer((args.host, args.port), args.max_concurrency)
+    print(f"[serve] listening on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
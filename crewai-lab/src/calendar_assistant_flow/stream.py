@@ -0,0 +1,117 @@
+# stream.py
+"""Incremental answers: a run's progress as a stream of events.
+
+``stream_question`` runs the flow in a worker thread and yields events as
+they happen, instead of one dict at the end:
+
+    {"type": "route",  "agents": [...]}                        routing decided
+    {"type": "token",  "agent": role, "text": "..."}           one Ollama chunk
+    {"type": "tool",   "agent": role, "tool": name, "output": "..."}
+    {"type": "branch", "agent": name, "output": "..."}         an assistant finished
+    {"type": "final",  ...run_question's result}               or {"type": "error", "error": "...", "flow_id": ...}
+
+Every event also carries ``t_ms``, milliseconds since the run started.
+
+crewai emits LLM chunks and tool results on its event bus, synchronously in
+the thread that produced them. The run's sink lives in a ContextVar, which
+the flow copies into its branch threads, so each handler knows which of
+several concurrent runs an event belongs to. The handlers subscribe on the
+first streamed run: importing crewai's event bus loads all of crewai, which
+the service does not pay for at startup. While a sink is set,
+``PooledLLM`` asks Ollama for a streamed response; runs without one are
+unchanged.
+"""
+import asyncio
+import contextvars
+import queue
+import threading
+import time
+from contextvars import ContextVar
+from typing import AsyncIterator, Callable, Iterator, Optional
+from uuid import uuid4
+
+_sink: ContextVar[Optional[Callable[[dict], None]]] = ContextVar("stream_sink", default=None)
+_DONE = object()
+_subscribe_lock = threading.Lock()
+_subscribed = False
+
+
+def streaming() -> bool:
+    """Whether the current run has a listener for its events."""
+    return _sink.get() is not None
+
+
+def emit(kind: str, **fields) -> None:
+    """Send a ``kind`` event to the current run's listener, if there is one."""
+    sink = _sink.get()
+    if sink is not None:
+        sink({"type": kind, **fields})
+
+
+def _on_chunk(source, event):
+    # Chunks carrying a native tool call are its JSON arguments, not text for the reader
+    if event.chunk and event.tool_call is None:
+        emit("token", agent=event.agent_role, text=event.chunk)
+
+
+def _on_tool(source, event):
+    emit("tool", agent=event.agent_role, tool=event.tool_name, output=str(event.output))
+
+
+def _subscribe() -> None:
+    """Register the event-bus handlers, once per process."""
+    global _subscribed
+    with _subscribe_lock:
+        if _subscribed:
+            return
+        from crewai.events.event_bus import crewai_event_bus
+        from crewai.events.types.llm_events import LLMStreamChunkEvent
+        from crewai.events.types.tool_usage_events import ToolUsageFinishedEvent
+
+        crewai_event_bus.on(LLMStreamChunkEvent)(_on_chunk)
+        crewai_event_bus.on(ToolUsageFinishedEvent)(_on_tool)
+        _subscribed = True
+
+
+def _produce(question: str, user: Optional[str], flow_id: Optional[str], put: Callable) -> None:
+    """Run one flow with ``put`` as its sink, ending with a final or error event and then _DONE."""
+    from calendar_assistant_flow.main import run_question
+
+    t0 = time.perf_counter()
+    _subscribe()
+    # Chosen up front so an error event can say which run to resume
+    flow_id = flow_id or str(uuid4())
+    token = _sink.set(lambda event: put({**event, "t_ms": round((time.perf_counter() - t0) * 1000, 1)}))
+    try:
+        emit("final", **run_question(question, user=user, flow_id=flow_id))
+    except Exception as e:
+        emit("error", error=str(e), flow_id=flow_id)
+    finally:
+        _sink.reset(token)
+        put(_DONE)
+
+
+def stream_question(question: str, user: Optional[str] = None, flow_id: Optional[str] = None) -> Iterator[dict]:
+    """run_question, yielding its events as they happen; the last one is "final" or "error".
+
+    Closing the generator early stops the yielding, not the run: the flow
+    finishes in the background.
+    """
+    events = queue.SimpleQueue()
+    worker = threading.Thread(target=contextvars.copy_context().run, args=(_produce, question, user, flow_id, events.put),
+                              name="stream", daemon=True)
+    worker.start()
+    while (event := events.get()) is not _DONE:
+        yield event
+
+
+async def astream_question(question: str, user: Optional[str] = None,
+                           flow_id: Optional[str] = None) -> AsyncIterator[dict]:
+    """stream_question for asyncio: the flow runs in the loop's default executor."""
+    loop = asyncio.get_running_loop()
+    events = asyncio.Queue()
+    put = lambda event: loop.call_soon_threadsafe(events.put_nowait, event)
+    run = loop.run_in_executor(None, contextvars.copy_context().run, _produce, question, user, flow_id, put)
+    while (event := await events.get()) is not _DONE:
+        yield event
+    await run
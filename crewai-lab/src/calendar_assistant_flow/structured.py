@@ -0,0 +1,141 @@
+# structured.py
+"""Schema-constrained LLM output and local JSON repair.
+
+With STRUCTURED_OUTPUT=1 (default) the LLMs behind structured tasks send the
+task's Pydantic JSON schema as Ollama's ``format`` parameter, so the model
+can only emit matching JSON. Those tasks then skip crewai's output_pydantic
+conversion, which re-prompts the LLM when the text does not parse; instead
+parse_output() validates the raw text and, failing that, repairs it locally
+(code fences, surrounding prose, Python-style quotes, trailing commas).
+
+Outcomes are counted per schema in structured_stats:
+    direct     raw output validated as-is
+    converted  crewai's output_pydantic conversion produced it (legacy mode; often a re-prompt)
+    repaired   local repair made it valid
+    failed     nothing worked
+"""
+import ast
+import json
+import os
+import re
+import threading
+from collections import Counter
+from typing import Any, Dict, Optional, Type, TypeVar
+
+from pydantic import BaseModel, ValidationError
+
+STRUCTURED_OUTPUT = os.getenv("STRUCTURED_OUTPUT", "1") == "1"
+
+M = TypeVar("M", bound=BaseModel)
+
+_FENCE = re.compile(r"```(?:json|JSON)?\s*(.*?)```", re.S)
+_TRAILING_COMMA = re.compile(r",\s*([}\]])")
+
+
+def format_params(schema: Type[BaseModel]) -> Dict[str, Any]:
+    """LLM kwargs constraining generation to ``schema`` (empty when the mode is off)."""
+    return {"format": schema.model_json_schema()} if STRUCTURED_OUTPUT else {}
+
+
+def output_model(schema: Type[M]) -> Optional[Type[M]]:
+    """Task output_pydantic: None in structured mode, where parse_output() takes over."""
+    return None if STRUCTURED_OUTPUT else schema
+
+
+def _balanced_object(text: str) -> Optional[str]:
+    """First complete {...} block in ``text``, honouring strings."""
+    start = text.find("{")
+    while start != -1:
+        depth, in_str, escape = 0, None, False
+        for i in range(start, len(text)):
+            ch = text[i]
+            if in_str:
+                if escape:
+                    escape = False
+                elif ch == "\\":
+                    escape = True
+                elif ch == in_str:
+                    in_str = None
+            elif ch in "\"'":
+                in_str = ch
+            elif ch == "{":
+                depth += 1
+            elif ch == "}":
+                depth -= 1
+                if depth == 0:
+                    return text[start:i + 1]
+        start = text.find("{", start + 1)
+    return None
+
+
+def repair_json(text: str) -> Optional[dict]:
+    """Best-effort dict from LLM text that should have been a JSON object."""
+    candidates = _FENCE.findall(text) + [text]
+    for candidate in candidates:
+        block = _balanced_object(candidate.replace("Final Answer:", ""))
+        if block is None:
+            continue
+        for attempt in (block, _TRAILING_COMMA.sub(r"\1", block)):
+            try:
+                value = json.loads(attempt)
+            except ValueError:
+                try:
+                    # {'agent': '...'} and other Python-literal dicts
+                    value = ast.literal_eval(attempt)
+                except (ValueError, SyntaxError):
+                    continue
+            if isinstance(value, dict):
+                return value
+    return None
+
+
+class StructuredStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts: Dict[str, Counter] = {}
+
+    def record(self, schema: str, outcome: str) -> None:
+        with self._lock:
+            self._counts.setdefault(schema, Counter())[outcome] += 1
+
+    def snapshot(self) -> Dict[str, dict]:
+        with self._lock:
+            out = {}
+            for schema, counts in self._counts.items():
+                total = sum(counts.values())
+                out[schema] = {
+                    **counts,
+                    "total": total,
+                    "parse_failure_rate": round((total - counts["direct"]) / total, 3),
+                    "retry_rate": round(counts["converted"] / total, 3),
+                }
+            return out
+
+
+structured_stats = StructuredStats()
+
+
+def parse_output(output, schema: Type[M]) -> M:
+    """``schema`` instance from a CrewOutput/TaskOutput or raw string; raises ValueError if unusable."""
+    raw = output if isinstance(output, str) else output.raw
+    name = schema.__name__
+    try:
+        value = schema.model_validate_json(raw)
+        structured_stats.record(name, "direct")
+        return value
+    except ValidationError:
+        pass
+    converted = getattr(output, "pydantic", None)
+    if isinstance(converted, schema):
+        structured_stats.record(name, "converted")
+        return converted
+    repaired = repair_json(raw)
+    if repaired is not None:
+        try:
+            value = schema.model_validate(repaired)
+            structured_stats.record(name, "repaired")
+            return value
+        except ValidationError:
+            pass
+    structured_stats.record(name, "failed")
+    raise ValueError(f"Could not parse {name} from LLM output: {raw[:200]!r}")
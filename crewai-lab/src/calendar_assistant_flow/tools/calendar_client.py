@@ -0,0 +1,180 @@
+# calendar_client.py
+import contextvars
+import os
+import sys
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from calendar_assistant_flow.tools.credentials import (
+    CREDS_PATH,
+    DEFAULT_USER,
+    SCOPES,
+    TOKEN_PATH,
+    CredentialStore,
+    credential_store,
+)
+from calendar_assistant_flow.tools.google_api import google_api
+
+HTTP_TIMEOUT_SECONDS = float(os.getenv("GOOGLE_HTTP_TIMEOUT_SECONDS", "30"))
+# Users whose service and idle connections are kept (least recently used dropped first)
+CLIENT_CACHE_USERS = int(os.getenv("GOOGLE_CLIENT_CACHE_USERS", "256"))
+# Idle keep-alive connections kept per user between requests
+IDLE_CONNECTIONS_PER_USER = int(os.getenv("GOOGLE_IDLE_CONNECTIONS_PER_USER", "4"))
+
+# Whose calendar the current flow works on; set per request (see as_user)
+current_user: contextvars.ContextVar[str] = contextvars.ContextVar("calendar_user", default=DEFAULT_USER)
+
+
+@contextmanager
+def as_user(user: str):
+    """Run the enclosed calls against ``user``'s calendar."""
+    token = current_user.set(user or DEFAULT_USER)
+    try:
+        yield
+    finally:
+        current_user.reset(token)
+
+
+class CalendarClientProvider:
+    """Process-wide, per-user Calendar API clients and a pool of their connections.
+
+    Credentials come from a CredentialStore (cached per user, refreshed
+    single-flight). Each user has one service object, shared by every thread,
+    that only builds requests. httplib2 connections are not thread-safe, so
+    the requests are sent over connections leased from a per-user pool (see
+    lease()): a thread checks one out for a single round trip and hands it
+    back, and the next request, on any thread, reuses it and its keep-alive
+    TLS session. Up to IDLE_CONNECTIONS_PER_USER idle connections are kept
+    per user; one whose user's credentials were replaced is dropped.
+    """
+
+    def __init__(self, store: CredentialStore = credential_store):
+        self.store = store
+        self._lock = threading.Lock()
+        # user -> (credentials, service) and user -> idle [(credentials, http)], least recently used first
+        self._services: "OrderedDict[str, tuple]" = OrderedDict()
+        self._idle: "OrderedDict[str, list]" = OrderedDict()
+        self._override = None
+        self._stats = {"hits": 0, "misses": 0, "connections_reused": 0, "connections_opened": 0}
+
+    def credentials(self, user: str = None):
+        return self.store.get(user or current_user.get())
+
+    # ----------------- Service -----------------
+    def service(self, user: str = None):
+        """Return the Calendar v3 service for ``user`` (default: current_user)."""
+        if self._override is not None:
+            return self._override
+
+        user = user or current_user.get()
+        creds = self.store.get(user)
+        with self._lock:
+            cached = self._services.get(user)
+            if cached is not None and cached[0] is creds:
+                self._services.move_to_end(user)
+                self._stats["hits"] += 1
+                return cached[1]
+
+        from googleapiclient.discovery import build
+
+        # Built outside the lock; if two threads race, the last one built is kept
+        service = build("calendar", "v3", http=self._open(creds), cache_discovery=False)
+        with self._lock:
+            self._services[user] = (creds, service)
+            self._services.move_to_end(user)
+            while len(self._services) > CLIENT_CACHE_USERS:
+                evicted, _ = self._services.popitem(last=False)
+                self._idle.pop(evicted, None)
+            self._stats["misses"] += 1
+        return service
+
+    # ----------------- Connections -----------------
+    @staticmethod
+    def _open(creds):
+        import httplib2
+        from google_auth_httplib2 import AuthorizedHttp
+
+        return AuthorizedHttp(creds, http=httplib2.Http(timeout=HTTP_TIMEOUT_SECONDS))
+
+    @contextmanager
+    def lease(self, user: str):
+        """Check out one of ``user``'s connections for a round trip; it goes back to the pool afterwards.
+
+        Yields None while override() is in effect (the stand-in needs no connection).
+        """
+        if self._override is not None:
+            yield None
+            return
+
+        creds = self.store.get(user)
+        http = None
+        with self._lock:
+            idle = self._idle.get(user)
+            while idle:
+                idle_creds, idle_http = idle.pop()
+                if idle_creds is creds:
+                    http = idle_http
+                    self._stats["connections_reused"] += 1
+                    break
+        if http is None:
+            http = self._open(creds)
+            with self._lock:
+                self._stats["connections_opened"] += 1
+        try:
+            yield http
+        finally:
+            with self._lock:
+                idle = self._idle.setdefault(user, [])
+                self._idle.move_to_end(user)
+                if len(idle) < IDLE_CONNECTIONS_PER_USER:
+                    idle.append((creds, http))
+                while len(self._idle) > CLIENT_CACHE_USERS:
+                    self._idle.popitem(last=False)
+
+    def override(self, service) -> None:
+        """Hand ``service`` to every caller instead of the real API (offline runs, benchmarks).
+
+        Pass None to go back to the real client. Query results and event
+        mirrors cached from the previous calendar are dropped either way.
+        """
+        from calendar_assistant_flow.tools.query_cache import query_cache
+
+        self._override = service
+        query_cache.clear()
+        # Only loaded when a local store may be open (it imports this module)
+        event_store = sys.modules.get("calendar_assistant_flow.tools.event_store")
+        if event_store is not None:
+            event_store.reset_event_stores()
+
+    def stats(self) -> dict:
+        with self._lock:
+            out = dict(self._stats, idle_connections=sum(len(idle) for idle in self._idle.values()))
+        return dict(out, credentials=self.store.stats())
+
+    def reset(self) -> None:
+        """Drop cached credentials, services and pooled connections (e.g. after re-auth)."""
+        self.store.clear()
+        with self._lock:
+            self._services.clear()
+            self._idle.clear()
+
+
+calendar_clients = CalendarClientProvider()
+# Every Calendar round trip goes over a connection leased from this pool
+google_api.connections = calendar_clients
+
+
+def get_calendar_service():
+    """Shared Calendar API client for tools, for the current user."""
+    return calendar_clients.service()
+
+
+def execute(request):
+    """Execute a Calendar API request for the current user through the quota-aware executor."""
+    return google_api.execute(request, current_user.get())
+
+
+def execute_batch(requests, return_exceptions: bool = False) -> list:
+    """Execute several Calendar API requests in as few batch HTTP round trips as possible."""
+    return google_api.execute_batch(calendar_clients.service(), requests, current_user.get(), return_exceptions)
@@ -0,0 +1,396 @@
+# credentials.py
+"""Per-user Google OAuth credentials: hot in-memory cache over a pluggable backend.
+
+    creds = credential_store.get("alice")   # cached, loaded, or refreshed as needed
+
+Tokens are persisted as google-auth "authorized user" JSON by a
+CredentialBackend: FileBackend (default; one file per user, written
+atomically), SQLiteBackend or MemoryBackend. Refreshes are single-flight per
+user: however many requests find a user's token expired at once, one of them
+refreshes it and the rest wait for that result. A token that is still valid
+but inside the refresh margin is refreshed in the background while callers
+keep using it. A failed background refresh is printed and not retried for
+GOOGLE_REFRESH_RETRY_SECONDS, doubling with each further failure (capped at
+the margin); the last error per user is in stats().
+
+A user with no stored token has to grant access once, interactively:
+
+    authorize alice                  opens the Google consent page, then stores alice's token
+
+Only interactive runs start that consent flow on demand. The server and the
+batch runner set ``credential_store.interactive = False``; there, a user
+without a token raises UserNotAuthorized instead of blocking on a browser.
+
+    GOOGLE_REFRESH_RETRY_SECONDS=15  first wait after a failed background refresh
+    GOOGLE_TOKEN_DIR=tokens          FileBackend directory
+    GOOGLE_TOKEN_DB=                 use SQLiteBackend at this path instead
+    GOOGLE_TOKEN_PATH=token.pickle   legacy single-user token, imported for GOOGLE_DEFAULT_USER
+    GOOGLE_CREDENTIALS_PATH=credentials.json  OAuth client for the consent flow
+"""
+import abc
+import json
+import os
+import pickle
+import re
+import sqlite3
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    from google.oauth2.credentials import Credentials
+
+SCOPES = ["https://www.googleapis.com/auth/calendar"]
+TOKEN_PATH = os.getenv("GOOGLE_TOKEN_PATH", "token.pickle")
+TOKEN_DIR = os.getenv("GOOGLE_TOKEN_DIR", "tokens")
+TOKEN_DB = os.getenv("GOOGLE_TOKEN_DB", "")
+CREDS_PATH = os.getenv("GOOGLE_CREDENTIALS_PATH", "credentials.json")
+DEFAULT_USER = os.getenv("GOOGLE_DEFAULT_USER", "default")
+
+# Refresh this many seconds before the access token expires
+REFRESH_MARGIN_SECONDS = int(os.getenv("GOOGLE_REFRESH_MARGIN_SECONDS", "300"))
+# Back off this long after a failed background refresh, doubling per consecutive failure
+REFRESH_RETRY_SECONDS = float(os.getenv("GOOGLE_REFRESH_RETRY_SECONDS", "15"))
+# Start the browser consent flow for users without a token (interactive runs only)
+INTERACTIVE_CONSENT = os.getenv("GOOGLE_INTERACTIVE_CONSENT", "1") == "1"
+
+
+class UserNotAuthorized(PermissionError):
+    """``user`` has no usable token and consent cannot be asked for here."""
+
+    def __init__(self, user: str):
+        super().__init__(f"User {user!r} has not authorized calendar access; run `authorize {user}` first")
+        self.user = user
+
+
+# ----------------- Backends -----------------
+class CredentialBackend(abc.ABC):
+    """Where tokens live between processes. Values are authorized-user info dicts."""
+
+    @abc.abstractmethod
+    def load(self, user: str) -> Optional[dict]:
+        ...
+
+    @abc.abstractmethod
+    def save(self, user: str, info: dict) -> None:
+        ...
+
+    @abc.abstractmethod
+    def delete(self, user: str) -> None:
+        ...
+
+    @abc.abstractmethod
+    def users(self) -> List[str]:
+        ...
+
+
+class MemoryBackend(CredentialBackend):
+    """Process-local; for tests, benchmarks and short-lived workers."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._data: Dict[str, str] = {}
+
+    def load(self, user):
+        with self._lock:
+            raw = self._data.get(user)
+        return None if raw is None else json.loads(raw)
+
+    def save(self, user, info):
+        with self._lock:
+            self._data[user] = json.dumps(info)
+
+    def delete(self, user):
+        with self._lock:
+            self._data.pop(user, None)
+
+    def users(self):
+        with self._lock:
+            return sorted(self._data)
+
+
+class FileBackend(CredentialBackend):
+    """One ``<user>.json`` per user, replaced atomically and readable only by the owner."""
+
+    _UNSAFE = re.compile(r"[^\w.@+-]")
+
+    def __init__(self, directory: str = TOKEN_DIR):
+        self.directory = directory
+
+    def _path(self, user: str) -> str:
+        return os.path.join(self.directory, self._UNSAFE.sub("_", user) + ".json")
+
+    def load(self, user):
+        try:
+            with open(self._path(user), encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def save(self, user, info):
+        os.makedirs(self.directory, mode=0o700, exist_ok=True)
+        # Write a temp file in the same directory, then rename over the old one:
+        # a crash or a concurrent reader never sees a half-written token
+        fd, tmp = tempfile.mkstemp(dir=self.directory, prefix=".token-", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(info, f)
+                f.flush()
+                os.fsync(f.fileno())
+            os.chmod(tmp, 0o600)
+            os.replace(tmp, self._path(user))
+        except BaseException:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+            raise
+
+    def delete(self, user):
+        try:
+            os.unlink(self._path(user))
+        except FileNotFoundError:
+            pass
+
+    def users(self):
+        if not os.path.isdir(self.directory):
+            return []
+        return sorted(name[:-5] for name in os.listdir(self.directory) if name.endswith(".json"))
+
+
+class SQLiteBackend(CredentialBackend):
+    """All users in one SQLite table; each save is a single transaction."""
+
+    def __init__(self, path: str = TOKEN_DB):
+        self.path = path
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+
+    def _conn(self) -> sqlite3.Connection:
+        # Opened on first use so importing the module never touches the disk
+        if self._db is None:
+            self._db = sqlite3.connect(self.path, check_same_thread=False)
+            self._db.execute("CREATE TABLE IF NOT EXISTS tokens (user TEXT PRIMARY KEY, info TEXT NOT NULL)")
+            self._db.commit()
+        return self._db
+
+    def load(self, user):
+        with self._lock:
+            row = self._conn().execute("SELECT info FROM tokens WHERE user = ?", (user,)).fetchone()
+        return None if row is None else json.loads(row[0])
+
+    def save(self, user, info):
+        with self._lock:
+            db = self._conn()
+            db.execute("INSERT OR REPLACE INTO tokens (user, info) VALUES (?, ?)", (user, json.dumps(info)))
+            db.commit()
+
+    def delete(self, user):
+        with self._lock:
+            db = self._conn()
+            db.execute("DELETE FROM tokens WHERE user = ?", (user,))
+            db.commit()
+
+    def users(self):
+        with self._lock:
+            return [row[0] for row in self._conn().execute("SELECT user FROM tokens ORDER BY user")]
+
+
+def default_backend() -> CredentialBackend:
+    return SQLiteBackend(TOKEN_DB) if TOKEN_DB else FileBackend(TOKEN_DIR)
+
+
+# ----------------- Store -----------------
+class _Flight:
+    """One in-progress refresh that other callers for the same user wait on."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.error: Optional[BaseException] = None
+
+
+class CredentialStore:
+    """Thread-safe per-user credentials with single-flight refresh."""
+
+    def __init__(self, backend: Optional[CredentialBackend] = None,
+                 refresh_margin: int = REFRESH_MARGIN_SECONDS, interactive: bool = INTERACTIVE_CONSENT,
+                 refresh_retry: float = REFRESH_RETRY_SECONDS):
+        self.backend = backend if backend is not None else default_backend()
+        self.refresh_margin = refresh_margin
+        self.refresh_retry = refresh_retry
+        # False in services: never open a consent page from a request thread
+        self.interactive = interactive
+        self._lock = threading.Lock()
+        self._creds: Dict[str, "Credentials"] = {}
+        self._flights: Dict[str, _Flight] = {}
+        # user -> (monotonic time of the last failed refresh, consecutive failures, error)
+        self._failures: Dict[str, Tuple[float, int, str]] = {}
+        self._stats = {"hits": 0, "loads": 0, "refreshes": 0, "refresh_failures": 0,
+                       "background_refreshes": 0, "waited_on_refresh": 0}
+
+    def _expires_within(self, creds: "Credentials", seconds: float) -> bool:
+        if creds.expiry is None:
+            return False
+        # google-auth stores expiry as a naive UTC datetime
+        return creds.expiry - timedelta(seconds=seconds) <= datetime.utcnow()
+
+    def get(self, user: str = DEFAULT_USER) -> "Credentials":
+        """Usable credentials for ``user``, loading or refreshing them if needed."""
+        with self._lock:
+            creds = self._creds.get(user)
+            if creds is not None and creds.token and not self._expires_within(creds, 0):
+                self._stats["hits"] += 1
+                soon = self._expires_within(creds, self.refresh_margin)
+            else:
+                creds, soon = None, False
+        if creds is not None:
+            if soon and creds.refresh_token and not self._backing_off(user):
+                # Still valid: refresh ahead without making this caller wait
+                self._start_refresh(user, background=True)
+            return creds
+
+        flight, leader = self._join_flight(user)
+        if leader:
+            self._run_flight(user, flight)
+        else:
+            with self._lock:
+                self._stats["waited_on_refresh"] += 1
+            flight.done.wait()
+        if flight.error is not None:
+            raise flight.error
+        with self._lock:
+            return self._creds[user]
+
+    def _backing_off(self, user: str) -> bool:
+        """True while ``user``'s last refresh failed too recently to try again in the background."""
+        with self._lock:
+            failure = self._failures.get(user)
+        if failure is None:
+            return False
+        failed_at, count, _ = failure
+        return time.monotonic() - failed_at < self._retry_delay(count)
+
+    def _retry_delay(self, failures: int) -> float:
+        return min(self.refresh_retry * 2 ** (failures - 1), self.refresh_margin)
+
+    def _join_flight(self, user: str):
+        with self._lock:
+            flight = self._flights.get(user)
+            if flight is not None:
+                return flight, False
+            flight = self._flights[user] = _Flight()
+            return flight, True
+
+    def _start_refresh(self, user: str, background: bool) -> None:
+        flight, leader = self._join_flight(user)
+        if not leader:
+            return
+        with self._lock:
+            self._stats["background_refreshes"] += background
+        threading.Thread(target=self._run_flight, args=(user, flight, background),
+                         name=f"token-refresh-{user}", daemon=True).start()
+
+    def _run_flight(self, user: str, flight: _Flight, background: bool = False) -> None:
+        try:
+            creds = self._fresh_credentials(user)
+            with self._lock:
+                self._creds[user] = creds
+                self._failures.pop(user, None)
+        except BaseException as e:
+            flight.error = e
+            with self._lock:
+                count = self._failures.get(user, (0.0, 0, ""))[1] + 1
+                self._failures[user] = (time.monotonic(), count, f"{type(e).__name__}: {e}")
+            if background:
+                # Nobody waits on a background refresh: report it here, or it is lost
+                print(f"[credentials] background token refresh for {user!r} failed ({count} in a row), "
+                      f"retrying in {self._retry_delay(count):.0f}s: {type(e).__name__}: {e}")
+        finally:
+            with self._lock:
+                self._flights.pop(user, None)
+            flight.done.set()
+
+    def _fresh_credentials(self, user: str) -> "Credentials":
+        from google.auth.transport.requests import Request
+
+        with self._lock:
+            creds = self._creds.get(user)
+        if creds is None:
+            creds = self._load(user)
+        if creds is not None and creds.token and not self._expires_within(creds, self.refresh_margin):
+            return creds
+        if creds is not None and creds.refresh_token:
+            try:
+                creds.refresh(Request())
+            except Exception:
+                with self._lock:
+                    self._stats["refresh_failures"] += 1
+                raise
+            with self._lock:
+                self._stats["refreshes"] += 1
+        elif self.interactive:
+            creds = self._consent(user)
+        else:
+            raise UserNotAuthorized(user)
+        self.backend.save(user, json.loads(creds.to_json()))
+        return creds
+
+    def _load(self, user: str) -> Optional["Credentials"]:
+        from google.oauth2.credentials import Credentials
+
+        info = self.backend.load(user)
+        if info is not None:
+            with self._lock:
+                self._stats["loads"] += 1
+            return Credentials.from_authorized_user_info(info, SCOPES)
+        if user == DEFAULT_USER and os.path.exists(TOKEN_PATH):
+            # Token from the single-user layout: import it, the backend owns it from now on
+            with open(TOKEN_PATH, "rb") as token_file:
+                creds = pickle.load(token_file)
+            self.backend.save(user, json.loads(creds.to_json()))
+            return creds
+        return None
+
+    def _consent(self, user: str) -> "Credentials":
+        from google_auth_oauthlib.flow import InstalledAppFlow
+
+        if not os.path.exists(CREDS_PATH):
+            raise RuntimeError(
+                f"No stored credentials for user {user!r} and credentials.json not found at {CREDS_PATH}. "
+                "Place your OAuth credentials file there."
+            )
+        flow = InstalledAppFlow.from_client_secrets_file(CREDS_PATH, SCOPES)
+        return flow.run_local_server(port=0)
+
+    def authorize(self, user: str) -> "Credentials":
+        """Run the consent flow for ``user`` now and store the token it grants."""
+        creds = self._consent(user)
+        self.put(user, creds)
+        return creds
+
+    def put(self, user: str, creds: "Credentials") -> None:
+        """Store credentials obtained elsewhere (e.g. a web OAuth callback)."""
+        self.backend.save(user, json.loads(creds.to_json()))
+        with self._lock:
+            self._creds[user] = creds
+            self._failures.pop(user, None)
+
+    def forget(self, user: str) -> None:
+        """Drop ``user`` from the cache and the backend (revoked access, sign-out)."""
+        with self._lock:
+            self._creds.pop(user, None)
+            self._failures.pop(user, None)
+        self.backend.delete(user)
+
+    def clear(self) -> None:
+        """Drop the in-memory cache; the backend keeps the tokens."""
+        with self._lock:
+            self._creds.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return dict(self._stats, cached_users=len(self._creds), refreshing=len(self._flights),
+                        refresh_errors={user: error for user, (_, _, error) in self._failures.items()})
+
+
+credential_store = CredentialStore()
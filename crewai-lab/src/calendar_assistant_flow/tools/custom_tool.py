@@ -1,52 +1,83 @@
 # custom_tool.py
-import os
-import pickle
-from typing import Type, List, Optional
-from datetime import datetime, timedelta
+import re
+from typing import Any, Dict, Type, List, Optional, Sequence, Union
+from datetime import datetime, time, timedelta, timezone
+from dateutil.rrule import rrulestr
 from tzlocal import get_localzone
 
-from pydantic import BaseModel, Field, EmailStr
+from pydantic import BaseModel, Field, EmailStr, ValidationError
 
-from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
-from google.oauth2.credentials import Credentials
-from google.auth.transport.requests import Request
-from google_auth_oauthlib.flow import InstalledAppFlow
 
 from crewai.tools import BaseTool
 
-SCOPES = ["https://www.googleapis.com/auth/calendar"]
-TOKEN_PATH = os.getenv("GOOGLE_TOKEN_PATH", "token.pickle")
-CREDS_PATH = os.getenv("GOOGLE_CREDENTIALS_PATH", "credentials.json")
+from calendar_assistant_flow.tools.calendar_client import (
+    SCOPES,
+    TOKEN_PATH,
+    CREDS_PATH,
+    current_user,
+    execute,
+    execute_batch,
+    get_calendar_service,
+)
+from calendar_assistant_flow.tools.event_store import get_event_store
+from calendar_assistant_flow.tools.intervals import free_slots_by_day, merge_intervals
+from calendar_assistant_flow.tools.query_cache import query_cache
+from calendar_assistant_flow.tools.slot_search import WEEKDAYS, find_recurring_slots, find_slots
+from calendar_assistant_flow.models import BulkMeetingItem, BulkMeetingResult, MeetingCrafter, MeetingResult
 
 
 def _connect_calendar_api():
-    """Connect to Google Calendar API and return a service client."""
-    creds: Optional[Credentials] = None
+    """Return the shared Google Calendar API service client."""
+    return get_calendar_service()
 
-    if os.path.exists(TOKEN_PATH):
-        with open(TOKEN_PATH, "rb") as token_file:
-            creds = pickle.load(token_file)
 
-    if not creds or not creds.valid:
-        if creds and creds.expired and creds.refresh_token:
-            creds.refresh(Request())
-        else:
-            if not os.path.exists(CREDS_PATH):
-                raise RuntimeError(
-                    f"credentials.json not found at {CREDS_PATH}. "
-                    "Place your OAuth credentials file there."
-                )
-            flow = InstalledAppFlow.from_client_secrets_file(CREDS_PATH, SCOPES)
-            creds = flow.run_local_server(port=0)
+# ----------------- Meeting Scheduler -----------------
+def _event_body(summary: str, location: Optional[str], description: Optional[str], start_dt: datetime,
+                end_dt: datetime, attendees: List[str], recurrence: Optional[str] = None) -> dict:
+    local_tz = str(get_localzone())
+    body = {
+        "summary": summary,
+        "location": location or "",
+        "description": description or "",
+        "start": {"dateTime": start_dt.isoformat(), "timeZone": local_tz},
+        "end": {"dateTime": end_dt.isoformat(), "timeZone": local_tz},
+        "attendees": [{"email": e} for e in attendees],
+        "reminders": {
+            "useDefault": False,
+            "overrides": [
+                {"method": "email", "minutes": 24*60},
+                {"method": "popup", "minutes": 10},
+            ],
+        },
+    }
+    if recurrence:
+        body["recurrence"] = [recurrence]
+    return body
 
-        with open(TOKEN_PATH, "wb") as token_file:
-            pickle.dump(creds, token_file)
 
-    return build("calendar", "v3", credentials=creds)
+def _record_created(event: dict, start_dt: datetime, end_dt: datetime, attendees: List[str],
+                    recurring: bool = False) -> None:
+    """Bring the local event store and the query cache in line with a newly created event."""
+    store = get_event_store()
+    if store is not None:
+        if recurring:
+            # The store holds single instances; the next read's sync fetches them
+            store.expire()
+        else:
+            store.upsert(event)
+    # The new event (and the invites) change free/busy and listings for this range:
+    # this user's own calendar, and the attendees' calendars whoever looked them up
+    zone = get_localzone()
+    start_aware = start_dt if start_dt.tzinfo else start_dt.replace(tzinfo=zone)
+    end_aware = end_dt if end_dt.tzinfo else end_dt.replace(tzinfo=zone)
+    if recurring:
+        end_aware = datetime.max.replace(tzinfo=timezone.utc)  # every window from the first occurrence on
+    query_cache.invalidate(["primary"], start_aware, end_aware, scope=current_user.get())
+    if attendees:
+        query_cache.invalidate(attendees, start_aware, end_aware)
 
 
-# ----------------- Meeting Scheduler -----------------
 class MeetingDetails(BaseModel):
     summary: str = Field(..., description="Meeting Title")
     location: Optional[str] = Field("", description="Location")
@@ -64,28 +95,12 @@ class MeetingSchedulerTool(BaseTool):
     def _run(self, summary: str, location: Optional[str], description: Optional[str],
              start: str, end: str, attendees: List[str]) -> dict:  # <- return dict
         service = _connect_calendar_api()
-        local_tz = str(get_localzone())
-
         start_dt = datetime.fromisoformat(start)
         end_dt = datetime.fromisoformat(end)
 
-        body = {
-            "summary": summary,
-            "location": location or "",
-            "description": description or "",
-            "start": {"dateTime": start_dt.isoformat(), "timeZone": local_tz},
-            "end": {"dateTime": end_dt.isoformat(), "timeZone": local_tz},
-            "attendees": [{"email": e} for e in attendees],
-            "reminders": {
-                "useDefault": False,
-                "overrides": [
-                    {"method": "email", "minutes": 24*60},
-                    {"method": "popup", "minutes": 10},
-                ],
-            },
-        }
-
-        event = service.events().insert(calendarId="primary", body=body).execute()
+        body = _event_body(summary, location, description, start_dt, end_dt, attendees)
+        event = execute(service.events().insert(calendarId="primary", body=body))
+        _record_created(event, start_dt, end_dt, attendees)
         return {
             "status": "success",
             "id": event.get("id"),
@@ -111,60 +126,290 @@ class MeetingSchedulerTool(BaseTool):
         # except HttpError as e:
         #     return f"Error creating event: {e}"
 
+def schedule_crafted_meeting(crafted: MeetingCrafter) -> MeetingResult:
+    """Validate a MeetingCrafter output and create the event directly, without an LLM agent."""
+    details = MeetingDetails(**crafted.model_dump())
+    start_dt = datetime.fromisoformat(details.start)
+    end_dt = datetime.fromisoformat(details.end)
+    if end_dt <= start_dt:
+        raise ValueError(f"Meeting end {details.end} is not after start {details.start}")
+
+    result = MeetingSchedulerTool()._run(
+        summary=details.summary,
+        location=details.location,
+        description=details.description,
+        start=details.start,
+        end=details.end,
+        attendees=[str(e) for e in details.attendees],
+    )
+    return MeetingResult(**result)
+
+# ----------------- Bulk Meeting Scheduler -----------------
+_UTC_UNTIL = re.compile(r"UNTIL=\d{8}T\d{6}Z", re.IGNORECASE)
+
+
+def _check_recurrence(rule: str, start_dt: datetime) -> None:
+    """Reject an RRULE Google would refuse, or one that never occurs, before anything is sent."""
+    if not rule.upper().startswith("RRULE:"):
+        raise ValueError(f"recurrence must be an RRULE line such as RRULE:FREQ=WEEKLY;BYDAY=MO;COUNT=10, got {rule!r}")
+    # dateutil wants an aware start with a UTC UNTIL and a naive one otherwise (floating or
+    # date-only UNTIL); a naive start is wall time in the timezone the event is created in
+    if _UTC_UNTIL.search(rule):
+        if start_dt.tzinfo is None:
+            start_dt = start_dt.replace(tzinfo=get_localzone())
+    elif start_dt.tzinfo is not None:
+        start_dt = start_dt.replace(tzinfo=None)
+    try:
+        occurrences = rrulestr(rule, dtstart=start_dt)
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"Invalid recurrence {rule!r}: {e}") from None
+    if occurrences.after(start_dt, inc=True) is None:
+        raise ValueError(f"Recurrence {rule!r} has no occurrences from {start_dt.isoformat()}")
+
+
+def _error_message(e: BaseException) -> str:
+    if isinstance(e, HttpError):
+        return f"HTTP {e.status_code}: {e.reason}"
+    return str(e)
+
+
+def schedule_meetings(meetings: Sequence[Union[MeetingDetails, dict]],
+                      recurrence: Optional[str] = None) -> BulkMeetingResult:
+    """Create many events in one pass, reporting success or failure per meeting.
+
+    Each meeting is validated locally first (fields, emails, ISO times, end
+    after start, and ``recurrence`` against its start); those that pass go
+    out together as batched events().insert requests, 50 per HTTP round
+    trip. With ``recurrence`` (an RFC 5545 RRULE line) every meeting becomes
+    a series: one insert per meeting, however many occurrences it has.
+    A rejected meeting does not stop the others; results keep request order.
+    """
+    results: List[Optional[BulkMeetingItem]] = [None] * len(meetings)
+    valid = []  # (index, details, start, end)
+    for i, meeting in enumerate(meetings):
+        try:
+            details = meeting if isinstance(meeting, MeetingDetails) else MeetingDetails.model_validate(meeting)
+            start_dt, end_dt = datetime.fromisoformat(details.start), datetime.fromisoformat(details.end)
+            if end_dt <= start_dt:
+                raise ValueError(f"Meeting end {details.end} is not after start {details.start}")
+            if recurrence:
+                _check_recurrence(recurrence, start_dt)
+        except (ValidationError, ValueError) as e:
+            results[i] = BulkMeetingItem(index=i, status="error", error=str(e))
+            continue
+        valid.append((i, details, start_dt, end_dt))
+
+    if valid:
+        service = _connect_calendar_api()
+        requests = [
+            service.events().insert(calendarId="primary", body=_event_body(
+                d.summary, d.location, d.description, start_dt, end_dt, [str(e) for e in d.attendees], recurrence))
+            for _, d, start_dt, end_dt in valid
+        ]
+        responses = execute_batch(requests, return_exceptions=True)
+        for (i, details, start_dt, end_dt), event in zip(valid, responses):
+            if isinstance(event, BaseException):
+                results[i] = BulkMeetingItem(index=i, status="error", error=_error_message(event))
+                continue
+            _record_created(event, start_dt, end_dt, [str(e) for e in details.attendees], recurring=bool(recurrence))
+            results[i] = BulkMeetingItem(
+                index=i, status="success", id=event.get("id"), summary=event.get("summary"),
+                start=event["start"].get("dateTime"), end=event["end"].get("dateTime"),
+                htmlLink=event.get("htmlLink"),
+            )
+
+    created = sum(r.status == "success" for r in results)
+    return BulkMeetingResult(created=created, failed=len(results) - created, recurrence=recurrence, results=results)
+
+
+class BulkMeetings(BaseModel):
+    meetings: List[MeetingDetails] = Field(..., description="Meetings to create (with recurrence: each series' first occurrence)")
+    recurrence: Optional[str] = Field(None, description="RFC 5545 rule applied to every meeting, e.g. RRULE:FREQ=WEEKLY;BYDAY=MO;COUNT=10")
+
+
+class BulkMeetingSchedulerTool(BaseTool):
+    name: str = "create meetings in bulk"
+    description: str = ("Create many Google Calendar events in one call, optionally each as a recurring series; "
+                        "returns a result per meeting")
+    args_schema: Type[BaseModel] = BulkMeetings
+    return_direct: bool = True
+
+    def _run(self, meetings: List[Dict[str, Any]], recurrence: Optional[str] = None) -> dict:
+        return schedule_meetings(meetings, recurrence).model_dump()
+
+
 # ----------------- Availability Checker -----------------
+FREEBUSY_MAX_DAYS = 60        # longest timeMin..timeMax span sent in one query
+FREEBUSY_MAX_CALENDARS = 50   # API limit on items per query
+
+
+def _query_busy(service, calendar_ids: List[str], st: datetime, et: datetime, local_zone):
+    """Busy periods per calendar in the window, one query per (window, calendar) chunk.
+
+    A range that needs several queries sends them together in one batch request.
+    """
+    requests = []
+    window_start = st
+    while window_start < et:
+        window_end = min(window_start + timedelta(days=FREEBUSY_MAX_DAYS), et)
+        for i in range(0, len(calendar_ids), FREEBUSY_MAX_CALENDARS):
+            chunk = calendar_ids[i:i + FREEBUSY_MAX_CALENDARS]
+            body = {
+                "timeMin": window_start.isoformat(),
+                "timeMax": window_end.isoformat(),
+                "timeZone": str(local_zone),
+                "items": [{"id": cal_id} for cal_id in chunk],
+            }
+            requests.append(service.freebusy().query(body=body))
+        window_start = window_end
+    results = [execute(requests[0])] if len(requests) == 1 else execute_batch(requests)
+
+    busy = {cal_id: [] for cal_id in calendar_ids}
+    errors = {}
+    for result in results:
+        for cal_id, cal in result.get("calendars", {}).items():
+            if cal.get("errors"):
+                errors[cal_id] = [e.get("reason") for e in cal["errors"]]
+            for period in cal.get("busy", []):
+                busy.setdefault(cal_id, []).append((
+                    datetime.fromisoformat(period["start"].replace("Z", "+00:00")).astimezone(local_zone),
+                    datetime.fromisoformat(period["end"].replace("Z", "+00:00")).astimezone(local_zone),
+                ))
+    return busy, errors
+
+
+def _busy_by_calendar(calendar_ids: List[str], st: datetime, et: datetime, local_zone):
+    """Cached or freshly queried ``({calendar: busy intervals}, errors)`` for the window."""
+    user = current_user.get()
+    busy = query_cache.get("freebusy.calendars", calendar_ids, st, et, scope=user)
+    if busy is not None:
+        return busy, {}
+    busy, errors = _query_busy(_connect_calendar_api(), calendar_ids, st, et, local_zone)
+    busy = {cal_id: merge_intervals(periods) for cal_id, periods in busy.items()}
+    if not errors:
+        query_cache.put("freebusy.calendars", calendar_ids, st, et, busy, scope=user)
+    return busy, errors
+
+
 class TimeAvailability(BaseModel):
     start: str = Field(..., description="Month DD, YYYY, HH:MMAM/PM")
     end: str = Field(..., description="Month DD, YYYY, HH:MMAM/PM")
+    calendars: List[str] = Field(
+        default_factory=list,
+        description="Other calendars that must also be free: attendee emails or room resource ids",
+    )
 
 class TimeAvailabilityTool(BaseTool):
     name: str = "check availability"
     description: str = "Check user's available time on Google Calendar"
     args_schema: Type[BaseModel] = TimeAvailability
 
-    def _run(self, start: str, end: str):
+    def _run(self, start: str, end: str, calendars: Optional[List[str]] = None):
         service = _connect_calendar_api()
         local_zone = get_localzone()
         st = datetime.strptime(start, "%B %d, %Y, %I:%M%p").replace(tzinfo=local_zone)
         et = datetime.strptime(end, "%B %d, %Y, %I:%M%p").replace(tzinfo=local_zone)
 
-        available_days = []
-        current = st.date()
-        end_date = et.date()
+        calendar_ids = ["primary"] + [c for c in dict.fromkeys(calendars or []) if c != "primary"]
+        user = current_user.get()
+        busy = query_cache.get("freebusy", calendar_ids, st, et, scope=user)
+        errors = {}
+        if busy is None:
+            by_calendar, errors = _query_busy(service, calendar_ids, st, et, local_zone)
+            busy = merge_intervals(b for periods in by_calendar.values() for b in periods)
+            if not errors:
+                query_cache.put("freebusy", calendar_ids, st, et, busy, scope=user)
 
-        while current <= end_date:
-            day_start = datetime.combine(current, datetime.min.time()).replace(tzinfo=local_zone)
-            day_end = datetime.combine(current, datetime.max.time()).replace(tzinfo=local_zone)
+        # A cached superset window works as-is: free_slots_by_day skips busy time outside [st, et]
+        available_days = free_slots_by_day(busy, st, et, local_zone)
+        if errors:
+            available_days.append({"calendar_errors": errors})
+        return available_days
 
-            if day_start < st:
-                day_start = st
-            if day_end > et:
-                day_end = et
 
-            body = {
-                "timeMin": day_start.isoformat(),
-                "timeMax": day_end.isoformat(),
-                "timeZone": str(local_zone),
-                "items": [{"id": "primary"}],
-            }
-            result = service.freebusy().query(body=body).execute()
-            busy_times = result["calendars"]["primary"].get("busy", [])
-            free_slots = []
-            cursor = day_start
-            for period in busy_times:
-                bstart = datetime.fromisoformat(period["start"]).astimezone(local_zone)
-                bend = datetime.fromisoformat(period["end"]).astimezone(local_zone)
-                if bstart > cursor:
-                    free_slots.append((cursor.time().isoformat(), bstart.time().isoformat()))
-                cursor = max(cursor, bend)
-            if cursor < day_end:
-                free_slots.append((cursor.time().isoformat(), day_end.time().isoformat()))
-            if free_slots:
-                available_days.append({"date": current.isoformat(), "available": free_slots})
-            current += timedelta(days=1)
+# ----------------- Slot Search -----------------
+class SlotSearch(BaseModel):
+    start: str = Field(..., description="Month DD, YYYY, HH:MMAM/PM")
+    end: str = Field(..., description="Month DD, YYYY, HH:MMAM/PM")
+    duration_minutes: int = Field(..., gt=0, le=24 * 60, description="Meeting length in minutes")
+    calendars: List[str] = Field(
+        default_factory=list,
+        description="Attendee emails or room resource ids that must all be free",
+    )
+    optional_calendars: List[str] = Field(
+        default_factory=list,
+        description="Attendees who should be free if possible; slots suiting more of them rank first",
+    )
+    recurring: bool = Field(False, description="Same time on every working day in the range (e.g. a daily stand-up)")
+    work_start: str = Field("09:00", description="Earliest start, HH:MM")
+    work_end: str = Field("17:00", description="Latest end, HH:MM")
+    weekdays_only: bool = Field(True, description="Only Monday to Friday")
+    top_k: int = Field(5, gt=0, le=50, description="How many candidate slots to return")
 
-        return available_days
+
+class SlotSearchTool(BaseTool):
+    name: str = "find meeting slots"
+    description: str = (
+        "Find the best times for a meeting of a given length when the user and every listed "
+        "calendar are free, within working hours; optionally the same time on every working day"
+    )
+    args_schema: Type[BaseModel] = SlotSearch
+
+    def _run(self, start: str, end: str, duration_minutes: int, calendars: Optional[List[str]] = None,
+             optional_calendars: Optional[List[str]] = None, recurring: bool = False,
+             work_start: str = "09:00", work_end: str = "17:00", weekdays_only: bool = True, top_k: int = 5):
+        local_zone = get_localzone()
+        st = datetime.strptime(start, "%B %d, %Y, %I:%M%p").replace(tzinfo=local_zone)
+        et = datetime.strptime(end, "%B %d, %Y, %I:%M%p").replace(tzinfo=local_zone)
+        if et <= st:
+            # A bare date ("June 2, 2025, 12:00AM" for both) means that whole day
+            et = st + timedelta(days=1)
+
+        required = ["primary"] + [c for c in dict.fromkeys(calendars or []) if c != "primary"]
+        optional = [c for c in dict.fromkeys(optional_calendars or []) if c not in required]
+        busy, errors = _busy_by_calendar(required + optional, st, et, local_zone)
+        # An optional calendar we couldn't read would otherwise look free all the time
+        optional = [c for c in optional if c not in errors]
+
+        begin = max(st, datetime.now(local_zone))
+        if recurring and begin > st:
+            # A series that would have started in the past starts tomorrow instead
+            begin = datetime.combine(begin.date() + timedelta(days=1), time()).replace(tzinfo=local_zone)
+        if begin >= et:
+            return []
+        search = find_recurring_slots if recurring else find_slots
+        slots = search(
+            [busy.get(c, []) for c in required], begin.date(), (et.date() - begin.date()).days + 1,
+            local_zone, duration_minutes, optional=[busy.get(c, []) for c in optional],
+            work_start=time.fromisoformat(work_start), work_end=time.fromisoformat(work_end),
+            weekdays=WEEKDAYS if weekdays_only else range(7), top_k=top_k,
+            not_before=begin, not_after=et,
+        )
+        if recurring:
+            out = [{"start": s.start.isoformat(timespec="minutes"), "end": s.end.isoformat(timespec="minutes"),
+                    "days_free": s.days_free, "days": s.days, "optional_free": s.optional_free,
+                    "conflicts": [d.isoformat() for d in s.conflicts]} for s in slots]
+        else:
+            out = [{"start": s.start.isoformat(), "end": s.end.isoformat(), "optional_free": s.optional_free}
+                   for s in slots]
+        if errors:
+            out.append({"calendar_errors": errors})
+        return out
 
 # ----------------- Event Checker -----------------
+EVENT_PAGE_SIZE = 2500  # API maximum for events.list
+EVENT_FIELDS = "nextPageToken,items(summary,start)"
+# A listing with no end date covers this many days, so recurring events expand to a bounded list
+EVENT_OPEN_END_DAYS = 60
+
+
+def _event_local_date(start: dict, local_zone):
+    """Local calendar date an event starts on; all-day events keep their own date."""
+    if "dateTime" in start:
+        return datetime.fromisoformat(start["dateTime"].replace("Z", "+00:00")).astimezone(local_zone).date()
+    return datetime.fromisoformat(start["date"]).date()
+
+
 class EventChecker(BaseModel):
     start: str = Field(..., description="Month DD, YYYY, HH:MMAM/PM")
     end: Optional[str] = Field(None, description="Month DD, YYYY, HH:MMAM/PM")
@@ -173,29 +418,36 @@ class EventCheckerTool(BaseTool):
     name: str = "event checker"
     description: str = "List events in a date range"
     args_schema: Type[BaseModel] = EventChecker
+    # Push the date window, field projection and page size to the server
+    server_window: bool = True
 
     def _run(self, start: str, end: Optional[str] = None):
         try:
             service = _connect_calendar_api()
             start_dt = datetime.strptime(start, "%B %d, %Y, %I:%M%p").date()
-            end_dt = datetime.strptime(end, "%B %d, %Y, %I:%M%p").date() if end else None
+            if end:
+                end_dt = datetime.strptime(end, "%B %d, %Y, %I:%M%p").date()
+            else:
+                end_dt = start_dt + timedelta(days=EVENT_OPEN_END_DAYS - 1)
+            store = get_event_store()
+            if store is not None:
+                store.sync(service)
+                return self._list_from_store(store, start_dt, end_dt)
+            if self.server_window:
+                return self._list_windowed(service, start_dt, end_dt)
 
             out = []
             page_token = None
             while True:
-                resp = service.events().list(calendarId="primary", pageToken=page_token).execute()
+                resp = execute(service.events().list(calendarId="primary", pageToken=page_token))
                 for ev in resp.get("items", []):
                     ev_start = ev["start"].get("dateTime", ev["start"].get("date"))
                     try:
                         ev_date = datetime.fromisoformat(ev_start).date()
                     except Exception:
                         continue
-                    if end_dt:
-                        if not (start_dt <= ev_date <= end_dt):
-                            continue
-                    else:
-                        if ev_date < start_dt:
-                            continue
+                    if not (start_dt <= ev_date <= end_dt):
+                        continue
                     out.append({"summary": ev.get("summary", "No Title"), "start": ev_start})
                 page_token = resp.get("nextPageToken")
                 if not page_token:
@@ -203,3 +455,52 @@ class EventCheckerTool(BaseTool):
             return out
         except Exception as e:
             return [{"error": str(e)}]
+
+    def _list_from_store(self, store, start_dt, end_dt):
+        """Same window as _list_windowed, answered from the local event index."""
+        local_zone = get_localzone()
+        start_ts = datetime.combine(start_dt, time.min, tzinfo=local_zone).timestamp()
+        end_ts = datetime.combine(end_dt + timedelta(days=1), time.min, tzinfo=local_zone).timestamp()
+        return store.events_starting(start_ts, end_ts)
+
+    def _list_windowed(self, service, start_dt, end_dt):
+        """Events starting on [start_dt, end_dt] (local dates), filtered and ordered server-side."""
+        local_zone = get_localzone()
+        window_start = datetime.combine(start_dt, time.min, tzinfo=local_zone)
+        window_end = datetime.combine(end_dt + timedelta(days=1), time.min, tzinfo=local_zone)
+        user = current_user.get()
+        cached = query_cache.get("events", ["primary"], window_start, window_end, scope=user)
+        if cached is not None:
+            return [dict(item) for ev_date, item in cached if start_dt <= ev_date <= end_dt]
+
+        params = {
+            "calendarId": "primary",
+            "timeMin": window_start.isoformat(),
+            # timeMax is exclusive: stop at the start of the day after end_dt
+            "timeMax": window_end.isoformat(),
+            "singleEvents": True,
+            "orderBy": "startTime",
+            "timeZone": str(local_zone),
+            "maxResults": EVENT_PAGE_SIZE,
+            "fields": EVENT_FIELDS,
+        }
+        rows = []
+        page_token = None
+        while True:
+            resp = execute(service.events().list(pageToken=page_token, **params))
+            for ev in resp.get("items", []):
+                # The server returns anything overlapping the window; keep only events
+                # that start inside it, like the unwindowed listing does.
+                try:
+                    ev_date = _event_local_date(ev["start"], local_zone)
+                except Exception:
+                    continue
+                if ev_date < start_dt:
+                    continue
+                ev_start = ev["start"].get("dateTime", ev["start"].get("date"))
+                rows.append((ev_date, {"summary": ev.get("summary", "No Title"), "start": ev_start}))
+            page_token = resp.get("nextPageToken")
+            if not page_token:
+                break
+        query_cache.put("events", ["primary"], window_start, window_end, rows, scope=user)
+        return [dict(item) for _, item in rows]
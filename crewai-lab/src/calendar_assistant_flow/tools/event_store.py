@@ -0,0 +1,245 @@
+# event_store.py
+"""Local SQLite mirror of Google Calendar events.
+
+The first sync pages through the whole calendar once and stores the
+``nextSyncToken``; later syncs only fetch the delta since that token. A
+sync is one transaction: a page that fails leaves the store as it was before
+the sync, sync token included. Reads are answered from an index on
+(calendar_id, start_ts, end_ts).
+"""
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from googleapiclient.errors import HttpError
+from tzlocal import get_localzone
+
+from calendar_assistant_flow.tools.calendar_client import DEFAULT_USER, current_user, execute
+
+# Empty = no local store (tools call the API directly). Users other than the
+# default one get a sibling file: events.sqlite -> events.<user>.sqlite
+EVENT_STORE_PATH = os.getenv("EVENT_STORE_PATH", "")
+# Delta syncs closer together than this are skipped; local writes are applied immediately anyway
+EVENT_STORE_SYNC_INTERVAL = float(os.getenv("EVENT_STORE_SYNC_INTERVAL", "30"))
+
+SYNC_PAGE_SIZE = 2500
+SYNC_FIELDS = "nextPageToken,nextSyncToken,items(id,status,summary,start,end,htmlLink)"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    calendar_id TEXT NOT NULL,
+    id          TEXT NOT NULL,
+    summary     TEXT,
+    start_raw   TEXT NOT NULL,
+    start_ts    REAL NOT NULL,
+    end_ts      REAL NOT NULL,
+    all_day     INTEGER NOT NULL,
+    payload     TEXT NOT NULL,
+    PRIMARY KEY (calendar_id, id)
+);
+CREATE INDEX IF NOT EXISTS idx_events_window ON events (calendar_id, start_ts, end_ts);
+CREATE TABLE IF NOT EXISTS sync_state (
+    calendar_id TEXT PRIMARY KEY,
+    sync_token  TEXT,
+    synced_at   REAL
+);
+"""
+
+
+def _to_ts(point: dict, local_zone) -> float:
+    """Epoch seconds for an event start/end; all-day dates are local midnight."""
+    if "dateTime" in point:
+        dt = datetime.fromisoformat(point["dateTime"].replace("Z", "+00:00"))
+        if dt.tzinfo is None:
+            dt = dt.replace(tzinfo=local_zone)
+        return dt.timestamp()
+    d = datetime.fromisoformat(point["date"])
+    return d.replace(tzinfo=local_zone).timestamp()
+
+
+class EventStore:
+    """Thread-safe SQLite event cache kept current with syncToken deltas."""
+
+    def __init__(self, path: str = ":memory:", sync_interval: float = EVENT_STORE_SYNC_INTERVAL):
+        self.path = path
+        self.sync_interval = sync_interval
+        self._lock = threading.RLock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.executescript(_SCHEMA)
+        self._last_sync: dict = {}
+        self.stats = {"full_syncs": 0, "delta_syncs": 0, "skipped_syncs": 0, "pages": 0, "changes": 0}
+
+    # ----------------- Sync -----------------
+    def sync(self, service, calendar_id: str = "primary", force: bool = False) -> str:
+        """Bring ``calendar_id`` up to date. Returns "full", "delta" or "skipped"."""
+        with self._lock:
+            if not force and time.monotonic() - self._last_sync.get(calendar_id, float("-inf")) < self.sync_interval:
+                self.stats["skipped_syncs"] += 1
+                return "skipped"
+
+            token = self._sync_token(calendar_id)
+            mode = "full"
+            if token:
+                try:
+                    self._pull(service, calendar_id, sync_token=token)
+                    mode = "delta"
+                except HttpError as e:
+                    self._db.rollback()
+                    # 410 Gone: the token expired, start over with a full sync
+                    if getattr(e.resp, "status", None) != 410:
+                        raise
+                    token = None
+                except BaseException:
+                    self._db.rollback()
+                    raise
+            if not token:
+                # One transaction with the pull (committed by _pull): if any page fails, the
+                # rollback restores the previous events and sync token instead of an empty store
+                try:
+                    self._db.execute("DELETE FROM events WHERE calendar_id = ?", (calendar_id,))
+                    self._pull(service, calendar_id)
+                except BaseException:
+                    self._db.rollback()
+                    raise
+
+            self.stats[f"{mode}_syncs"] += 1
+            self._last_sync[calendar_id] = time.monotonic()
+            return mode
+
+    def _pull(self, service, calendar_id: str, sync_token: Optional[str] = None) -> None:
+        local_zone = get_localzone()
+        params = {"calendarId": calendar_id, "singleEvents": True,
+                  "maxResults": SYNC_PAGE_SIZE, "fields": SYNC_FIELDS}
+        if sync_token:
+            params["syncToken"] = sync_token
+
+        page_token = None
+        while True:
+            resp = execute(service.events().list(pageToken=page_token, **params))
+            self.stats["pages"] += 1
+            for ev in resp.get("items", []):
+                self.stats["changes"] += 1
+                if ev.get("status") == "cancelled":
+                    self._delete(calendar_id, ev["id"])
+                else:
+                    self._upsert(calendar_id, ev, local_zone)
+            page_token = resp.get("nextPageToken")
+            if not page_token:
+                break
+
+        self._db.execute(
+            "INSERT OR REPLACE INTO sync_state (calendar_id, sync_token, synced_at) VALUES (?, ?, ?)",
+            (calendar_id, resp.get("nextSyncToken"), time.time()),
+        )
+        self._db.commit()
+
+    def _sync_token(self, calendar_id: str) -> Optional[str]:
+        row = self._db.execute(
+            "SELECT sync_token FROM sync_state WHERE calendar_id = ?", (calendar_id,)
+        ).fetchone()
+        return row[0] if row else None
+
+    # ----------------- Writes -----------------
+    def _upsert(self, calendar_id: str, ev: dict, local_zone) -> None:
+        start, end = ev.get("start", {}), ev.get("end", {})
+        if not start:
+            return
+        self._db.execute(
+            "INSERT OR REPLACE INTO events VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                calendar_id,
+                ev["id"],
+                ev.get("summary"),
+                start.get("dateTime", start.get("date")),
+                _to_ts(start, local_zone),
+                _to_ts(end or start, local_zone),
+                int("dateTime" not in start),
+                json.dumps(ev),
+            ),
+        )
+
+    def _delete(self, calendar_id: str, event_id: str) -> None:
+        self._db.execute("DELETE FROM events WHERE calendar_id = ? AND id = ?", (calendar_id, event_id))
+
+    def upsert(self, ev: dict, calendar_id: str = "primary") -> None:
+        """Apply a write made through the API (e.g. events().insert) without waiting for the next sync."""
+        with self._lock:
+            self._upsert(calendar_id, ev, get_localzone())
+            self._db.commit()
+
+    def expire(self, calendar_id: str = "primary") -> None:
+        """Make the next sync() fetch the delta even inside the sync interval.
+
+        For writes upsert() can't mirror, like a recurring event: only a sync
+        returns its individual instances.
+        """
+        with self._lock:
+            self._last_sync.pop(calendar_id, None)
+
+    def delete(self, event_id: str, calendar_id: str = "primary") -> None:
+        with self._lock:
+            self._delete(calendar_id, event_id)
+            self._db.commit()
+
+    def clear(self) -> None:
+        """Forget every mirrored event and sync token; the next sync is a full one."""
+        with self._lock:
+            self._db.execute("DELETE FROM events")
+            self._db.execute("DELETE FROM sync_state")
+            self._db.commit()
+            self._last_sync.clear()
+
+    # ----------------- Reads -----------------
+    def events_starting(self, start_ts: float, end_ts: Optional[float] = None,
+                        calendar_id: str = "primary") -> List[dict]:
+        """Events whose start falls in [start_ts, end_ts), ordered by start."""
+        sql = "SELECT summary, start_raw FROM events WHERE calendar_id = ? AND start_ts >= ?"
+        args: list = [calendar_id, start_ts]
+        if end_ts is not None:
+            sql += " AND start_ts < ?"
+            args.append(end_ts)
+        with self._lock:
+            rows = self._db.execute(sql + " ORDER BY start_ts", args).fetchall()
+        return [{"summary": summary or "No Title", "start": start_raw} for summary, start_raw in rows]
+
+    def count(self, calendar_id: str = "primary") -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM events WHERE calendar_id = ?", (calendar_id,)).fetchone()[0]
+
+
+_UNSAFE = re.compile(r"[^\w.@+-]")
+_stores: Dict[str, EventStore] = {}
+_stores_lock = threading.Lock()
+
+
+def _store_path(user: str) -> str:
+    if user == DEFAULT_USER or EVENT_STORE_PATH == ":memory:":
+        return EVENT_STORE_PATH
+    root, ext = os.path.splitext(EVENT_STORE_PATH)
+    return f"{root}.{_UNSAFE.sub('_', user)}{ext}"
+
+
+def get_event_store(user: Optional[str] = None) -> Optional[EventStore]:
+    """Store for ``user`` (default: the current user), or None when the local store is disabled."""
+    if not EVENT_STORE_PATH:
+        return None
+    user = user or current_user.get()
+    with _stores_lock:
+        store = _stores.get(user)
+        if store is None:
+            store = _stores[user] = EventStore(_store_path(user))
+        return store
+
+
+def reset_event_stores() -> None:
+    """Empty and forget every open store (the calendar behind them was swapped, see calendar_clients.override)."""
+    with _stores_lock:
+        stores = list(_stores.values())
+        _stores.clear()
+    for store in stores:
+        store.clear()
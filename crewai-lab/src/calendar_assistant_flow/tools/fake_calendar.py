@@ -0,0 +1,382 @@
+# fake_calendar.py
+"""In-memory stand-in for the Google Calendar v3 service.
+
+Mimics the subset of the discovery client the tools use
+(``service.events().list(...).execute()`` and friends) closely enough to run
+the tools and benchmarks offline. Every executed request is counted, together
+with the size of the JSON payload it would have returned. Batches
+(``new_batch_http_request``) count as one round trip. With ``qps_limit`` set,
+requests beyond that many in any one second are rejected with 403
+rateLimitExceeded, like an exhausted Calendar quota. ``latency`` adds that
+many seconds per round trip (a batch pays it once).
+"""
+import json
+import random
+import re
+import threading
+import time
+from collections import Counter, deque
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlencode
+from zoneinfo import ZoneInfo
+
+import httplib2
+from googleapiclient.errors import HttpError
+
+DEFAULT_PAGE_SIZE = 250
+MAX_PAGE_SIZE = 2500
+FREEBUSY_MAX_CALENDARS = 50
+FREEBUSY_MAX_DAYS = 60
+
+
+def _parse_rfc3339(value: str) -> datetime:
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+def _event_bounds(ev: dict) -> tuple:
+    """(start, end) of an event as aware datetimes; all-day events use UTC midnight."""
+    def _point(p: dict) -> datetime:
+        if "dateTime" in p:
+            return _parse_rfc3339(p["dateTime"])
+        d = date.fromisoformat(p["date"])
+        return datetime(d.year, d.month, d.day, tzinfo=timezone.utc)
+
+    return _point(ev["start"]), _point(ev["end"])
+
+
+def _with_offsets(body: dict) -> dict:
+    """Resolve naive start/end dateTimes against their timeZone, as the API does on write."""
+    body = dict(body)
+    for key in ("start", "end"):
+        p = body.get(key)
+        if isinstance(p, dict) and "dateTime" in p:
+            dt = _parse_rfc3339(p["dateTime"])
+            if dt.tzinfo is None:
+                dt = dt.replace(tzinfo=ZoneInfo(p.get("timeZone") or "UTC"))
+            body[key] = {**p, "dateTime": dt.isoformat()}
+    return body
+
+
+def _split_fields(spec: str) -> List[str]:
+    out, depth, cur = [], 0, ""
+    for ch in spec:
+        if ch == "," and depth == 0:
+            out.append(cur.strip())
+            cur = ""
+            continue
+        depth += ch == "("
+        depth -= ch == ")"
+        cur += ch
+    if cur.strip():
+        out.append(cur.strip())
+    return out
+
+
+def project_fields(obj: Any, spec: Optional[str]) -> Any:
+    """Apply a Google partial-response ``fields`` selector, e.g. ``nextPageToken,items(summary,start)``."""
+    if not spec:
+        return obj
+    if isinstance(obj, list):
+        return [project_fields(o, spec) for o in obj]
+    out = {}
+    for part in _split_fields(spec):
+        m = re.match(r"^([\w/]+)(?:\((.*)\))?$", part)
+        if not m:
+            continue
+        key, sub = m.group(1).split("/")[0], m.group(2)
+        if key in obj:
+            out[key] = project_fields(obj[key], sub) if sub else obj[key]
+    return out
+
+
+class FakeRequest:
+    """Lazy request object, like googleapiclient.http.HttpRequest."""
+
+    def __init__(self, service: "InMemoryCalendarService", method: str, params: dict, handler):
+        self._service = service
+        self._handler = handler
+        self.method = "POST" if method.endswith(("insert", "query")) else "GET"
+        self.methodId = f"calendar.{method}"
+        query = {k: v for k, v in params.items() if k != "body" and v is not None}
+        self.uri = f"https://www.googleapis.com/calendar/v3/{method}?{urlencode(sorted(query.items()), doseq=True)}"
+        self.body = json.dumps(params["body"], sort_keys=True) if "body" in params else None
+
+    def execute(self, http=None, num_retries: int = 0):
+        self._service._round_trip()
+        return self._run()
+
+    def _run(self):
+        self._service._admit()
+        result = self._handler()
+        self._service.calls[self.methodId] += 1
+        self._service.bytes_returned += len(json.dumps(result))
+        return result
+
+
+def _http_error(status: int, reason: str) -> HttpError:
+    body = json.dumps({"error": {"code": status, "message": reason, "errors": [{"reason": reason}]}})
+    return HttpError(httplib2.Response({"status": status}), body.encode())
+
+
+class FakeBatch:
+    """Like googleapiclient.http.BatchHttpRequest: one round trip, a callback per request."""
+
+    def __init__(self, service: "InMemoryCalendarService", callback=None):
+        self._service = service
+        self._callback = callback
+        self._requests: List[tuple] = []
+
+    def add(self, request: FakeRequest, callback=None, request_id: Optional[str] = None) -> None:
+        rid = request_id if request_id is not None else str(len(self._requests) + 1)
+        self._requests.append((rid, request, callback or self._callback))
+
+    def execute(self, http=None) -> None:
+        self._service.batches += 1
+        self._service._round_trip()
+        for rid, request, callback in self._requests:
+            try:
+                response, exception = request._run(), None
+                self._service.batched += 1
+            except HttpError as e:
+                response, exception = None, e
+            if callback is not None:
+                callback(rid, response, exception)
+
+
+class _Events:
+    def __init__(self, service: "InMemoryCalendarService"):
+        self._service = service
+
+    def list(self, calendarId: str = "primary", **params) -> FakeRequest:
+        return FakeRequest(self._service, "events.list", dict(params, calendarId=calendarId),
+                           lambda: self._service._list(calendarId, params))
+
+    def insert(self, calendarId: str = "primary", body: Optional[dict] = None, **params) -> FakeRequest:
+        return FakeRequest(self._service, "events.insert", dict(params, calendarId=calendarId, body=body),
+                           lambda: self._service._insert(calendarId, body or {}))
+
+    def patch(self, calendarId: str = "primary", eventId: str = "", body: Optional[dict] = None, **params) -> FakeRequest:
+        return FakeRequest(self._service, "events.patch", dict(params, calendarId=calendarId, eventId=eventId, body=body),
+                           lambda: self._service._patch(calendarId, eventId, body or {}))
+
+    def delete(self, calendarId: str = "primary", eventId: str = "", **params) -> FakeRequest:
+        return FakeRequest(self._service, "events.delete", dict(params, calendarId=calendarId, eventId=eventId),
+                           lambda: self._service._delete(calendarId, eventId))
+
+
+class _Freebusy:
+    def __init__(self, service: "InMemoryCalendarService"):
+        self._service = service
+
+    def query(self, body: Optional[dict] = None, **params) -> FakeRequest:
+        return FakeRequest(self._service, "freebusy.query", dict(params, body=body),
+                           lambda: self._service._freebusy(body or {}))
+
+
+class InMemoryCalendarService:
+    """Duck-typed replacement for ``build("calendar", "v3")``."""
+
+    def __init__(self, events: Optional[Dict[str, List[dict]]] = None, qps_limit: Optional[float] = None,
+                 latency: float = 0.0):
+        self.calendars: Dict[str, List[dict]] = events or {"primary": []}
+        self.latency = latency
+        self.calls: Counter = Counter()
+        self.bytes_returned = 0
+        self.batches = 0
+        self.batched = 0
+        self.rejected = 0
+        self.qps_limit = qps_limit
+        self._admitted: deque = deque()
+        self._quota_lock = threading.Lock()
+        # Change log for syncToken deltas: every write bumps a global version
+        self._version = 0
+        self._versions: Dict[str, Dict[str, int]] = {}
+        self._tombstones: Dict[str, Dict[str, int]] = {}
+        # Sync tokens older than this are rejected with 410 Gone
+        self.min_sync_version = 0
+        for cal_id, items in self.calendars.items():
+            for ev in items:
+                self._touch(cal_id, ev["id"])
+
+    # ----------------- Resources -----------------
+    def events(self) -> _Events:
+        return _Events(self)
+
+    def freebusy(self) -> _Freebusy:
+        return _Freebusy(self)
+
+    def new_batch_http_request(self, callback=None) -> FakeBatch:
+        return FakeBatch(self, callback)
+
+    # ----------------- Helpers -----------------
+    @property
+    def round_trips(self) -> int:
+        """HTTP round trips: requests executed on their own, plus one per batch."""
+        return sum(self.calls.values()) - self.batched + self.batches
+
+    def reset_counters(self) -> None:
+        self.calls.clear()
+        self.bytes_returned = 0
+        self.batches = self.batched = self.rejected = 0
+
+    def _round_trip(self) -> None:
+        if self.latency:
+            time.sleep(self.latency)
+
+    def _admit(self) -> None:
+        """Reject the request if ``qps_limit`` requests were already served in the last second."""
+        if not self.qps_limit:
+            return
+        with self._quota_lock:
+            now = time.monotonic()
+            while self._admitted and now - self._admitted[0] >= 1.0:
+                self._admitted.popleft()
+            if len(self._admitted) >= self.qps_limit:
+                self.rejected += 1
+                raise _http_error(403, "rateLimitExceeded")
+            self._admitted.append(now)
+
+    def expire_sync_tokens(self) -> None:
+        """Invalidate every sync token handed out so far (the next delta sync gets 410 Gone)."""
+        self.min_sync_version = self._version + 1
+
+    def _touch(self, calendar_id: str, event_id: str) -> None:
+        self._version += 1
+        self._versions.setdefault(calendar_id, {})[event_id] = self._version
+
+    def seed(self, n: int, calendar_id: str = "primary", start: Optional[datetime] = None,
+             days: int = 365, all_day_ratio: float = 0.1, seed: int = 7) -> None:
+        """Add ``n`` events spread evenly over ``days`` days, with full-size payloads."""
+        rng = random.Random(seed)
+        start = start or datetime(2025, 1, 1, tzinfo=timezone.utc)
+        items = self.calendars.setdefault(calendar_id, [])
+        for i in range(n):
+            day = start + timedelta(days=(i * days) // max(n, 1))
+            uid = f"evt{len(items):06d}"
+            if rng.random() < all_day_ratio:
+                when = {"start": {"date": day.date().isoformat()},
+                        "end": {"date": (day.date() + timedelta(days=1)).isoformat()},
+                        "transparency": "transparent"}
+            else:
+                st = day.replace(hour=rng.randint(7, 18), minute=rng.choice([0, 15, 30, 45]))
+                en = st + timedelta(minutes=rng.choice([15, 30, 45, 60, 90]))
+                when = {"start": {"dateTime": st.isoformat()}, "end": {"dateTime": en.isoformat()}}
+            items.append({
+                "kind": "calendar#event",
+                "etag": f'"{3000000000000000 + i}"',
+                "id": uid,
+                "status": "confirmed",
+                "htmlLink": f"https://www.google.com/calendar/event?eid={uid}",
+                "created": start.isoformat(),
+                "updated": start.isoformat(),
+                "summary": f"Meeting {i}",
+                "description": "Agenda: status updates, blockers and next steps. " * 3,
+                "location": "Conference Room B",
+                "creator": {"email": "me@example.com", "self": True},
+                "organizer": {"email": "me@example.com", "self": True},
+                "attendees": [{"email": f"guest{j}@example.com", "responseStatus": "needsAction"}
+                              for j in range(rng.randint(1, 5))],
+                "iCalUID": f"{uid}@google.com",
+                "sequence": 0,
+                "reminders": {"useDefault": True},
+                "eventType": "default",
+                **when,
+            })
+            self._touch(calendar_id, uid)
+
+    # ----------------- Handlers -----------------
+    def _list(self, calendar_id: str, params: dict) -> dict:
+        items = list(self.calendars.get(calendar_id, []))
+        if params.get("syncToken"):
+            try:
+                cal, since = params["syncToken"].rsplit(":", 1)
+                since = int(since)
+            except ValueError:
+                raise _http_error(400, "invalid")
+            if cal != calendar_id or since < self.min_sync_version:
+                raise _http_error(410, "fullSyncRequired")
+            versions = self._versions.get(calendar_id, {})
+            items = [ev for ev in items if versions.get(ev["id"], 0) > since]
+            items += [{"id": eid, "status": "cancelled"}
+                      for eid, v in self._tombstones.get(calendar_id, {}).items() if v > since]
+            items.sort(key=lambda ev: versions.get(ev["id"]) or self._tombstones[calendar_id][ev["id"]])
+        if params.get("timeMin"):
+            lo = _parse_rfc3339(params["timeMin"])
+            items = [ev for ev in items if _event_bounds(ev)[1] > lo]
+        if params.get("timeMax"):
+            hi = _parse_rfc3339(params["timeMax"])
+            items = [ev for ev in items if _event_bounds(ev)[0] < hi]
+        if params.get("orderBy") == "startTime":
+            items.sort(key=lambda ev: _event_bounds(ev)[0])
+
+        size = min(int(params.get("maxResults") or DEFAULT_PAGE_SIZE), MAX_PAGE_SIZE)
+        offset = int(params.get("pageToken") or 0)
+        resp = {"kind": "calendar#events", "summary": calendar_id, "items": items[offset:offset + size]}
+        if offset + size < len(items):
+            resp["nextPageToken"] = str(offset + size)
+        else:
+            resp["nextSyncToken"] = f"{calendar_id}:{self._version}"
+        return project_fields(resp, params.get("fields"))
+
+    def _freebusy(self, body: dict) -> dict:
+        lo, hi = _parse_rfc3339(body["timeMin"]), _parse_rfc3339(body["timeMax"])
+        items = body.get("items", [])
+        if len(items) > FREEBUSY_MAX_CALENDARS:
+            raise _http_error(400, "tooManyCalendarsRequested")
+        if hi - lo > timedelta(days=FREEBUSY_MAX_DAYS):
+            raise _http_error(400, "timeRangeEmpty")
+
+        calendars = {}
+        for item in items:
+            cal_id = item["id"]
+            if cal_id not in self.calendars:
+                calendars[cal_id] = {"errors": [{"domain": "global", "reason": "notFound"}], "busy": []}
+                continue
+            busy = []
+            for ev in self.calendars[cal_id]:
+                if ev.get("transparency") == "transparent":
+                    continue
+                st, en = _event_bounds(ev)
+                if en > lo and st < hi:
+                    busy.append((max(st, lo), min(en, hi)))
+            busy.sort()
+            calendars[cal_id] = {"busy": [{"start": a.astimezone(timezone.utc).isoformat().replace("+00:00", "Z"),
+                                           "end": b.astimezone(timezone.utc).isoformat().replace("+00:00", "Z")}
+                                          for a, b in busy]}
+        return {"kind": "calendar#freeBusy", "timeMin": body["timeMin"], "timeMax": body["timeMax"],
+                "calendars": calendars}
+
+    def _find(self, calendar_id: str, event_id: str) -> dict:
+        for ev in self.calendars.get(calendar_id, []):
+            if ev["id"] == event_id:
+                return ev
+        raise _http_error(404, "notFound")
+
+    def _insert(self, calendar_id: str, body: dict) -> dict:
+        items = self.calendars.setdefault(calendar_id, [])
+        uid = f"new{self._version + 1:06d}"
+        ev = {
+            "kind": "calendar#event",
+            "id": uid,
+            "status": "confirmed",
+            "htmlLink": f"https://www.google.com/calendar/event?eid={uid}",
+            **_with_offsets(body),
+        }
+        items.append(ev)
+        self._touch(calendar_id, uid)
+        return ev
+
+    def _patch(self, calendar_id: str, event_id: str, body: dict) -> dict:
+        ev = self._find(calendar_id, event_id)
+        ev.update(_with_offsets(body))
+        self._touch(calendar_id, event_id)
+        return ev
+
+    def _delete(self, calendar_id: str, event_id: str) -> str:
+        ev = self._find(calendar_id, event_id)
+        self.calendars[calendar_id].remove(ev)
+        self._versions[calendar_id].pop(event_id, None)
+        self._version += 1
+        self._tombstones.setdefault(calendar_id, {})[event_id] = self._version
+        return ""
@@ -0,0 +1,391 @@
+# google_api.py
+"""Quota-aware executor for Google API requests.
+
+Every Calendar call goes through one GoogleApiExecutor (see
+calendar_client.execute / execute_batch), which
+
+- spends tokens from a per-user and a per-project token bucket before each
+  request, so bursts are smoothed below Google's per-minute quotas instead of
+  being rejected by them;
+- retries rate-limit errors (429, 403 rateLimitExceeded/userRateLimitExceeded)
+  and, for reads, 5xx and connection errors, with full-jitter exponential
+  backoff (honouring Retry-After). Writes are only retried on rate limits,
+  which Google rejects before doing anything, so an insert is never doubled;
+- collapses concurrent identical reads: while one caller has a request in
+  flight, others asking for the same user/method/URI/body wait for its result
+  (shared, so treat responses as read-only);
+- sends grouped requests through the batch HTTP endpoint, up to 50 per HTTP
+  round trip, retrying just the items that were rate limited;
+- runs each round trip over a connection leased from ``connections`` (see
+  calendar_client.CalendarClientProvider.lease) when one is set, since
+  httplib2 connections must not be shared between threads.
+
+Every request made on the wire costs one quota unit (retries and each item of
+a batch included; collapsed callers cost nothing). Units are counted per
+method and user in stats(), on the request's trace span, and on an optional
+QuotaMeter so a caller can report what one flow cost (see main.run_question).
+
+    GOOGLE_USER_QPM=600           per-user requests per minute (0 = no limit)
+    GOOGLE_PROJECT_QPM=10000      whole-process requests per minute (0 = no limit)
+    GOOGLE_MAX_RETRIES=5          attempts after the first, per request
+    GOOGLE_BACKOFF_BASE=0.5       seconds; attempt n waits up to base * 2**n ...
+    GOOGLE_BACKOFF_CAP=32         ... and never more than this
+"""
+import contextvars
+import json
+import os
+import random
+import socket
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from typing import Any, ContextManager, Dict, List, Optional, Protocol, Sequence, Tuple
+
+from calendar_assistant_flow.limits import google_limiter
+from calendar_assistant_flow.tracing import tracer
+
+USER_QPM = float(os.getenv("GOOGLE_USER_QPM", "600"))
+PROJECT_QPM = float(os.getenv("GOOGLE_PROJECT_QPM", "10000"))
+MAX_RETRIES = int(os.getenv("GOOGLE_MAX_RETRIES", "5"))
+BACKOFF_BASE = float(os.getenv("GOOGLE_BACKOFF_BASE", "0.5"))
+BACKOFF_CAP = float(os.getenv("GOOGLE_BACKOFF_CAP", "32"))
+
+BATCH_MAX = 50  # Calendar API limit on requests per batch
+RATE_LIMIT_REASONS = {"rateLimitExceeded", "userRateLimitExceeded"}
+# Reads that use POST; safe to retry on server errors
+IDEMPOTENT_POSTS = {"calendar.freebusy.query"}
+
+
+class TokenBucket:
+    """``rate`` tokens per second up to ``burst``; acquire() waits its turn when empty.
+
+    Callers reserve tokens up front (the level may go negative) and sleep off
+    their debt outside the lock, so waiters are served in arrival order.
+    """
+
+    def __init__(self, rate: float, burst: Optional[float] = None):
+        self.rate = rate
+        self.burst = burst if burst is not None else max(rate, 1.0)
+        self._level = self.burst
+        self._stamp = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens: float = 1) -> float:
+        """Take ``tokens``, sleeping until they are available; returns seconds waited."""
+        if self.rate <= 0:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            self._level = min(self.burst, self._level + (now - self._stamp) * self.rate)
+            self._stamp = now
+            self._level -= tokens
+            wait = -self._level / self.rate if self._level < 0 else 0.0
+        if wait:
+            time.sleep(wait)
+        return wait
+
+
+class QuotaMeter:
+    """Quota units spent by one unit of work (a flow run, a sync), across its threads."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.units = 0
+        self.by_method: Counter = Counter()
+
+    def add(self, method: str, units: int) -> None:
+        with self._lock:
+            self.units += units
+            self.by_method[method] += units
+
+
+_meter: contextvars.ContextVar[Optional[QuotaMeter]] = contextvars.ContextVar("google_quota_meter", default=None)
+
+
+@contextmanager
+def metered():
+    """Count the quota spent by calls made inside the block (and threads copying its context)."""
+    meter = QuotaMeter()
+    token = _meter.set(meter)
+    try:
+        yield meter
+    finally:
+        _meter.reset(token)
+
+
+def _status_reason(exc: BaseException) -> Tuple[Optional[int], str]:
+    resp = getattr(exc, "resp", None)
+    if resp is None:
+        return None, ""
+    status = int(getattr(resp, "status", 0) or 0)
+    try:
+        errors = json.loads(exc.content)["error"].get("errors") or [{}]
+        reason = errors[0].get("reason", "")
+    except (AttributeError, KeyError, TypeError, ValueError):
+        reason = ""
+    return status, reason
+
+
+def _retry_after(exc: BaseException) -> Optional[float]:
+    resp = getattr(exc, "resp", None)
+    try:
+        return float(resp.get("retry-after")) if resp is not None and resp.get("retry-after") else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _method(request) -> str:
+    return getattr(request, "methodId", "calendar.request")
+
+
+def _is_read(request) -> bool:
+    return getattr(request, "method", "GET") == "GET" or _method(request) in IDEMPOTENT_POSTS
+
+
+class ConnectionPool(Protocol):
+    def lease(self, user: str) -> ContextManager[Any]:
+        """An HTTP connection for ``user``, held for one round trip (None: the request's own)."""
+
+
+class _Flight:
+    """One in-progress read that identical concurrent reads wait on."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class GoogleApiExecutor:
+    """Throttled, retried, de-duplicated execution of Google API requests."""
+
+    def __init__(self, user_qpm: float = USER_QPM, project_qpm: float = PROJECT_QPM,
+                 max_retries: int = MAX_RETRIES, backoff_base: float = BACKOFF_BASE,
+                 backoff_cap: float = BACKOFF_CAP):
+        self._lock = threading.Lock()
+        self._flights: Dict[tuple, _Flight] = {}
+        # Where round trips get their connection; None sends over the request's own http
+        self.connections: Optional[ConnectionPool] = None
+        self._user_buckets: Dict[str, TokenBucket] = {}
+        self.configure(user_qpm, project_qpm, max_retries, backoff_base, backoff_cap)
+        self._stats = Counter()
+        self._units_by_method: Counter = Counter()
+        self._units_by_user: Counter = Counter()
+
+    def configure(self, user_qpm: Optional[float] = None, project_qpm: Optional[float] = None,
+                  max_retries: Optional[int] = None, backoff_base: Optional[float] = None,
+                  backoff_cap: Optional[float] = None) -> None:
+        """Change limits and retry policy; None keeps the current value."""
+        with self._lock:
+            if user_qpm is not None:
+                self.user_qpm = user_qpm
+                self._user_buckets.clear()
+            if project_qpm is not None:
+                self.project_qpm = project_qpm
+                self._project_bucket = TokenBucket(project_qpm / 60)
+            if max_retries is not None:
+                self.max_retries = max_retries
+            if backoff_base is not None:
+                self.backoff_base = backoff_base
+            if backoff_cap is not None:
+                self.backoff_cap = backoff_cap
+
+    # ----------------- Quota -----------------
+    def _user_bucket(self, user: str) -> TokenBucket:
+        with self._lock:
+            bucket = self._user_buckets.get(user)
+            if bucket is None:
+                bucket = self._user_buckets[user] = TokenBucket(self.user_qpm / 60)
+            return bucket
+
+    def _spend(self, user: str, method: str, units: int) -> None:
+        """Wait for ``units`` tokens from both buckets, then book them."""
+        waited = self._user_bucket(user).acquire(units) + self._project_bucket.acquire(units)
+        with self._lock:
+            self._stats["requests"] += units
+            self._stats["throttle_wait_ms"] += round(waited * 1000)
+            self._units_by_method[method] += units
+            self._units_by_user[user] += units
+        meter = _meter.get()
+        if meter is not None:
+            meter.add(method, units)
+        tracer.current().add("google.quota", units)
+
+    def _backoff(self, attempt: int, exc: BaseException) -> None:
+        delay = _retry_after(exc)
+        if delay is None:
+            delay = random.uniform(0, min(self.backoff_cap, self.backoff_base * 2 ** attempt))
+        with self._lock:
+            self._stats["retries"] += 1
+            self._stats["backoff_ms"] += round(delay * 1000)
+        time.sleep(delay)
+
+    def _retryable(self, exc: BaseException, read: bool) -> bool:
+        status, reason = _status_reason(exc)
+        if status == 429 or (status == 403 and reason in RATE_LIMIT_REASONS):
+            with self._lock:
+                self._stats["rate_limited"] += 1
+            return True
+        if not read:
+            return False
+        if status is not None:
+            return status >= 500
+        return isinstance(exc, (ConnectionError, socket.timeout, TimeoutError))
+
+    # ----------------- Single requests -----------------
+    def execute(self, request, user: str):
+        """Run ``request`` for ``user`` under the quota, retrying transient failures."""
+        if not _is_read(request):
+            return self._execute(request, user, read=False)
+        key = (user, _method(request), request.uri, getattr(request, "body", None))
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+            else:
+                self._stats["collapsed"] += 1
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+        try:
+            flight.result = self._execute(request, user, read=True)
+            return flight.result
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                self._flights.pop(key, None)
+            flight.done.set()
+
+    def _execute(self, request, user: str, read: bool):
+        method = _method(request)
+        attempt = 0
+        while True:
+            self._spend(user, method, 1)
+            try:
+                return self._send(request, method, user)
+            except Exception as e:
+                if attempt >= self.max_retries or not self._retryable(e, read):
+                    with self._lock:
+                        self._stats["failures"] += 1
+                    raise
+                self._backoff(attempt, e)
+                attempt += 1
+
+    @contextmanager
+    def _connection(self, user: str):
+        if self.connections is None:
+            yield None
+        else:
+            with self.connections.lease(user) as http:
+                yield http
+
+    def _send(self, request, method: str, user: str):
+        if not tracer.enabled:
+            with google_limiter.slot(), self._connection(user) as http:
+                return request.execute(http=http)
+
+        with tracer.span(f"google.{method}", **{"rpc.method": method, "http.method": request.method}) as span:
+            span.set("google.quota", 1)
+            with google_limiter.slot(), self._connection(user) as http:
+                response = request.execute(http=http)
+            # The client hands back parsed JSON; re-serialising gives the payload size
+            size = len(json.dumps(response)) if response else 0
+            span.set("http.response.body.size", size)
+            if isinstance(response, dict):
+                span.set("google.page.items", len(response.get("items", ())))
+                span.set("google.page.has_next", "nextPageToken" in response)
+                span.set("google.page.continuation", "pageToken=" in request.uri)
+        # Roll pages and bytes up to the enclosing span (tool call, crew kickoff, sync)
+        parent = tracer.current()
+        parent.add("google.pages")
+        parent.add("google.bytes", size)
+        return response
+
+    # ----------------- Batches -----------------
+    def execute_batch(self, service, requests: Sequence, user: str, return_exceptions: bool = False) -> List[Any]:
+        """Run ``requests`` through ``service``'s batch endpoint; results in request order.
+
+        Items that hit a rate limit (or, for reads, a server error) are retried
+        in a smaller batch after a backoff; so are the unanswered items of a
+        batch call that fails as a whole. With ``return_exceptions`` a failed
+        item's exception takes its place in the result list; otherwise the first
+        failure is raised once the rest of the batch has finished.
+        """
+        results: List[Any] = [None] * len(requests)
+        errors: Dict[int, BaseException] = {}
+        pending = list(range(len(requests)))
+        attempt = 0
+        while pending:
+            failed: Dict[int, BaseException] = {}
+            for i in range(0, len(pending), BATCH_MAX):
+                chunk = pending[i:i + BATCH_MAX]
+                failed.update(self._send_batch(service, requests, chunk, user, results))
+            retry = [i for i, e in failed.items()
+                     if attempt < self.max_retries and self._retryable(e, _is_read(requests[i]))]
+            for i, e in failed.items():
+                if i not in retry:
+                    errors[i] = e
+            if retry:
+                self._backoff(attempt, failed[retry[0]])
+                attempt += 1
+            pending = sorted(retry)
+        with self._lock:
+            self._stats["failures"] += len(errors)
+        if errors and not return_exceptions:
+            raise errors[min(errors)]
+        for i, e in errors.items():
+            results[i] = e
+        return results
+
+    def _send_batch(self, service, requests: Sequence, chunk: List[int], user: str,
+                    results: List[Any]) -> Dict[int, BaseException]:
+        failed: Dict[int, BaseException] = {}
+        answered = set()
+
+        def _done(request_id, response, exception):
+            answered.add(int(request_id))
+            if exception is not None:
+                failed[int(request_id)] = exception
+            else:
+                results[int(request_id)] = response
+
+        for i in chunk:
+            self._spend(user, _method(requests[i]), 1)
+        batch = service.new_batch_http_request(callback=_done)
+        for i in chunk:
+            batch.add(requests[i], request_id=str(i))
+        with self._lock:
+            self._stats["batches"] += 1
+        with tracer.span("google.batch", **{"google.batch.size": len(chunk)}):
+            with google_limiter.slot(), self._connection(user) as http:
+                try:
+                    batch.execute(http=http)
+                except Exception as e:
+                    # The batch call itself failed (transport error, 429/5xx for the whole batch):
+                    # it is every unanswered item's failure, retried or reported item by item
+                    for i in chunk:
+                        if i not in answered:
+                            failed[i] = e
+        tracer.current().add("google.pages", len(chunk) - len(failed))
+        return failed
+
+    def stats(self) -> dict:
+        with self._lock:
+            return dict(self._stats, quota_units_by_method=dict(self._units_by_method),
+                        quota_units_by_user=dict(self._units_by_user), user_qpm=self.user_qpm,
+                        project_qpm=self.project_qpm, in_flight_reads=len(self._flights))
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self._stats.clear()
+            self._units_by_method.clear()
+            self._units_by_user.clear()
+
+
+google_api = GoogleApiExecutor()
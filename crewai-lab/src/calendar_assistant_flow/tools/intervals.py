@@ -0,0 +1,51 @@
+# intervals.py
+"""Busy/free interval helpers for availability checks."""
+from bisect import bisect_right
+from datetime import date, datetime, timedelta
+from typing import Iterable, List, Tuple
+
+Interval = Tuple[datetime, datetime]
+
+
+def merge_intervals(intervals: Iterable[Interval]) -> List[Interval]:
+    """Sort and merge overlapping or touching intervals (O(n log n))."""
+    merged: List[Interval] = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def free_slots_by_day(busy: List[Interval], start: datetime, end: datetime, tz) -> List[dict]:
+    """Split the free time between ``start`` and ``end`` into per-day slots.
+
+    ``busy`` must already be merged (see merge_intervals). Output matches
+    TimeAvailabilityTool: ``[{"date": "YYYY-MM-DD", "available": [("HH:MM:SS", "HH:MM:SS"), ...]}]``;
+    days with no free time are left out.
+    """
+    ends = [b[1] for b in busy]
+    available_days = []
+    current: date = start.date()
+    while current <= end.date():
+        day_start = max(datetime.combine(current, datetime.min.time()).replace(tzinfo=tz), start)
+        day_end = min(datetime.combine(current, datetime.max.time()).replace(tzinfo=tz), end)
+
+        free_slots = []
+        cursor = day_start
+        # First busy period that ends after the day starts
+        i = bisect_right(ends, day_start)
+        while i < len(busy) and busy[i][0] < day_end:
+            bstart, bend = busy[i]
+            if bstart > cursor:
+                free_slots.append((cursor.time().isoformat(), bstart.time().isoformat()))
+            cursor = max(cursor, bend)
+            i += 1
+        if cursor < day_end:
+            free_slots.append((cursor.time().isoformat(), day_end.time().isoformat()))
+        if free_slots:
+            available_days.append({"date": current.isoformat(), "available": free_slots})
+        current += timedelta(days=1)
+    return available_days
@@ -0,0 +1,116 @@
+# query_cache.py
+"""Read-through TTL/LRU cache for free/busy and event-list query results.
+
+Entries are keyed on (scope, query kind, calendar ids) plus a [start, end)
+window of aware datetimes. The scope is the user whose credentials ran the
+query: "primary", and what another calendar lets you see, differ per user.
+A lookup is answered by any live entry of the same scope, kind and calendars
+whose window covers the requested one; the caller narrows the superset
+result to its own window. Writes invalidate every entry that mentions one of
+the written calendars and overlaps the written time range, in one scope or
+in all of them.
+
+    hit = query_cache.get("freebusy", ("primary",), start, end, scope=user)
+    if hit is None:
+        ...query the API...
+        query_cache.put("freebusy", ("primary",), start, end, busy, scope=user)
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+# 0 disables the cache
+QUERY_CACHE_TTL_SECONDS = float(os.getenv("QUERY_CACHE_TTL_SECONDS", "60"))
+QUERY_CACHE_MAX_ENTRIES = int(os.getenv("QUERY_CACHE_MAX_ENTRIES", "256"))
+
+Key = Tuple[str, str, Tuple[str, ...], datetime, datetime]
+
+
+class QueryCache:
+    """Thread-safe window cache with per-entry TTL and LRU eviction."""
+
+    def __init__(self, max_entries: int = QUERY_CACHE_MAX_ENTRIES, ttl: float = QUERY_CACHE_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        # key -> (expires_at, value), least recently used first
+        self._entries: "OrderedDict[Key, Tuple[float, Any]]" = OrderedDict()
+        self._stats = {"hits": 0, "superset_hits": 0, "misses": 0,
+                       "evictions": 0, "expirations": 0, "invalidations": 0}
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0 and self.max_entries > 0
+
+    @staticmethod
+    def _group(scope: str, kind: str, calendars: Iterable[str]) -> Tuple[str, str, Tuple[str, ...]]:
+        return scope, kind, tuple(sorted(set(calendars)))
+
+    def get(self, kind: str, calendars: Iterable[str], start: datetime, end: datetime,
+            scope: str = "") -> Optional[Any]:
+        """Cached value for a window covering [start, end), or None."""
+        if not self.enabled:
+            return None
+        group = self._group(scope, kind, calendars)
+        now = time.monotonic()
+        with self._lock:
+            best = None
+            for key, (expires, _) in list(self._entries.items()):
+                if key[:3] != group:
+                    continue
+                if expires <= now:
+                    del self._entries[key]
+                    self._stats["expirations"] += 1
+                elif key[3] <= start and end <= key[4]:
+                    # Prefer the tightest covering window: less to filter
+                    if best is None or key[4] - key[3] < best[4] - best[3]:
+                        best = key
+            if best is None:
+                self._stats["misses"] += 1
+                return None
+            self._entries.move_to_end(best)
+            exact = best[3] == start and best[4] == end
+            self._stats["hits" if exact else "superset_hits"] += 1
+            return self._entries[best][1]
+
+    def put(self, kind: str, calendars: Iterable[str], start: datetime, end: datetime, value: Any,
+            scope: str = "") -> None:
+        if not self.enabled:
+            return
+        key = (*self._group(scope, kind, calendars), start, end)
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats["evictions"] += 1
+
+    def invalidate(self, calendars: Iterable[str], start: datetime, end: datetime,
+                   scope: Optional[str] = None) -> int:
+        """Drop entries for any of ``calendars`` whose window overlaps [start, end); scope None = every scope."""
+        touched = set(calendars)
+        with self._lock:
+            stale = [k for k in self._entries
+                     if (scope is None or k[0] == scope)
+                     and touched.intersection(k[2]) and k[3] < end and start < k[4]]
+            for key in stale:
+                del self._entries[key]
+            self._stats["invalidations"] += len(stale)
+        return len(stale)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            out = dict(self._stats, entries=len(self._entries), max_entries=self.max_entries, ttl=self.ttl)
+        lookups = out["hits"] + out["superset_hits"] + out["misses"]
+        out["hit_rate"] = round((out["hits"] + out["superset_hits"]) / lookups, 3) if lookups else None
+        return out
+
+
+query_cache = QueryCache()
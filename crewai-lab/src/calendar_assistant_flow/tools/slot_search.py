@@ -0,0 +1,264 @@
+# slot_search.py
+"""Meeting-slot search: an interval scan for plain searches, minute bitmaps where every candidate is scored.
+
+find_slots with only required attendees wants the first k free slots, so
+it merges the busy intervals once and walks each day's gaps on the start
+grid, bisecting to the next busy period and stopping at k slots.
+
+Ranking by optional attendees, and find_recurring_slots, have to score
+every start on every day. For those the search grid has one row per
+eligible day (a weekday in ``weekdays``) and one column per minute of
+working hours. Busy intervals are painted into it with a difference array
+and a prefix sum: the required calendars are unioned into a single bitmap,
+optional calendars keep one bitmap each so candidates can be ranked by how
+many of them are free. A second prefix sum then answers "is [s, s +
+duration) clear?" for every candidate start on every day at once.
+
+Measured with benchmarks/bench_slot_search.py (2 meetings per person per
+weekday, 30 minute slots). The scan beats the bitmap for every one-off
+search, from 0.06 vs 0.4 ms (2 people, 7 days) to 27 vs 47 ms (50 people,
+365 days), so the bitmap is only used when optional attendees need
+ranking. For a series, the bitmap is 1.1-4x faster than bisecting every
+start time on every weekday from 28 days on with up to 20 people. It is
+level or slower at 7 days, and 3-17% slower with 50 people.
+
+    find_slots(busy, date(2025, 6, 2), 28, tz, duration=30, top_k=5)
+    find_recurring_slots(busy, date(2025, 6, 2), 28, tz, duration=30)   # same time every weekday
+"""
+from bisect import bisect_right
+from datetime import date, datetime, time, timedelta
+from typing import Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+from calendar_assistant_flow.tools.intervals import Interval, merge_intervals
+
+MINUTES_PER_DAY = 24 * 60
+WEEKDAYS = (0, 1, 2, 3, 4)
+
+
+class Slot(NamedTuple):
+    start: datetime
+    end: datetime
+    optional_free: int  # optional calendars free for the whole slot
+
+
+class RecurringSlot(NamedTuple):
+    start: time
+    end: time
+    days_free: int          # pattern days on which the slot is clear
+    days: int               # pattern days in the range
+    optional_free: int      # optional-calendar free days summed over the pattern
+    conflicts: List[date]   # pattern days on which it is not
+
+
+def _wall(dt: datetime, tz, round_up: bool) -> int:
+    """Minutes since 0001-01-01 of aware ``dt`` on ``tz``'s wall clock."""
+    # Busy periods normally arrive converted to ``tz`` already; then no zone math is needed
+    if dt.tzinfo is not tz:
+        dt = dt.astimezone(tz)
+    partial = round_up and (dt.second or dt.microsecond) > 0
+    return dt.toordinal() * MINUTES_PER_DAY + dt.hour * 60 + dt.minute + partial
+
+
+def _minutes(points: Sequence[datetime], day0: date, tz, round_up: bool) -> np.ndarray:
+    """Minute offsets of aware ``points`` from local midnight of ``day0``, on the local wall clock."""
+    walls = (_wall(dt, tz, round_up) for dt in points)
+    return np.fromiter(walls, dtype=np.int64, count=len(points)) - day0.toordinal() * MINUTES_PER_DAY
+
+
+def occupancy(busy: Iterable[Interval], day0: date, days: int, tz, rows: Optional[np.ndarray] = None,
+              hours: Tuple[int, int] = (0, MINUTES_PER_DAY)) -> np.ndarray:
+    """Bitmap of aware ``busy`` intervals, True for every minute any of them touches.
+
+    One row per day offset in ``rows`` (default: all ``days`` days from
+    ``day0``), one column per minute of the day in [hours[0], hours[1]).
+    """
+    rows = np.arange(days) if rows is None else rows
+    lo, hi = hours
+    width = hi - lo
+    # Each row gets a spare column so a +1/-1 pair always cancels before the next row starts
+    diff = np.zeros(len(rows) * (width + 1) + 1, dtype=np.int32)
+    busy = list(busy)
+    if busy and len(rows):
+        span = days * MINUTES_PER_DAY
+        starts = np.clip(_minutes([b[0] for b in busy], day0, tz, round_up=False), 0, span)
+        ends = np.clip(_minutes([b[1] for b in busy], day0, tz, round_up=True), 0, span)
+        keep = starts < ends
+        starts, ends = starts[keep], ends[keep]
+        # Split intervals at midnight: one piece per day they touch
+        first, last = starts // MINUTES_PER_DAY, (ends - 1) // MINUTES_PER_DAY
+        pieces = last - first + 1
+        offset = np.arange(pieces.sum()) - np.repeat(np.cumsum(pieces) - pieces, pieces)
+        day = np.repeat(first, pieces) + offset
+        lo_piece = np.maximum(np.repeat(starts, pieces) - day * MINUTES_PER_DAY, lo)
+        hi_piece = np.minimum(np.repeat(ends, pieces) - day * MINUTES_PER_DAY, hi)
+        row_of_day = np.full(days, -1)
+        row_of_day[rows] = np.arange(len(rows))
+        row = row_of_day[day]
+        keep = (row >= 0) & (lo_piece < hi_piece)
+        base = row[keep] * (width + 1) - lo
+        np.add.at(diff, base + lo_piece[keep], 1)
+        np.add.at(diff, base + hi_piece[keep], -1)
+    grid = np.cumsum(diff[:-1], dtype=np.int32).reshape(len(rows), width + 1)
+    return grid[:, :width] > 0
+
+
+def _clear_windows(blocked: np.ndarray, starts: np.ndarray, duration: int) -> np.ndarray:
+    """For a (..., rows, minutes) bitmap: (..., rows, starts) True where [start, start + duration) is clear."""
+    rows, width = blocked.shape[-2:]
+    # One contiguous prefix sum over all rows; windows never cross a row, so that is exact
+    flat = blocked.reshape(blocked.shape[:-2] + (rows * width,))
+    csum = np.zeros(flat.shape[:-1] + (flat.shape[-1] + 1,), dtype=np.int32)
+    np.cumsum(flat, axis=-1, dtype=np.int32, out=csum[..., 1:])
+    at = np.arange(rows)[:, None] * width + starts[None, :]
+    return (csum[..., at + duration] - csum[..., at]) == 0
+
+
+def _working_minutes(duration: int, work_start: time, work_end: time) -> Tuple[int, int]:
+    lo, hi = work_start.hour * 60 + work_start.minute, work_end.hour * 60 + work_end.minute
+    if not 0 < duration <= hi - lo:
+        raise ValueError(f"duration must be 1..{hi - lo} minutes (the working day), got {duration}")
+    return lo, hi
+
+
+def _grid(required: Sequence[Iterable[Interval]], optional: Sequence[Iterable[Interval]],
+          day0: date, days: int, tz, duration: int, work_start: time, work_end: time,
+          weekdays: Iterable[int], step: int, not_before: Optional[datetime], not_after: Optional[datetime]):
+    """(rows, starts, ok, optional_free): eligible day offsets, candidate start minutes, and per row x start
+    whether every required calendar is clear and how many optional ones are."""
+    lo, hi = _working_minutes(duration, work_start, work_end)
+    rows = np.flatnonzero(np.isin((np.arange(days) + day0.weekday()) % 7, list(weekdays)))
+    blocked = occupancy((b for cal in required for b in cal), day0, days, tz, rows, (lo, hi))
+
+    if not_before is not None or not_after is not None:
+        minute = rows[:, None] * MINUTES_PER_DAY + np.arange(lo, hi)[None, :]
+        if not_before is not None:
+            blocked |= minute < _minutes([not_before], day0, tz, round_up=True)[0]
+        if not_after is not None:
+            blocked |= minute >= _minutes([not_after], day0, tz, round_up=False)[0]
+
+    starts = np.arange(0, hi - lo - duration + 1, step)
+    ok = _clear_windows(blocked, starts, duration)
+    if optional:
+        occupied = np.stack([occupancy(cal, day0, days, tz, rows, (lo, hi)) for cal in optional])
+        optional_free = _clear_windows(occupied, starts, duration).sum(axis=0)
+    else:
+        optional_free = np.zeros_like(ok, dtype=np.int64)
+    return rows, starts + lo, ok, optional_free
+
+
+def _pick(order: np.ndarray, start_of, duration: int, top_k: int) -> List[int]:
+    """Take candidates in ``order`` until ``top_k`` that don't overlap one another."""
+    picked, taken = [], []
+    for i in order:
+        s = start_of(i)
+        if all(abs(s - t) >= duration for t in taken):
+            picked.append(i)
+            taken.append(s)
+            if len(picked) == top_k:
+                break
+    return picked
+
+
+def _scan(required: Sequence[Iterable[Interval]], day0: date, days: int, tz, duration: int,
+          work_start: time, work_end: time, weekdays: Iterable[int], step: int, top_k: int,
+          not_before: Optional[datetime], not_after: Optional[datetime]) -> List[datetime]:
+    """Starts of the first ``top_k`` non-overlapping free slots, walking each day's gaps."""
+    lo, hi = _working_minutes(duration, work_start, work_end)
+    busy = merge_intervals(b for cal in required for b in cal)
+    ends = [b[1] for b in busy]
+    midnight = datetime.combine(day0, time())
+    origin = day0.toordinal() * MINUTES_PER_DAY
+    # Candidate starts are minutes from midnight of day0; only busy ends the walk lands on are converted
+    floor = _wall(not_before, tz, round_up=True) - origin if not_before is not None else None
+    ceiling = _wall(not_after, tz, round_up=False) - origin if not_after is not None else None
+    weekdays = set(weekdays)
+    need = timedelta(minutes=duration)
+
+    found: List[datetime] = []
+    for d in range(days):
+        if (day0.weekday() + d) % 7 not in weekdays:
+            continue
+        first, limit = d * MINUTES_PER_DAY + lo, d * MINUTES_PER_DAY + hi
+        if ceiling is not None:
+            limit = min(limit, ceiling)
+        on_grid = lambda minute: first + max(0, -(-(minute - first) // step)) * step
+        minute = first if floor is None else on_grid(floor)
+        i = 0
+        while minute + duration <= limit:
+            start = (midnight + timedelta(minutes=minute)).replace(tzinfo=tz)
+            # First busy period ending after start; only it can overlap [start, start + duration)
+            i = bisect_right(ends, start, i)
+            if i < len(busy) and busy[i][0] < start + need:
+                minute = on_grid(_wall(busy[i][1], tz, round_up=True) - origin)
+                continue
+            found.append(start)
+            if len(found) == top_k:
+                return found
+            minute = on_grid(minute + duration)
+    return found
+
+
+def find_slots(required: Sequence[Iterable[Interval]], day0: date, days: int, tz, duration: int,
+               optional: Sequence[Iterable[Interval]] = (), work_start: time = time(9),
+               work_end: time = time(17), weekdays: Iterable[int] = WEEKDAYS, step: int = 15,
+               top_k: int = 5, not_before: Optional[datetime] = None,
+               not_after: Optional[datetime] = None) -> List[Slot]:
+    """Top-k non-overlapping slots when every ``required`` calendar is free.
+
+    ``required``/``optional`` hold one busy-interval list per calendar; the
+    search covers ``days`` days from ``day0``, cut to [not_before, not_after)
+    when given. Slots with more optional calendars free rank first, then
+    earlier ones. Without optional calendars this is an interval scan that
+    stops at ``top_k`` slots; with them, every candidate is scored on bitmaps.
+    """
+    if not optional:
+        return [Slot(start, start + timedelta(minutes=duration), 0)
+                for start in _scan(required, day0, days, tz, duration, work_start, work_end, weekdays,
+                                   step, top_k, not_before, not_after)]
+
+    rows, starts, ok, optional_free = _grid(required, optional, day0, days, tz, duration,
+                                            work_start, work_end, weekdays, step, not_before, not_after)
+    flat = np.flatnonzero(ok)
+    if not flat.size:
+        return []
+    score = optional_free.reshape(-1)[flat]
+    order = flat[np.lexsort((flat, -score))]
+    n = len(starts)
+    absolute = lambda i: int(rows[i // n]) * MINUTES_PER_DAY + int(starts[i % n])
+    midnight = datetime.combine(day0, time())
+    slots = []
+    for i in _pick(order, absolute, duration, top_k):
+        day, minute = divmod(absolute(i), MINUTES_PER_DAY)
+        start = (midnight + timedelta(days=day, minutes=minute)).replace(tzinfo=tz)
+        slots.append(Slot(start, start + timedelta(minutes=duration), int(optional_free.reshape(-1)[i])))
+    return slots
+
+
+def find_recurring_slots(required: Sequence[Iterable[Interval]], day0: date, days: int, tz, duration: int,
+                         optional: Sequence[Iterable[Interval]] = (), work_start: time = time(9),
+                         work_end: time = time(17), weekdays: Iterable[int] = WEEKDAYS, step: int = 15,
+                         top_k: int = 5, not_before: Optional[datetime] = None,
+                         not_after: Optional[datetime] = None) -> List[RecurringSlot]:
+    """Top-k times of day for a meeting held on every ``weekdays`` day in the range.
+
+    Times that are clear on every occurrence rank first; after that, fewer
+    conflicts, more optional attendance, then earlier in the day.
+    """
+    rows, starts, ok, optional_free = _grid(required, optional, day0, days, tz, duration,
+                                            work_start, work_end, weekdays, step, not_before, not_after)
+    if not rows.size:
+        return []
+    days_free = ok.sum(axis=0)
+    attendance = np.where(ok, optional_free, 0).sum(axis=0)
+    candidates = np.flatnonzero(days_free)
+    order = candidates[np.lexsort((candidates, -attendance[candidates], -days_free[candidates]))]
+    slots = []
+    for i in _pick(order, lambda i: int(starts[i]), duration, top_k):
+        begin = datetime.combine(day0, time()) + timedelta(minutes=int(starts[i]))
+        slots.append(RecurringSlot(
+            begin.time(), (begin + timedelta(minutes=duration)).time(), int(days_free[i]), len(rows),
+            int(attendance[i]), [day0 + timedelta(days=int(d)) for d in rows[~ok[:, i]]],
+        ))
+    return slots
@@ -0,0 +1,156 @@
+# tracing.py
+"""Lightweight span tracing exported as OpenTelemetry-shaped JSON lines.
+
+Enabled by setting TRACE_FILE; each finished span is appended to that file as
+one OTLP/JSON span object (traceId, spanId, parentSpanId, name, start/end in
+unix nanoseconds, key/value attributes, status), so the file can be loaded
+into any OTLP-aware viewer or simply grepped. With TRACE_FILE unset,
+span() hands back a shared no-op object and costs one attribute lookup.
+
+    with tracer.span("crew.kickoff", crew="manager") as span:
+        out = crew.kickoff(...)
+        span.set("crew.tasks", 2)
+
+The current span is tracked in a contextvar, so nesting follows the call
+stack and carries over into asyncio tasks and copied thread contexts.
+"""
+import json
+import os
+import secrets
+import threading
+import time
+from contextvars import ContextVar
+from typing import Any, Optional
+
+SERVICE_NAME = "calendar_assistant_flow"
+
+_current: ContextVar[Optional["Span"]] = ContextVar("current_span", default=None)
+# Branch threads update their shared parent span's counters; one lock for all spans is plenty
+_attributes_lock = threading.Lock()
+
+
+def _otlp_value(value: Any) -> dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+class Span:
+    __slots__ = ("tracer", "name", "trace_id", "span_id", "parent_id", "start_ns", "end_ns",
+                 "attributes", "error", "_token")
+
+    def __init__(self, tracer: "Tracer", name: str, parent: Optional["Span"], attributes: dict):
+        self.tracer = tracer
+        self.name = name
+        self.trace_id = parent.trace_id if parent else secrets.token_hex(16)
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent.span_id if parent else ""
+        self.attributes = attributes
+        self.error: Optional[str] = None
+        self.start_ns = time.time_ns()
+        self.end_ns = 0
+
+    def set(self, key: str, value: Any) -> None:
+        if value is not None:
+            self.attributes[key] = value
+
+    def add(self, key: str, amount: float = 1) -> None:
+        """Accumulate a counter attribute (e.g. pages fetched under this span)."""
+        with _attributes_lock:
+            self.attributes[key] = self.attributes.get(key, 0) + amount
+
+    def set_once(self, key: str, value: Any) -> None:
+        self.attributes.setdefault(key, value)
+
+    def __enter__(self) -> "Span":
+        self._token = _current.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        self.end_ns = time.time_ns()
+        if exc is not None:
+            self.error = f"{exc_type.__name__}: {exc}"
+        _current.reset(self._token)
+        self.tracer._export(self)
+        return False
+
+    def to_otlp(self) -> dict:
+        with _attributes_lock:
+            attributes = list(self.attributes.items())
+        return {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "parentSpanId": self.parent_id,
+            "name": self.name,
+            "kind": 1,  # SPAN_KIND_INTERNAL
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": [{"key": k, "value": _otlp_value(v)} for k, v in attributes],
+            "status": {"code": 2, "message": self.error} if self.error else {"code": 1},
+            "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": SERVICE_NAME}}]},
+        }
+
+
+class _NoopSpan:
+    """Stand-in returned while tracing is off; every method does nothing."""
+
+    __slots__ = ()
+
+    def set(self, key, value):
+        pass
+
+    def add(self, key, amount=1):
+        pass
+
+    def set_once(self, key, value):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class Tracer:
+    def __init__(self, path: Optional[str] = None):
+        self._lock = threading.Lock()
+        self._file = None
+        self.enabled = False
+        self.configure(path)
+
+    def configure(self, path: Optional[str]) -> None:
+        """Start writing spans to ``path`` (append), or stop tracing with None."""
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            if path:
+                self._file = open(path, "a", encoding="utf-8")
+            self.enabled = bool(path)
+
+    def span(self, name: str, **attributes):
+        if not self.enabled:
+            return NOOP_SPAN
+        return Span(self, name, _current.get(), attributes)
+
+    def current(self):
+        """The innermost open span, or the no-op span."""
+        return (_current.get() or NOOP_SPAN) if self.enabled else NOOP_SPAN
+
+    def _export(self, span: Span) -> None:
+        line = json.dumps(span.to_otlp(), default=str)
+        with self._lock:
+            if self._file is not None:
+                self._file.write(line + "\n")
+                self._file.flush()
+
+
+tracer = Tracer(os.getenv("TRACE_FILE") or None)